@@ -1,14 +1,51 @@
+import asyncio
+import concurrent.futures
+import functools
 import multiprocessing as mp
 import os.path
+import queue
+import selectors
+import signal
 import subprocess as sp
+import threading
+import time
 from os import PathLike
 from shutil import copyfile
-from typing import Union, Optional, List
+from typing import (
+    AsyncIterator,
+    BinaryIO,
+    Callable,
+    Iterator,
+    List,
+    NamedTuple,
+    Optional,
+    Sequence,
+    Tuple,
+    Union,
+)
 
 import numpy as np
 import pandas as pd
 
-from S5.HPC.file_io import write_vel, read_history
+from S5.HPC.file_io import stage_run, write_vel
+from S5.HPC.journal import RunJournal
+from S5.HPC.run_cache import RunCache
+from S5.Tecplot import SSHistory
+
+
+READ_IN_MARKERS = (b"DDHHMM", b"Read")
+"""Starts of the SolarSim stdout lines that show it has read in its input."""
+
+RUN_TIMEOUT = 3600.0
+"""Default time limit of a SolarSim run in seconds."""
+
+_PIPE_READ_BYTES = 65536
+_MARKER_BYTES = max(len(marker) for marker in READ_IN_MARKERS)
+
+if os.name == "nt":  # pragma: no cover
+    _NEW_PROCESS_GROUP = {"creationflags": sp.CREATE_NEW_PROCESS_GROUP}
+else:
+    _NEW_PROCESS_GROUP = {"start_new_session": True}
 
 
 def run_ss(
@@ -18,9 +55,20 @@ def run_ss(
         history: Union[str, PathLike],
         solartotals: Union[str, PathLike],
         lock: Optional[mp.Lock] = None,
-) -> None:
+        timeout: float = RUN_TIMEOUT,
+        cache: Optional[RunCache] = None,
+) -> Optional[int]:
     """Run solar sim
 
+    The supervising process sleeps until SolarSim writes to stdout or exits,
+    so it takes no CPU from the simulations. stdout is read until SolarSim
+    closes it, so SolarSim never blocks on a full pipe or writes to a closed
+    one. SolarSim runs in a process group of its own, which is killed as a
+    whole on timeout.
+
+    Existing output files are removed before SolarSim starts, so a failed
+    run never leaves the results of an earlier one in place.
+
     Args:
         executable_location: Path to SolarSim to execute.
         control: Pth to control file.
@@ -28,47 +76,412 @@ def run_ss(
         history: Path to write history file.
         solartotals: Path to write solartotals file.
         lock: `multiprocessing.Lock` for parallel computing.
+        timeout: Time limit of the run in seconds, default an hour.
+        cache: Cache of SolarSim results. If the run is in it, its outputs
+            are copied into place instead of running SolarSim, otherwise
+            they are stored in it when SolarSim succeeds.
 
     Returns:
-        None, lock is released when SolarSim have finished reading in the input
-        files
+        The return code of SolarSim, negative if it was killed by a signal,
+        0 if the run was in the cache. The lock is released when SolarSim
+        have finished reading in the input files, or when it exits if it
+        never does.
     """
+    outputs = (summary, history, solartotals)
+    key = None
+    if cache is not None:
+        key = _cache_key(cache, executable_location, control, None, history)
+        if key is not None and cache.fetch(key, *outputs):
+            if lock is not None:
+                lock.release()
+            print(f"SolarSim results for {history} fetched from cache")
+            return 0
+    _remove_outputs(outputs)
     t = np.datetime64("now")
     print(f"SolarSim started at {str(t)}")
+    deadline = time.monotonic() + timeout
     p = sp.Popen(
         [executable_location, control, summary, history, solartotals],
-        stdout=sp.PIPE
+        stdout=sp.PIPE,
+        **_NEW_PROCESS_GROUP,
     )  # run solarsim
-    line = p.stdout.readline()
     released = False
-    while (p.poll() is None) and (
-            (np.datetime64("now") - t) < np.timedelta64(1, "h")):
-        # block new solarsim until current solarsim have finish readin
-        if line.decode("UTF-8").startswith("DDHHMM") or line.decode(
-                "UTF-8").startswith(
-                "Read"
-        ):
-            if lock is not None:
-                lock.release()
-            released = True
-            p.stdout.close()
-            break
-        line = p.stdout.readline()
-    print(f'SolarSim read in completed at {str(np.datetime64("now"))}')
+    line_start = b""
+    try:
+        for block in _iter_blocks(p.stdout, deadline):
+            if released:
+                continue  # only drain the pipe
+            released, line_start = _scan_read_in(line_start, block)
+            # block new solarsim until current solarsim have finish readin
+            if released:
+                _read_in_completed(lock)
+        # stdout is closed as SolarSim exits
+        p.wait(max(deadline - time.monotonic(), 0))
+    except (TimeoutError, sp.TimeoutExpired):
+        print(f"SolarSim process timeout after {timeout} s, killing it.")
+    finally:
+        if p.poll() is None:
+            _kill_group(p)
+            p.wait()
+        p.stdout.close()
+        if not released and lock is not None:
+            lock.release()
+    print(f'SolarSim finished at {str(np.datetime64("now") - t)} started at {t}')
+    if key is not None and p.returncode == 0:
+        cache.store(key, *outputs)
+    return p.returncode
 
-    while p.poll() is None:  # wait for the simulation to complete
-        if (np.datetime64("now") - t) > np.timedelta64(1,
-                                                       "h"):  # 1 hour timeout
-            print(
-                "SolarSim process timeout. Potential deadlock from subprocess.Popen, consider increasing SolarSim "
-                "update interval"
-            )
-            p.kill()
-            break
 
-    if not released and lock is not None:
+def _cache_key(
+        cache: RunCache,
+        executable_location: Union[str, PathLike],
+        control: Union[str, PathLike],
+        cwd: Optional[Union[str, PathLike]],
+        history: Union[str, PathLike],
+) -> Optional[str]:
+    """Return the cache key of a run, or None if not all of its inputs can
+    be read, leaving SolarSim to report them."""
+    try:
+        return cache.key(executable_location, control, cwd)
+    except FileNotFoundError as exc:
+        print(f"SolarSim results for {history} not cached: {exc}")
+        return None
+
+
+def _remove_outputs(outputs: Sequence[Union[str, PathLike]]) -> None:
+    """Remove the output files of a run if they exist."""
+    for output in outputs:
+        try:
+            os.remove(output)
+        except FileNotFoundError:
+            pass
+
+
+def _read_in_completed(lock: Optional[mp.Lock]) -> None:
+    """Release the lock of a SolarSim which has read in its input."""
+    if lock is not None:
         lock.release()
-    print(f'SolarSim finished at {str(np.datetime64("now") - t)} started at {t}')
+    print(f'SolarSim read in completed at {str(np.datetime64("now"))}')
+
+
+def _scan_read_in(line_start: bytes, block: bytes) -> Tuple[bool, bytes]:
+    """Scan a block of SolarSim stdout for the end of its read in.
+
+    Lines can be any length, e.g. ``\\r`` progress output, so only their
+    starts are kept between blocks.
+
+    Args:
+        line_start: Start of the unfinished last line of earlier blocks.
+        block: Block read from stdout.
+
+    Returns:
+        Whether a line starts with one of ``READ_IN_MARKERS``, and the start
+        of the unfinished last line to scan the next block with.
+    """
+    *lines, line_start = (line_start + block).split(b"\n")
+    line_start = line_start[:_MARKER_BYTES]
+    read_in = any(
+        line.startswith(READ_IN_MARKERS) for line in [*lines, line_start]
+    )
+    return read_in, line_start
+
+
+def _iter_blocks(stream: BinaryIO, deadline: float) -> Iterator[bytes]:
+    """Yield the blocks read from a pipe until it is closed.
+
+    Raises:
+        TimeoutError: If the pipe is still open at `deadline`, a
+            `time.monotonic` time.
+    """
+    if os.name == "nt":  # pragma: no cover
+        # selectors only handle sockets on Windows, read in a thread instead
+        blocks = queue.Queue()
+        threading.Thread(
+            target=_pump_blocks, args=(stream, blocks), daemon=True
+        ).start()
+        while True:
+            try:
+                block = blocks.get(timeout=max(deadline - time.monotonic(), 0))
+            except queue.Empty as exc:
+                raise TimeoutError from exc
+            if not block:
+                return
+            yield block
+    fd = stream.fileno()
+    with selectors.DefaultSelector() as selector:
+        selector.register(fd, selectors.EVENT_READ)
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise TimeoutError
+            if not selector.select(remaining):
+                continue
+            block = os.read(fd, _PIPE_READ_BYTES)
+            if not block:
+                return
+            yield block
+
+
+def _pump_blocks(  # pragma: no cover
+        stream: BinaryIO, blocks: queue.Queue
+) -> None:
+    """Put the blocks read from stream in a queue, then b"" once closed."""
+    read = functools.partial(os.read, stream.fileno(), _PIPE_READ_BYTES)
+    for block in iter(read, b""):
+        blocks.put(block)
+    blocks.put(b"")
+
+
+def _kill_group(p: sp.Popen) -> None:
+    """Kill a process started in a process group of its own, and the rest
+    of the group."""
+    if os.name == "nt":  # pragma: no cover
+        p.kill()
+        return
+    try:
+        os.killpg(p.pid, signal.SIGKILL)
+    except ProcessLookupError:
+        pass
+
+
+class SolarSimRun(NamedTuple):
+    """A SolarSim run scheduled by `run_sweep`.
+
+    Attributes:
+        control: Path to control file.
+        summary: Path to write summary file.
+        history: Path to write history file.
+        solartotals: Path to write solartotals file.
+        prepare: Called with no arguments just before SolarSim is started,
+            while the run holds a read in slot, e.g. to write its target
+            velocity file.
+        cwd: Working directory of SolarSim, default the current directory.
+    """
+
+    control: Union[str, PathLike]
+    summary: Union[str, PathLike]
+    history: Union[str, PathLike]
+    solartotals: Union[str, PathLike]
+    prepare: Optional[Callable[[], None]] = None
+    cwd: Optional[Union[str, PathLike]] = None
+
+
+def run_sweep(
+        runs: Sequence[SolarSimRun],
+        executable_location: Union[str, PathLike] = "../SolarSim.X",
+        max_runs: Optional[int] = None,
+        max_read_ins: int = 1,
+        timeout: float = RUN_TIMEOUT,
+        cache: Optional[RunCache] = None,
+        journal: Optional[RunJournal] = None,
+) -> List[Optional[int]]:
+    """Run SolarSims concurrently from a single asyncio event loop.
+
+    SolarSim processes are started directly, without a Python worker
+    process per run. At most `max_runs` run at once and at most
+    `max_read_ins` of them are preparing their inputs or reading them in,
+    up to the first stdout line starting with one of ``READ_IN_MARKERS``.
+
+    When called with an event loop already running, e.g. in Jupyter, the
+    sweep runs in an event loop of its own in a worker thread, blocking the
+    caller until it is done.
+
+    Args:
+        runs: The runs to make, started in order.
+        executable_location: Path to SolarSim to execute.
+        max_runs: Maximum number of SolarSims running at once, default the
+            number of cpu.
+        max_read_ins: Maximum number of SolarSims reading in at once. Runs
+            sharing input files that `prepare` overwrites need the default
+            of 1, runs staged with `S5.HPC.file_io.stage_run` do not.
+        timeout: Time limit of each run in seconds, its process group is
+            killed when it is reached.
+        cache: Cache of SolarSim results, see `run_ss`. Runs are looked up
+            once prepared, while holding their read in slot.
+        journal: Journal of the sweep. Runs it records as complete, with
+            the same executable and paths and their outputs intact, are
+            skipped, so an interrupted sweep resumes where it stopped.
+            Changes to the contents of the inputs are not detected, use
+            `cache` for that.
+
+    Returns:
+        The return code of each run, negative if it was killed by a signal,
+        0 if it was skipped, None if it failed to run, e.g. `prepare`
+        raised.
+
+    Examples:
+        >>> runs = [
+        >>>     SolarSimRun("SolarSim.in", f"Summary_{i}.dat",
+        >>>                 f"History_{i}.dat", f"SolarTotals_{i}.dat")
+        >>>     for i in range(10)
+        >>> ]
+        >>> run_sweep(runs, "../SolarSim.X", max_runs=32, max_read_ins=4)
+    """
+    if os.path.dirname(executable_location):
+        # runs may start in working directories of their own
+        executable_location = os.path.abspath(executable_location)
+    sweep = _run_sweep(
+        runs,
+        executable_location,
+        max_runs or mp.cpu_count(),
+        max_read_ins,
+        timeout,
+        cache,
+        journal,
+    )
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:  # no event loop running
+        return asyncio.run(sweep)
+    # e.g. in Jupyter, asyncio.run can not start a loop within the running one
+    with concurrent.futures.ThreadPoolExecutor(1) as executor:
+        return executor.submit(asyncio.run, sweep).result()
+
+
+async def _run_sweep(
+        runs: Sequence[SolarSimRun],
+        executable_location: Union[str, PathLike],
+        max_runs: int,
+        max_read_ins: int,
+        timeout: float,
+        cache: Optional[RunCache],
+        journal: Optional[RunJournal],
+) -> List[Optional[int]]:
+    """Run the sweep of `run_sweep` within the event loop."""
+    loop = asyncio.get_running_loop()
+    run_slots = asyncio.Semaphore(max_runs)
+    read_in_slots = asyncio.Semaphore(max_read_ins)
+
+    async def run_one(run: SolarSimRun) -> Optional[int]:
+        outputs = _run_outputs(run)
+        name = os.path.abspath(outputs[1])
+        params = {
+            "executable": os.fspath(executable_location),
+            "control": os.path.abspath(
+                os.path.join(run.cwd or "", run.control)
+            ),
+            "outputs": [os.path.abspath(output) for output in outputs],
+        }
+        if journal is not None and journal.completed(name, params):
+            print(f"SolarSim results for {run.history} already complete")
+            return 0
+        async with run_slots:
+            if journal is not None:
+                journal.start(name, params)
+            try:
+                returncode = await _run_ss_async(
+                    executable_location, run, read_in_slots, timeout, cache
+                )
+            except Exception as exc:
+                # one bad run does not stop the others
+                print(f"SolarSim run for {run.history} failed: {exc!r}")
+                returncode = None
+            if journal is not None:
+                # checksumming the outputs reads them in full
+                await loop.run_in_executor(
+                    None, journal.finish, name, returncode, outputs
+                )
+            return returncode
+
+    return list(await asyncio.gather(*(run_one(run) for run in runs)))
+
+
+def _run_outputs(run: SolarSimRun) -> List[str]:
+    """Return the paths to the outputs of a run, relative to the current
+    directory."""
+    # SolarSim writes its outputs relative to its working directory
+    return [
+        os.path.join(run.cwd or "", output)
+        for output in (run.summary, run.history, run.solartotals)
+    ]
+
+
+async def _run_ss_async(
+        executable_location: Union[str, PathLike],
+        run: SolarSimRun,
+        read_in_slots: asyncio.Semaphore,
+        timeout: float,
+        cache: Optional[RunCache],
+) -> Optional[int]:
+    """Run a SolarSim, holding a read in slot until it has read in."""
+    loop = asyncio.get_running_loop()
+    outputs = _run_outputs(run)
+    deadline = loop.time() + timeout
+    await read_in_slots.acquire()
+    released = False
+    p = None
+    try:
+        if run.prepare is not None:
+            run.prepare()
+        key = None
+        if cache is not None:
+            # hashing new input files takes a while, keep the loop running
+            key = await loop.run_in_executor(
+                None,
+                _cache_key,
+                cache,
+                executable_location,
+                run.control,
+                run.cwd,
+                run.history,
+            )
+            # copying a large History would stall the other runs
+            if key is not None and await loop.run_in_executor(
+                    None, cache.fetch, key, *outputs
+            ):
+                print(f"SolarSim results for {run.history} fetched from cache")
+                return 0
+        _remove_outputs(outputs)
+        p = await asyncio.create_subprocess_exec(
+            executable_location,
+            run.control,
+            run.summary,
+            run.history,
+            run.solartotals,
+            stdout=asyncio.subprocess.PIPE,
+            cwd=run.cwd,
+            **_NEW_PROCESS_GROUP,
+        )
+        print(f"SolarSim started for {run.history}")
+        line_start = b""
+        async for block in _aiter_blocks(p.stdout, deadline):
+            if released:
+                continue  # only drain the pipe
+            released, line_start = _scan_read_in(line_start, block)
+            if released:
+                read_in_slots.release()
+        await asyncio.wait_for(p.wait(), deadline - loop.time())
+        print(f"SolarSim finished for {run.history}")
+        if key is not None and p.returncode == 0:
+            await loop.run_in_executor(None, cache.store, key, *outputs)
+    except asyncio.TimeoutError:
+        print(f"SolarSim process timeout after {timeout} s for {run.history}")
+    finally:
+        if not released:
+            read_in_slots.release()
+        if p is not None and p.returncode is None:
+            _kill_group(p)
+            await p.wait()
+    return None if p is None else p.returncode
+
+
+async def _aiter_blocks(
+        stream: asyncio.StreamReader, deadline: float
+) -> AsyncIterator[bytes]:
+    """Yield the blocks read from a stream until it is closed.
+
+    Raises:
+        asyncio.TimeoutError: If the stream is still open at `deadline`, an
+            event loop time.
+    """
+    loop = asyncio.get_running_loop()
+    while True:
+        block = await asyncio.wait_for(
+            stream.read(_PIPE_READ_BYTES), deadline - loop.time()
+        )
+        if not block:
+            return
+        yield block
 
 
 def const_vel(
@@ -79,6 +492,7 @@ def const_vel(
         summary: Union[str, PathLike],
         history: Union[str, PathLike],
         solartotals: Union[str, PathLike],
+        cache: Optional[RunCache] = None,
 ) -> None:
     """Run solar sim at constant velocity `t_vel`.
 
@@ -90,6 +504,7 @@ def const_vel(
         summary: Path to write summary file.
         history: Path to write history file.
         solartotals: Path to write solartotals file.
+        cache: Cache of SolarSim results, see `run_ss`.
 
     Returns:
         None, lock is released when SolarSim have finished reading in the input
@@ -98,18 +513,28 @@ def const_vel(
     lock.acquire()  # block until SS readin complete (released in run_ss)
     write_vel(t_vel)
     print("tvel written")
-    run_ss(executable_location, control, summary, history, solartotals, lock)
+    run_ss(
+        executable_location,
+        control,
+        summary,
+        history,
+        solartotals,
+        lock,
+        cache=cache,
+    )
 
 
 def vel_sweep(
         vel_list: List[float],
-        executable_location: Union[str, PathLike] = "../SolarSim.X"
+        executable_location: Union[str, PathLike] = "../SolarSim.X",
+        cache: Optional[RunCache] = None,
 ) -> None:
     """Performs a constant velocity sweep.
 
     Args:
         vel_list: List of floats containing the velocities to run at.
         executable_location: Path to SolarSim to execute.
+        cache: Cache of SolarSim results, see `run_ss`.
 
     Returns:
         None
@@ -128,6 +553,7 @@ def vel_sweep(
             f"Summary_{v}.dat",
             f"History_{v}.dat",
             f"SolarTotals_{v}.dat",
+            cache,
         )
 
 
@@ -135,15 +561,31 @@ def vel_sweep_par(
         vel_list: List[Union[str, PathLike]],
         executable_location: Union[str, PathLike] = "../SolarSim.X",
         n_jobs: int = mp.cpu_count() - (2 * (mp.cpu_count() <= 16)),
+        max_read_ins: Optional[int] = None,
+        stage_dir: Optional[Union[str, PathLike]] = "runs",
+        cache: Optional[RunCache] = None,
+        journal: Optional[RunJournal] = None,
 ) -> None:
     """Performs a constant velocity sweep in parallel.
 
+    Each run is staged in a directory of its own under `stage_dir`, with its
+    own control and target velocity files, see
+    `S5.HPC.file_io.stage_run`, so runs read in at the same time.
+
     Args:
         vel_list: List of floats containing the velocities to run at.
         executable_location: Path to SolarSim to execute.
         n_jobs: Number of SolarSims to run in parallel, if less than 16 cpu
             (non-HPC) it will default to `number of cpu - 2`, else it will be
             the number of cpu available.
+        max_read_ins: Number of SolarSims reading in at once, see
+            `run_sweep`. Default `n_jobs` when the runs are staged, else 1.
+        stage_dir: Directory to stage the runs in. If None every run
+            shares SolarSim.in and TargetVel.dat, which is rewritten for
+            each run, so runs read in one at a time.
+        cache: Cache of SolarSim results, see `run_ss`.
+        journal: Journal of the sweep, to skip the runs completed by an
+            earlier, interrupted, call, see `run_sweep`.
 
     Returns:
         None
@@ -152,56 +594,95 @@ def vel_sweep_par(
         `S5.HPC.SolarSim.vel_sweep` : Run this function in series.
         `S5.HPC.SolarSim.read_vel_sweep` : Read the results of a velocity sweep.
     """
-    lock = mp.Manager().Lock()
-    args = []
+    runs = []
     for v in vel_list:
-        args.append((
-            lock,
-            v,
-            executable_location,
-            "SolarSim.in",
-            f"Summary_{v}.dat",
-            f"History_{v}.dat",
-            f"SolarTotals_{v}.dat",
-        ))
-
-    with mp.Pool(min(n_jobs, len(vel_list))) as pool:
-        pool.starmap(const_vel, args)
+        outputs = [
+            f"Summary_{v}.dat", f"History_{v}.dat", f"SolarTotals_{v}.dat"
+        ]
+        if stage_dir is None:
+            runs.append(
+                SolarSimRun(
+                    "SolarSim.in",
+                    *outputs,
+                    prepare=functools.partial(write_vel, v),
+                )
+            )
+            continue
+        run_dir = os.path.join(stage_dir, f"vel_{v}")
+        target_vel = os.path.join(run_dir, "TargetVel.dat")
+        os.makedirs(run_dir, exist_ok=True)
+        write_vel(v, target_vel)
+        control = stage_run(
+            "SolarSim.in", run_dir, {"TargetVelFile": target_vel}
+        )
+        runs.append(_staged_run(control, outputs, run_dir))
+    n_jobs = min(n_jobs, len(runs))
+    if max_read_ins is None:
+        max_read_ins = 1 if stage_dir is None else n_jobs
+    run_sweep(
+        runs,
+        executable_location,
+        n_jobs,
+        max_read_ins,
+        cache=cache,
+        journal=journal,
+    )
     print("SS complete.")
 
 
+def _staged_run(
+        control: str,
+        outputs: Sequence[Union[str, PathLike]],
+        run_dir: Union[str, PathLike],
+) -> SolarSimRun:
+    """Return a run of a staged control file, writing its outputs to the
+    current directory."""
+    return SolarSimRun(
+        control,
+        *(os.path.abspath(output) for output in outputs),
+        cwd=run_dir,
+    )
+
+
 def read_vel_sweep(
-        vel_list: List[float], path: Union[str, PathLike] = "./"
+        vel_list: List[float],
+        path: Union[str, PathLike] = "./",
+        n_jobs: Optional[int] = None,
 ) -> pd.DataFrame:
     """Read the set of results of vel_sweep
 
     Args:
         vel_list: List of floats containing the velocities that were ran at.
         path: Location of the history files.
+        n_jobs: Number of processes reading the history files in parallel,
+            default the number of cpu.
 
     Returns:
         Dataframe containing key results.
     """
+    summaries = SSHistory.read_many(
+        [os.path.join(path, f"History_{v}.dat") for v in vel_list],
+        reducer=SSHistory.summarise_file,
+        n_jobs=n_jobs,
+        load=False,
+    )
     result = pd.DataFrame(
-        index=range(len(vel_list)),
-        columns=[
-            "tVel",
-            "drivingTime",
-            "DistCovered",
-            "SoC",
-            "AverageVel",
-            "Vstd",
-            "SoCMax",
-            "SoCMin",
-        ],
+        {
+            "tVel": vel_list,
+            "drivingTime": summaries["driving_time"],
+            "DistCovered": summaries["dist"],
+            "SoC": summaries["soc"],
+            "AverageVel": summaries["avg_vel"],
+            "Vstd": summaries["Vstd"],
+            "SoCMax": summaries["SoCMax"],
+            "SoCMin": summaries["SoCMin"],
+        }
     )
-    for i, v in enumerate(vel_list):
-        driving_time, dist, soc, avg_vel, Vstd, SoCMax, SoCMin = read_history(
-            os.path.join(path, f"History_{v}.dat")
+    for row in result.itertuples(index=False):
+        print(
+            f"{row.tVel}\t{row.drivingTime}\t {row.DistCovered}\t{row.SoC}"
+            f"\t{row.AverageVel}\t{row.Vstd}"
         )
-        result.loc[i, :] = [v, driving_time, dist, soc, avg_vel, Vstd, SoCMax,
-                            SoCMin]
-        print(f"{v}\t{driving_time}\t {dist}\t{soc}\t{avg_vel}\t{Vstd}")
     return result
 
 
@@ -214,6 +695,7 @@ def file_swap(
         summary: Union[str, PathLike],
         history: Union[str, PathLike],
         solartotals: Union[str, PathLike],
+        cache: Optional[RunCache] = None,
 ) -> None:
     """Swap file in and run SolarSim with it.
 
@@ -230,6 +712,7 @@ def file_swap(
         summary: Path to write summary file.
         history: Path to write history file.
         solartotals: Path to write solartotals file.
+        cache: Cache of SolarSim results, see `run_ss`.
 
     Returns:
         None
@@ -240,7 +723,15 @@ def file_swap(
     lock.acquire()  # block until SS readin complete (released in run_ss)
     copyfile(filename, run_name)
     print("file swapped")
-    run_ss(executable_location, control, summary, history, solartotals, lock)
+    run_ss(
+        executable_location,
+        control,
+        summary,
+        history,
+        solartotals,
+        lock,
+        cache=cache,
+    )
 
 
 def file_sweep_par(
@@ -248,11 +739,16 @@ def file_sweep_par(
         run_name: Union[str, PathLike],
         executable_location: Union[str, PathLike] = "../SolarSim.X",
         n_jobs: int = mp.cpu_count() - (2 * (mp.cpu_count() <= 16)),
+        max_read_ins: Optional[int] = None,
+        stage_dir: Optional[Union[str, PathLike]] = "runs",
+        cache: Optional[RunCache] = None,
+        journal: Optional[RunJournal] = None,
 ) -> None:
     """Run a sweep of SolarSim with the files specified.
 
-    Sweep files by renaming each of the file in list to `run_name` and run
-    SolarSim. Block until last the SolarSim has finish read in.
+    Each run is staged in a directory of its own under `stage_dir`, with a
+    control file referring to its file in place of `run_name`, see
+    `S5.HPC.file_io.stage_run`, so runs read in at the same time.
 
     Args:
         file_list: filename to be swapped in for solarsim
@@ -261,6 +757,13 @@ def file_sweep_par(
         n_jobs: Number of SolarSims to run in parallel, if less than 16 cpu
             (non-HPC) it will default to number of cpu - 2, else it will be
             the number of cpu available.
+        max_read_ins: Number of SolarSims reading in at once, see
+            `run_sweep`. Default `n_jobs` when the runs are staged, else 1.
+        stage_dir: Directory to stage the runs in. If None each file is
+            copied to `run_name` in turn, so runs read in one at a time.
+        cache: Cache of SolarSim results, see `run_ss`.
+        journal: Journal of the sweep, to skip the runs completed by an
+            earlier, interrupted, call, see `run_sweep`.
 
     Returns:
         None
@@ -269,21 +772,33 @@ def file_sweep_par(
         S5.SolarSim.file_swap : Run this function in serial.
         S5.SolarSim.read_file_sweep : Read the results of a file sweep.
     """
-    lock = mp.Manager().Lock()
-    args = []
-    for f in file_list:
-        args.append((
-            lock,
-            f,
-            run_name,
-            executable_location,
-            "SolarSim.in",
-            f"Summary_{f}",
-            f"History_{f}",
-            f"SolarTotals_{f}",
-        ))
-    with mp.Pool(min(n_jobs, len(file_list))) as pool:
-        pool.starmap(file_swap, args)
+    runs = []
+    for i, f in enumerate(file_list):
+        outputs = [f"Summary_{f}", f"History_{f}", f"SolarTotals_{f}"]
+        if stage_dir is None:
+            runs.append(
+                SolarSimRun(
+                    "SolarSim.in",
+                    *outputs,
+                    prepare=functools.partial(copyfile, f, run_name),
+                )
+            )
+            continue
+        # numbered, files in different directories can share a name
+        run_dir = os.path.join(stage_dir, f"file_{i}_{os.path.basename(f)}")
+        control = stage_run("SolarSim.in", run_dir, {run_name: f})
+        runs.append(_staged_run(control, outputs, run_dir))
+    n_jobs = min(n_jobs, len(runs))
+    if max_read_ins is None:
+        max_read_ins = 1 if stage_dir is None else n_jobs
+    run_sweep(
+        runs,
+        executable_location,
+        n_jobs,
+        max_read_ins,
+        cache=cache,
+        journal=journal,
+    )
     print("SS complete.")
 
 
@@ -291,6 +806,7 @@ def file_sweep(
         file_list: List[Union[str, PathLike]],
         run_name: Union[str, PathLike],
         executable_location: Union[str, PathLike] = "../SolarSim.X",
+        cache: Optional[RunCache] = None,
 ) -> None:
     """Run a sweep of SolarSim with the files specified.
 
@@ -301,6 +817,7 @@ def file_sweep(
         file_list: Filenames to be swapped in for SolarSim.
         run_name: Name referenced in control file.
         executable_location: Path to SolarSim to execute.
+        cache: Cache of SolarSim results, see `run_ss`.
 
     Returns:
         None
@@ -320,11 +837,14 @@ def file_sweep(
             f"Summary_{f}",
             f"History_{f}",
             f"SolarTotals_{f}",
+            cache,
         )
 
 
 def read_file_sweep(
-        file_list: List[Union[str, PathLike]], path: Union[str, PathLike]
+        file_list: List[Union[str, PathLike]],
+        path: Union[str, PathLike],
+        n_jobs: Optional[int] = None,
 ) -> pd.DataFrame:
     """Read the set of results of file sweep.
 
@@ -332,30 +852,30 @@ def read_file_sweep(
         file_list: List of filename that was swapped in
             (e.g. tvel_60.dat for History_tvel_60.dat).
         path: Location of the files.
+        n_jobs: Number of processes reading the history files in parallel,
+            default the number of cpu.
 
     Returns:
         DataFrame containing key results.
     """
-    #  set up output dataframe
+    #  fetch the results for each file in parallel
+    summaries = SSHistory.read_many(
+        [os.path.join(path, f"History_{f}") for f in file_list],
+        reducer=SSHistory.summarise_file,
+        n_jobs=n_jobs,
+        load=False,
+    )
     result = pd.DataFrame(
-        index=range(len(file_list)),
-        columns=[
-            "file",
-            "drivingTime",
-            "DistCovered",
-            "SoC",
-            "AverageVel",
-            "SoCMax",
-            "SoCMin",
-        ],
+        {
+            "file": file_list,
+            "drivingTime": summaries["driving_time"],
+            "DistCovered": summaries["dist"],
+            "SoC": summaries["soc"],
+            "AverageVel": summaries["avg_vel"],
+            "SoCMax": summaries["SoCMax"],
+            "SoCMin": summaries["SoCMin"],
+        }
     )
-
-    #  fetch the results for each file and put it into the dataframe
-    for i, f in enumerate(file_list):
-        driving_time, dist, soc, avg_vel, Vstd, SoCMax, SoCMin = read_history(
-            os.path.join(path, f"History_{f}")
-        )
-        result.loc[i, :] = [f, driving_time, dist, soc, avg_vel, SoCMax, SoCMin]
     print(result)
     return result
 
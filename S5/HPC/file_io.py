@@ -1,5 +1,6 @@
+import ntpath
 import os
-from typing import Union
+from typing import Dict, Optional, Union
 
 import numpy as np
 import pandas as pd
@@ -42,10 +43,12 @@ def write_vel(tvel_kph: Union[pd.DataFrame, float, int], outfile=None) -> None:
     vel_file.write_tecplot(outfile)
 
 
-# TODO: to refactor as the summary method in the SSHistory class?
 def read_history(history_file_path: Union[str, os.PathLike]):
     """Read and return the summary statistics of the history file as a list.
 
+    The file is summarised in a single streaming pass by
+    `S5.Tecplot.SSHistory.summarise_file`, which also integrates the energies.
+
     Args:
         history_file_path: Path to the history file
 
@@ -53,27 +56,7 @@ def read_history(history_file_path: Union[str, os.PathLike]):
         A list for statistics in the order of
         `driving_time, dist, soc, avg_vel, Vstd, SoCMax, SoCMin`
     """
-    hist_tp = SSHistory(history_file_path)
-    # finish time in duration
-    # finish SoC
-    # check if soc reach 0
-    try:
-        [driving_time, dist, soc, avg_vel] = hist_tp.data.loc[:, ['DrivingTime(s)', 'Distance(km)', 'BatteryCharge(%)',
-                                                                  'AverageCarVel(km/h)']].iloc[-1, :].to_list()
-    except KeyError:  # to catch new history file that do not have average car vel col
-        [driving_time, dist, soc] = hist_tp.data.loc[:, ['DrivingTime(s)', 'Distance(km)', 'BatteryCharge(%)',
-                                                         ]].iloc[-1, :].to_list()
-        # recalculate average vel using data in the History file. Note that due to downsampling in History file
-        # there will be a small discrepancy between ones previously calculated in SolarSim and this one here
-        avg_vel = hist_tp.data.loc[hist_tp.data['Driving'] == 1, "CarVel(km/h)"].mean()
-
-    Vstd = np.std(hist_tp.data[hist_tp.data["Driving"] == 1].loc[:, 'CarVel(km/h)'])
-    SoCMax = hist_tp.data.loc[:, 'BatteryCharge(%)'].max()
-    SoCMin = hist_tp.data.loc[:, 'BatteryCharge(%)'].min()
-    return driving_time, dist, soc, avg_vel, Vstd, SoCMax, SoCMin
-    # planned new feature: Named tuple implementation
-    # hist_sum = namedtuple('History Summary',['driving_time', 'dist', 'soc', 'avg_vel', 'Vstd', 'SoCMax', 'SoCMin'])
-    # return hist_sum(driving_time, dist, soc, avg_vel, Vstd, SoCMax, SoCMin)
+    return tuple(SSHistory.summarise_file(history_file_path)[:7])
 
 
 def adjust_v(file: TecplotData, v_bar: float):
@@ -125,6 +108,91 @@ def lin2win(filepath: Union[str, os.PathLike]) -> None:
     input_file.write_input(filepath)
 
 
+def resolve_input(entry: str, base_dir: Union[str, os.PathLike]) -> str:
+    """Return the path to the file a control file entry refers to.
+
+    Windows paths such as ``z:\\Weather.dat`` are absolute wherever this
+    runs and are returned as they are. Relative paths are taken relative to
+    `base_dir`, with Windows separators converted on other systems.
+
+    Args:
+        entry: Path in the control file, e.g. ``..\\data\\Road.dat``.
+        base_dir: Directory relative paths are relative to.
+
+    Returns:
+        The absolute path.
+    """
+    if os.path.isabs(entry) or ntpath.isabs(entry):
+        return entry
+    if os.sep != "\\":
+        entry = entry.replace("\\", os.sep)
+    return os.path.abspath(os.path.join(base_dir, entry))
+
+
+def stage_run(
+        control: Union[str, os.PathLike],
+        run_dir: Union[str, os.PathLike],
+        inputs: Optional[Dict[str, Union[str, os.PathLike]]] = None,
+) -> str:
+    """Stage a SolarSim run in a working directory of its own.
+
+    A copy of the control file is written to the directory with every input
+    file it refers to made absolute, relative paths being taken relative to
+    the directory of `control`. Runs staged in separate directories share
+    no files that differ between them, so they can be started, and read in,
+    at the same time.
+
+    Args:
+        control: Path to the control file, e.g. SolarSim.in, shared by the
+            runs of a sweep.
+        run_dir: Working directory of the run, created if it does not exist.
+        inputs: Files of this run, e.g. its target velocity file, keyed by
+            either the name of the parameter, e.g. ``'TargetVelFile'``, the
+            entry of the control file, e.g. the `run_name` of a file sweep,
+            or the name of the file it refers to.
+
+    Returns:
+        The path of the staged control file.
+
+    Raises:
+        ValueError: If a key of `inputs` matches no input file of the
+            control file.
+
+    Examples:
+        >>> write_vel(60, "runs/vel_60/TargetVel.dat")
+        >>> stage_run(
+        >>>     "SolarSim.in",
+        >>>     "runs/vel_60",
+        >>>     {"TargetVelFile": "runs/vel_60/TargetVel.dat"},
+        >>> )
+    """
+    control_file = DSWinput(control)
+    base_dir = os.path.dirname(os.path.abspath(control))
+    params = control_file.file_params()
+    paths = {
+        param: resolve_input(value, base_dir)
+        for param, value in params.items()
+    }
+    for key, path in (inputs or {}).items():
+        key = os.fspath(key)
+        matched = [
+            param for param, value in params.items()
+            if key in (param, ntpath.basename(value))
+            or resolve_input(key, base_dir) == paths[param]
+        ]
+        if not matched:
+            raise ValueError(f"{key} is not an input file of {control}")
+        for param in matched:
+            paths[param] = os.path.abspath(path)
+    for param, path in paths.items():
+        if path != params[param]:
+            control_file.set_value(param, f'"{path}"')
+    os.makedirs(run_dir, exist_ok=True)
+    staged = os.path.abspath(os.path.join(run_dir, "SolarSim.in"))
+    control_file.write_input(staged)
+    return staged
+
+
 if __name__ == '__main__':  # pragma: no cover
     filename = "TargetVel.dat"
     tvel = 62
@@ -0,0 +1,219 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, Optional, Sequence, Union
+
+import pandas as pd
+
+_HASH_BLOCK_BYTES = 2 ** 20
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    name TEXT PRIMARY KEY,
+    params TEXT NOT NULL,
+    state TEXT NOT NULL,
+    started REAL,
+    finished REAL,
+    returncode INTEGER,
+    outputs TEXT
+)
+"""
+
+RUNNING = "running"
+"""State of a run started but not yet finished, or interrupted."""
+DONE = "done"
+"""State of a run which exited with return code 0."""
+FAILED = "failed"
+"""State of a run which exited with another return code, timed out or did
+not write all of its outputs."""
+
+
+class RunJournal:
+    """Durable record of the runs of a sweep, to resume it if interrupted.
+
+    Each run is recorded in an SQLite database, in write-ahead log mode so a
+    pre-empted job leaves it consistent, with its parameters, state, start
+    and finish times, return code and the size, modification time and
+    SHA-256 checksum of each of its outputs.
+
+    A run is complete if it finished with return code 0, with the same
+    parameters, and its outputs still have the recorded size and
+    modification time. Runs interrupted, failed or with changed or
+    truncated outputs are run again by a sweep given the same journal.
+
+    Attributes:
+        filename: Path to the journal database.
+
+    Examples:
+        >>> with RunJournal("sweep.sqlite") as journal:
+        >>>     vel_sweep_par(vel_list, "../SolarSim.X", journal=journal)
+        >>> RunJournal("sweep.sqlite").runs()
+    """
+
+    def __init__(self, filename: Union[str, os.PathLike] = "journal.sqlite"):
+        self.filename = str(filename)
+        # runs finish in executor threads of a sweep, access is serialised
+        self._lock = threading.Lock()
+        self._con = sqlite3.connect(
+            self.filename, timeout=60, check_same_thread=False
+        )
+        with self._lock, self._con:
+            self._con.execute("PRAGMA journal_mode=WAL")
+            self._con.execute(_SCHEMA)
+
+    def __enter__(self) -> "RunJournal":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Close the database."""
+        self._con.close()
+
+    def completed(self, name: str, params: Dict) -> bool:
+        """Whether a run is complete with outputs intact.
+
+        Outputs are checked against their recorded size and modification
+        time only, see `verify` to check their contents.
+
+        Args:
+            name: Name of the run.
+            params: Parameters of the run, which must equal those recorded.
+        """
+        row = self._row(name)
+        if row is None or row["state"] != DONE:
+            return False
+        if row["params"] != json.loads(json.dumps(params)):
+            return False
+        for path, record in row["outputs"].items():
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:
+                return False
+            if (stat.st_size, stat.st_mtime_ns) != (
+                    record["size"], record["mtime_ns"]
+            ):
+                return False
+        return True
+
+    def verify(self, name: str) -> bool:
+        """Whether the outputs of a completed run match their checksums.
+
+        Args:
+            name: Name of the run.
+        """
+        row = self._row(name)
+        if row is None or row["state"] != DONE:
+            return False
+        for path, record in row["outputs"].items():
+            try:
+                if _sha256(path) != record["sha256"]:
+                    return False
+            except FileNotFoundError:
+                return False
+        return True
+
+    def start(self, name: str, params: Dict) -> None:
+        """Record a run as started, replacing any earlier record of it.
+
+        Args:
+            name: Name of the run.
+            params: Parameters of the run, which must be JSON serialisable.
+        """
+        with self._lock, self._con:
+            self._con.execute(
+                "INSERT OR REPLACE INTO runs (name, params, state, started)"
+                " VALUES (?, ?, ?, ?)",
+                (name, json.dumps(params), RUNNING, time.time()),
+            )
+
+    def finish(
+            self,
+            name: str,
+            returncode: Optional[int],
+            outputs: Sequence[Union[str, os.PathLike]] = (),
+    ) -> None:
+        """Record a run as finished.
+
+        The outputs of a successful run are checksummed, which reads them in
+        full, so call this from a worker thread within an event loop.
+
+        Args:
+            name: Name of the run.
+            returncode: Return code of the run, None if it timed out.
+            outputs: Paths to the outputs of the run.
+        """
+        state = DONE if returncode == 0 else FAILED
+        records = {}
+        for path in outputs if state == DONE else ():
+            path = os.path.abspath(path)
+            try:
+                stat = os.stat(path)
+                records[path] = {
+                    "size": stat.st_size,
+                    "mtime_ns": stat.st_mtime_ns,
+                    "sha256": _sha256(path),
+                }
+            except FileNotFoundError:  # exited without writing all outputs
+                state = FAILED
+                break
+        with self._lock, self._con:
+            self._con.execute(
+                "UPDATE runs SET state = ?, finished = ?, returncode = ?,"
+                " outputs = ? WHERE name = ?",
+                (
+                    state,
+                    time.time(),
+                    returncode,
+                    json.dumps(records),
+                    name,
+                ),
+            )
+
+    def _row(self, name: str) -> Optional[Dict]:
+        with self._lock:
+            row = self._con.execute(
+                "SELECT state, params, outputs FROM runs WHERE name = ?",
+                (name,),
+            ).fetchone()
+        if row is None:
+            return None
+        return {
+            "state": row[0],
+            "params": json.loads(row[1]),
+            "outputs": json.loads(row[2] or "{}"),
+        }
+
+    def runs(self) -> pd.DataFrame:
+        """Return the recorded runs.
+
+        Returns:
+            DataFrame indexed by run name, with the state, start and finish
+            times as datetimes, duration in seconds and return code of each
+            run.
+        """
+        with self._lock:
+            runs = pd.read_sql_query(
+                "SELECT name, state, started, finished, returncode FROM runs"
+                " ORDER BY started, name",
+                self._con,
+                index_col="name",
+            )
+        runs["duration(s)"] = runs["finished"] - runs["started"]
+        for col in ["started", "finished"]:
+            # runs still running have no finish time
+            runs[col] = pd.to_datetime(runs[col].dropna(), unit="s")
+        return runs
+
+
+def _sha256(filename: Union[str, os.PathLike]) -> str:
+    """Return the SHA-256 digest of the contents of a file."""
+    digest = hashlib.sha256()
+    with open(filename, "rb") as f:
+        for block in iter(lambda: f.read(_HASH_BLOCK_BYTES), b""):
+            digest.update(block)
+    return digest.hexdigest()
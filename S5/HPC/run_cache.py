@@ -0,0 +1,227 @@
+import hashlib
+import os
+import shutil
+import tempfile
+import time
+from typing import Dict, Optional, Tuple, Union
+
+from S5.HPC.file_io import resolve_input
+from S5.Tecplot import DSWinput
+
+OUTPUT_NAMES = ("Summary.dat", "History.dat", "SolarTotals.dat")
+"""Names of the summary, history and solartotals files of a cache entry."""
+
+_HASH_BLOCK_BYTES = 2 ** 20
+# coarsest timestamp resolution of the filesystems runs are on, e.g. NFS
+_TIMESTAMP_RESOLUTION_NS = 2 * 10 ** 9
+
+
+class RunCache:
+    """Content addressed store of SolarSim results.
+
+    A run is keyed on the contents of the executable, of the control file
+    and of every input file the control file refers to, such as the
+    weather, road and target velocity files, so a run is only skipped when
+    SolarSim would be given exactly the same inputs. File names and
+    modification times are not part of the key.
+
+    The outputs of a run are copied into the cache and back out on a hit,
+    so editing an output in place never changes the cache. Entries are
+    evicted least recently used first once the cache grows past
+    `max_bytes`.
+
+    The cache directory defaults to ``runs`` in the ``S5_CACHE_DIR``
+    environment variable, falling back to ``~/.cache/S5/runs``.
+
+    Attributes:
+        cache_dir: Directory holding the cached runs.
+        max_bytes: Size limit of the cache directory in bytes, None for no
+            limit.
+
+    Examples:
+        >>> cache = RunCache("/scratch/solarsim_runs", max_bytes=50 * 2**30)
+        >>> vel_sweep_par([60, 65, 70], "../SolarSim.X", cache=cache)
+    """
+
+    def __init__(
+            self,
+            cache_dir: Union[str, os.PathLike, None] = None,
+            max_bytes: Optional[int] = 10 * 2 ** 30,
+    ):
+        if cache_dir is None:
+            cache_dir = os.path.join(
+                os.environ.get(
+                    "S5_CACHE_DIR",
+                    os.path.join(os.path.expanduser("~"), ".cache", "S5"),
+                ),
+                "runs",
+            )
+        self.cache_dir = str(cache_dir)
+        self.max_bytes = max_bytes
+        # digests of files already hashed, a sweep shares most of its inputs
+        self._digests: Dict[Tuple[str, int, int, int, int], str] = {}
+
+    def key(
+            self,
+            executable_location: Union[str, os.PathLike],
+            control: Union[str, os.PathLike],
+            cwd: Union[str, os.PathLike, None] = None,
+    ) -> str:
+        """Return the cache key of a run.
+
+        Args:
+            executable_location: Path to SolarSim to execute, or its name
+                on the ``PATH``.
+            control: Path to the control file.
+            cwd: Working directory of the run, which relative paths of the
+                control file and its input files are taken relative to,
+                default the current directory.
+
+        Returns:
+            Hex digest of the inputs of the run.
+
+        Raises:
+            FileNotFoundError: If the executable, the control file or one
+                of its input files does not exist, so the run can not be
+                keyed on their contents.
+        """
+        cwd = os.getcwd() if cwd is None else os.fspath(cwd)
+        executable = os.fspath(executable_location)
+        if not os.path.dirname(executable):
+            executable = shutil.which(executable) or executable
+        control = os.path.join(cwd, control)
+        key = hashlib.sha256()
+        key.update(self._digest(os.path.join(cwd, executable)).encode())
+        control_file = DSWinput(control)
+        params = control_file.file_params()
+        for line in control_file.lines:
+            param = line.partition("=")[0].strip()
+            if param in params:
+                path = resolve_input(params[param], cwd)
+                line = f"{param} = {self._digest(path)}"
+            key.update(line.strip().encode() + b"\n")
+        return key.hexdigest()
+
+    def _digest(self, filename: str) -> str:
+        """Return the SHA-256 digest of the contents of a file.
+
+        Digests are remembered by the status of the file, except for files
+        changed within `_TIMESTAMP_RESOLUTION_NS` of now: a file rewritten
+        in place within the timestamp resolution of its filesystem, such as
+        the target velocity file of each point of a sweep, may keep its
+        status.
+        """
+        stat = os.stat(filename)
+        ident = (
+            os.path.abspath(filename),
+            stat.st_ino,
+            stat.st_size,
+            stat.st_mtime_ns,
+            stat.st_ctime_ns,
+        )
+        if ident in self._digests:
+            return self._digests[ident]
+        digest = hashlib.sha256()
+        with open(filename, "rb") as f:
+            for block in iter(lambda: f.read(_HASH_BLOCK_BYTES), b""):
+                digest.update(block)
+        changed = max(stat.st_mtime_ns, stat.st_ctime_ns)
+        if time.time_ns() - changed > _TIMESTAMP_RESOLUTION_NS:
+            self._digests[ident] = digest.hexdigest()
+        return digest.hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, key)
+
+    def __contains__(self, key: str) -> bool:
+        return os.path.isdir(self._path(key))
+
+    def fetch(
+            self,
+            key: str,
+            summary: Union[str, os.PathLike],
+            history: Union[str, os.PathLike],
+            solartotals: Union[str, os.PathLike],
+    ) -> bool:
+        """Copy the outputs of a cached run into place.
+
+        Existing files at the output paths are replaced.
+
+        Returns:
+            True if the run was in the cache.
+        """
+        path = self._path(key)
+        try:
+            # mark as recently used for eviction
+            os.utime(path)
+            for name, output in zip(
+                    OUTPUT_NAMES, (summary, history, solartotals)
+            ):
+                _copy(os.path.join(path, name), output)
+        except FileNotFoundError:  # not cached, or evicted meanwhile
+            return False
+        return True
+
+    def store(
+            self,
+            key: str,
+            summary: Union[str, os.PathLike],
+            history: Union[str, os.PathLike],
+            solartotals: Union[str, os.PathLike],
+    ) -> None:
+        """Store the outputs of a run and evict old entries if needed."""
+        path = self._path(key)
+        os.makedirs(self.cache_dir, exist_ok=True)
+        # fill then rename so concurrent readers never see a partial entry
+        tmp_path = tempfile.mkdtemp(suffix=".tmp", dir=self.cache_dir)
+        try:
+            for name, output in zip(
+                    OUTPUT_NAMES, (summary, history, solartotals)
+            ):
+                _copy(output, os.path.join(tmp_path, name))
+            os.rename(tmp_path, path)
+        except OSError:
+            shutil.rmtree(tmp_path, ignore_errors=True)
+            if not os.path.isdir(path):
+                raise
+            # stored by another process meanwhile
+        self.evict()
+
+    def evict(self) -> None:
+        """Remove least recently used entries until under `max_bytes`."""
+        if self.max_bytes is None:
+            return
+        entries = []
+        for entry in os.scandir(self.cache_dir):
+            if entry.name.endswith(".tmp") or not entry.is_dir():
+                continue
+            try:
+                size = sum(f.stat().st_size for f in os.scandir(entry.path))
+                entries.append((entry.stat().st_mtime, size, entry.path))
+            except FileNotFoundError:  # evicted by another process
+                pass
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            shutil.rmtree(path, ignore_errors=True)
+            total -= size
+
+    def clear(self) -> None:
+        """Remove every entry in the cache."""
+        if not os.path.isdir(self.cache_dir):
+            return
+        for entry in os.scandir(self.cache_dir):
+            if entry.is_dir():
+                shutil.rmtree(entry.path, ignore_errors=True)
+
+
+def _copy(src: Union[str, os.PathLike], dst: Union[str, os.PathLike]) -> None:
+    """Copy `src` to `dst`, replacing `dst` only once the copy is whole."""
+    tmp_dst = f"{os.fspath(dst)}.{os.getpid()}.tmp"
+    try:
+        shutil.copyfile(src, tmp_dst)
+        os.replace(tmp_dst, dst)
+    finally:
+        if os.path.exists(tmp_dst):
+            os.remove(tmp_dst)
@@ -1,19 +1,999 @@
 """Represents files used in SolarSim."""
+import bz2
+import concurrent.futures
+import copy
+import functools
+import gzip
+import hashlib
 import io
+import itertools
+import json
+import locale
 import logging
+import lzma
+import numbers
 import os
 import pathlib
 import re
 import warnings
-from typing import Union
-
+import zlib
+from typing import (
+    BinaryIO,
+    Callable,
+    Dict,
+    Iterator,
+    List,
+    NamedTuple,
+    Optional,
+    Sequence,
+    TextIO,
+    Tuple,
+    Union,
+    get_type_hints,
+)
+
+import numpy as np
 import pandas as pd
+import pyarrow as pa
+from pyarrow import csv as pa_csv
+from pyarrow import parquet as pq
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover
+    zstandard = None
 
 logger = logging.getLogger(__name__)
 null_handler = logging.NullHandler()
 logger.addHandler(null_handler)
 
 
+READ_ENGINES = ("pandas", "numpy", "pyarrow")
+"""Engines available to parse the body of a Tecplot file."""
+
+READ_CHUNKSIZE = 100_000
+"""Default number of rows parsed at a time when reading in chunks."""
+
+Filters = Dict[str, Tuple[Optional[float], Optional[float]]]
+"""Inclusive ``(min, max)`` bounds on columns used to select rows."""
+
+SCHEMAS = {
+    "history": {
+        "DayAndTime(s)": "float64",
+        "DDHHMMSS": "int32",
+        "DrivingTime(s)": "float64",
+        "Distance(km)": "float64",
+        "Lap": "uint16",
+        "Driving": "uint8",
+        "ArrayOn": "uint8",
+        "ArrayOnStand": "uint8",
+        "NCellsShaded": "int32",
+    },
+    "weather": {
+        "Day": "int16",
+        "Time(HHMM)": "int16",
+        "Distance(km)": "float64",
+    },
+    "road": {
+        "Distance(km)": "float64",
+        "Latitude": "float64",
+        "Longitude": "float64",
+    },
+    "target_velocity": {
+        "Distance(km)": "float64",
+    },
+}
+"""Compact dtypes of the columns of known files.
+
+Columns not listed, the physical quantities, are read as float32. Time and
+distance axes stay float64 as float32 cannot resolve seconds over a race or
+metres over its length.
+"""
+
+_SCHEMA_DEFAULT = "float32"
+
+PRECISIONS = {
+    "history": {
+        "DayAndTime(s)": 1,
+        "DDHHMMSS": 0,
+        "DrivingTime(s)": 1,
+        "DrivingTime(h)": 4,
+        "Distance(km)": 4,
+        "Distance(miles)": 4,
+        "Lap": 0,
+        "DistanceWithinLap(km)": 4,
+        "Driving": 0,
+        "ArrayOn": 0,
+        "ArrayOnStand": 0,
+        "CarVel(m/s)": 3,
+        "CarVel(km/h)": 3,
+        "CarVel(mph)": 3,
+        "NCellsShaded": 0,
+        "BatteryCharge(%)": 4,
+    },
+    "weather": {
+        "Day": 0,
+        "Time(HHMM)": 0,
+        "Distance(km)": 3,
+        "DirectSun(W/m2)": 1,
+        "DiffuseSun(W/m2)": 1,
+        "SunAzimuth(deg)": 1,
+        "SunElevation(deg)": 1,
+        "AirTemp(degC)": 1,
+        "AirPress(Pa)": 0,
+        "WindVel(m/s)": 2,
+        "WindDir(deg)": 1,
+    },
+    "road": {
+        "Distance(km)": 4,
+        "Altitude(m)": 2,
+        "Heading(deg)": 2,
+        "SpeedLimit(km/h)": 0,
+        "Latitude": 6,
+        "Longitude": 6,
+    },
+    "target_velocity": {
+        "Distance(km)": 4,
+        "TargetVel(km/h)": 3,
+    },
+}
+"""Decimal places the columns of known files are written with.
+
+The precisions are those the quantities are measured or used to, e.g. a
+tenth of a degree for the sun position and about 10 cm for positions.
+Columns not listed are written at full precision.
+"""
+
+_KM_PER_MILE = 1.609344
+
+DERIVED_COLUMNS = {
+    "history": {
+        "DrivingTime(h)": ("DrivingTime(s)", 1 / 3600),
+        "Distance(miles)": ("Distance(km)", 1 / _KM_PER_MILE),
+        "CarVel(m/s)": ("CarVel(km/h)", 1 / 3.6),
+        "CarVel(mph)": ("CarVel(km/h)", 1 / _KM_PER_MILE),
+    },
+}
+"""Columns of known files that are another column in different units.
+
+Each is mapped to the ``(column, factor)`` it is computed from. See
+``SSHistory(lazy_derived=True)``.
+"""
+
+WRITE_ENGINES = ("pandas", "chunked")
+"""Engines available to format the body of a Tecplot file."""
+
+WRITE_CHUNKSIZE = 100_000
+"""Default number of rows formatted at a time by the chunked writer."""
+
+COMPRESSIONS = ("gzip", "bz2", "xz", "zstd")
+"""Compression formats handled when reading and writing files."""
+
+_COMPRESSION_EXTENSIONS = {
+    ".gz": "gzip",
+    ".bz2": "bz2",
+    ".xz": "xz",
+    ".zst": "zstd",
+}
+_COMPRESSION_MAGIC = {
+    b"\x1f\x8b": "gzip",
+    b"BZh": "bz2",
+    b"\xfd7zXZ\x00": "xz",
+    b"\x28\xb5\x2f\xfd": "zstd",
+}
+# raised by corrupt compressed files, besides OSError and EOFError
+_DECOMPRESSION_ERRORS = (zlib.error, lzma.LZMAError) + (
+    () if zstandard is None else (zstandard.ZstdError,)
+)
+
+_TITLE_RE = re.compile("Title = (.+)")
+_VARIABLES_RE = re.compile("Variables = (.+)")
+_PRESSURE_TEMP_RE = re.compile(r"#PAtm\(Pa\) TAtm\(K\)= (.+)")
+_DATUM_RE = re.compile("#Datums= (.+)")
+_ZONE_RE = re.compile("Zone .+")
+_INPUT_PARAM_RE = re.compile(r"\s*([^=]+?)\s*=\s*(.+)")
+
+_CACHE_METADATA_KEY = b"S5.tecplot"
+
+# Zone lines are found by scanning the raw bytes for this marker.
+_ZONE_MARKER = b"\nZone "
+_ZONE_SCAN_BYTES = 16 * 2 ** 20
+_ZONE_INDEX_SUFFIX = ".zidx"
+
+# Same encoding as the text mode ``open`` used when writing the files.
+_ENCODING = locale.getpreferredencoding(False)
+
+# Bytes up to and including space are treated as column separators in the
+# body of a Tecplot file, apart from the newline which separates rows.
+_SPACE = ord(" ")
+_NEWLINE = ord("\n")
+
+
+def _decode(line: bytes) -> str:
+    """Decode a header line read in binary mode."""
+    return line.decode(_ENCODING).rstrip("\r\n")
+
+
+def _infer_compression(
+        filename: Union[str, os.PathLike], mode: str
+) -> Optional[str]:
+    """Return the compression of a file, None if it is not compressed.
+
+    Files being read are identified by their magic bytes, so a compressed
+    file is read correctly whatever its name. Files being written are
+    compressed according to their extension.
+    """
+    if "r" in mode:
+        with open(filename, "rb") as f:
+            head = f.read(6)
+        for magic, compression in _COMPRESSION_MAGIC.items():
+            if head.startswith(magic):
+                return compression
+        return None
+    extension = os.path.splitext(os.fspath(filename))[1].lower()
+    return _COMPRESSION_EXTENSIONS.get(extension)
+
+
+def _open(
+        filename: Union[str, os.PathLike],
+        mode: str = "rb",
+        compression: Optional[str] = "infer",
+):
+    """Open a file that may be compressed.
+
+    Compressed files are decompressed as they are read, so the parsers
+    never hold more than a buffer of compressed data. zstd files are
+    written with a compressor thread per core.
+
+    Args:
+        filename: Path to the file.
+        mode: One of ``'rb'``, ``'r'`` or ``'w'``.
+        compression: One of ``COMPRESSIONS``, None for an uncompressed file
+            or ``'infer'`` (default) to detect it, see `_infer_compression`.
+
+    Returns:
+        File object, binary or text according to `mode`.
+    """
+    if compression == "infer":
+        compression = _infer_compression(filename, mode)
+    if compression is None:
+        return open(filename, mode)
+    if compression not in COMPRESSIONS:
+        raise ValueError(
+            f"compression should be one of {COMPRESSIONS}, got {compression}"
+        )
+    text = "b" not in mode
+    if compression == "zstd":
+        if zstandard is None:
+            raise ImportError(
+                "zstd compressed files need the zstandard package, install "
+                "it with `pip install S5[compress]`."
+            )
+        if "w" in mode:
+            return zstandard.open(
+                filename,
+                "wt",
+                cctx=zstandard.ZstdCompressor(threads=-1),
+            )
+        f = io.BufferedReader(_ForwardSeekReader(zstandard.open(filename)))
+        return io.TextIOWrapper(f) if text else f
+    if text:
+        mode += "t"
+    if compression == "gzip":
+        # zlib's default level, much faster to write than gzip's 9
+        return gzip.open(filename, mode, compresslevel=6)
+    if compression == "bz2":
+        return bz2.open(filename, mode)
+    return lzma.open(filename, mode)
+
+
+class _ForwardSeekReader(io.RawIOBase):
+    """Reader for streams that can only seek forward, such as zstd.
+
+    Seeking forward reads and discards the bytes in between, which is what
+    the zone index needs to jump to a zone.
+    """
+
+    def __init__(self, raw):
+        super().__init__()
+        self._raw = raw
+        self._position = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def tell(self) -> int:
+        return self._position
+
+    def readinto(self, buffer) -> int:
+        size = self._raw.readinto(buffer)
+        self._position += size
+        return size
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        if whence == io.SEEK_CUR:
+            offset += self._position
+        elif whence != io.SEEK_SET:
+            raise io.UnsupportedOperation("Can only seek from the start.")
+        if offset < self._position:
+            raise io.UnsupportedOperation("Can only seek forward.")
+        while self._position < offset:
+            skipped = self._raw.read(min(offset - self._position, 2 ** 20))
+            if not skipped:
+                break
+            self._position += len(skipped)
+        return self._position
+
+    def close(self) -> None:
+        self._raw.close()
+        super().close()
+
+
+def _resolve_dtypes(
+        dtype, schema: Optional[str], variables: List[str]
+) -> Optional[Dict[str, np.dtype]]:
+    """Return the dtype of each variable asked for by a read.
+
+    Args:
+        dtype: The `dtype` argument of `TecplotData.readfile`.
+        schema: Name of the schema of the class being read, used for
+            ``'compact'``.
+        variables: Column names.
+
+    Returns:
+        Mapping of column name to dtype, None to keep the dtypes of the
+        engine.
+    """
+    if dtype is None:
+        return None
+    if isinstance(dtype, dict):
+        missing = set(dtype) - set(variables)
+        if missing:
+            raise KeyError(f"{sorted(missing)} not in the file variables.")
+        return {var: np.dtype(dtype[var]) for var in variables if var in dtype}
+    if isinstance(dtype, str) and dtype == "compact":
+        dtype = schema or _SCHEMA_DEFAULT
+    if isinstance(dtype, str) and dtype in SCHEMAS:
+        declared = SCHEMAS[dtype]
+        return {
+            var: np.dtype(declared.get(var, _SCHEMA_DEFAULT))
+            for var in variables
+        }
+    try:
+        dtype = np.dtype(dtype)
+    except TypeError as exc:
+        raise ValueError(
+            f"dtype should be 'compact', one of {tuple(SCHEMAS)}, a dtype "
+            f"or a dict of dtypes, got {dtype}"
+        ) from exc
+    return {var: dtype for var in variables}
+
+
+def _parse_dtype(dtype: np.dtype) -> np.dtype:
+    """Return the float dtype text is parsed into before a cast to dtype.
+
+    Values are parsed as float so that e.g. ``1.0`` in a flag column is
+    accepted.
+    """
+    if dtype == np.float32:
+        return dtype
+    return np.dtype(np.float64)
+
+
+def _cast(
+        data: pd.DataFrame, dtypes: Optional[Dict[str, np.dtype]]
+) -> pd.DataFrame:
+    """Cast the columns of data that are not yet of the given dtypes."""
+    if not dtypes:
+        return data
+    cast = {
+        col: dtype
+        for col, dtype in dtypes.items()
+        if col in data.columns and data[col].dtype != dtype
+    }
+    if not cast:
+        return data
+    return data.astype(cast)
+
+
+def _read_body(
+        f: BinaryIO,
+        variables: List[str],
+        engine: str,
+        columns: Optional[Sequence[str]] = None,
+        filters: Optional[Filters] = None,
+        dtypes: Optional[Dict[str, np.dtype]] = None,
+) -> pd.DataFrame:
+    """Parse the whitespace separated body of a Tecplot file.
+
+    Args:
+        f: File opened in binary mode, positioned at the start of the data.
+        variables: Column names.
+        engine: One of ``READ_ENGINES``.
+        columns: Columns to load, default all of them.
+        filters: Mapping of column name to inclusive ``(min, max)`` bounds,
+            either bound may be None. Rows outside the bounds are dropped.
+        dtypes: Dtype of each column, see `_resolve_dtypes`.
+
+    Returns:
+        DataFrame holding the data.
+    """
+    filters = filters or {}
+    usecols = _usecols(variables, columns, filters)
+    # filtered and cast reads are parsed in chunks so rejected rows are
+    # dropped and columns shrunk early, apart from pyarrow which works on
+    # the Arrow table before conversion
+    chunksize = (
+        READ_CHUNKSIZE
+        if (filters or dtypes) and engine != "pyarrow"
+        else None
+    )
+    chunks = list(
+        _iter_body(f, variables, engine, chunksize, usecols, filters, dtypes)
+    )
+    if not chunks:
+        # every row was filtered out
+        data = pd.DataFrame(np.empty((0, len(usecols))), columns=usecols)
+        data = _cast(data, dtypes)
+    elif len(chunks) == 1:
+        data = chunks[0].reset_index(drop=True)
+    else:
+        data = pd.concat(chunks, ignore_index=True)
+    if columns is not None:
+        data = data.loc[:, list(columns)]
+    return data
+
+
+def _read_block(
+        f: BinaryIO,
+        variables: List[str],
+        n_points: int,
+        columns: Optional[Sequence[str]] = None,
+        filters: Optional[Filters] = None,
+        dtypes: Optional[Dict[str, np.dtype]] = None,
+) -> pd.DataFrame:
+    """Parse the body of a BLOCK packed Tecplot file.
+
+    All the values of the first variable come first, then all the values of
+    the second and so on, regardless of how they are split over lines. Each
+    variable is parsed straight into a contiguous column of the DataFrame.
+
+    Args:
+        f: File opened in binary mode, positioned at the start of the data.
+        variables: Column names.
+        n_points: Number of values per variable, I * J * K.
+        columns: Columns to load, default all of them.
+        filters: Bounds to select rows by, see `_read_body`.
+        dtypes: Dtype of each column, see `_resolve_dtypes`.
+
+    Returns:
+        DataFrame holding the data.
+    """
+    filters = filters or {}
+    usecols = _usecols(variables, columns, filters)
+    tokens = f.read().split()
+    if len(tokens) != n_points * len(variables):
+        raise SyntaxError(
+            f"Expected {n_points * len(variables)} values of BLOCK data but "
+            f"found {len(tokens)}."
+        )
+    try:
+        values = np.array(tokens, dtype=np.float64)
+    except ValueError as exc:
+        raise SyntaxError("Non numeric value in BLOCK data.") from exc
+    values = values.reshape(len(variables), n_points)
+    if len(usecols) != len(variables):
+        values = values[[variables.index(var) for var in usecols]]
+    # the transpose is a view, pandas keeps the (variable, point) layout
+    data = pd.DataFrame(values.T, columns=usecols)
+    if filters:
+        data = _apply_filters(data, filters).reset_index(drop=True)
+    if columns is not None:
+        data = data.loc[:, list(columns)]
+    return _cast(data, dtypes)
+
+
+def _usecols(
+        variables: List[str],
+        columns: Optional[Sequence[str]],
+        filters: Filters,
+) -> List[str]:
+    """Return the variables, in file order, needed to serve a read."""
+    if columns is None:
+        return list(variables)
+    needed = set(columns) | set(filters)
+    missing = needed - set(variables)
+    if missing:
+        raise KeyError(f"{sorted(missing)} not in the file variables.")
+    return [var for var in variables if var in needed]
+
+
+def _iter_body(
+        f: BinaryIO,
+        variables: List[str],
+        engine: str,
+        chunksize: Optional[int],
+        usecols: List[str],
+        filters: Filters,
+        dtypes: Optional[Dict[str, np.dtype]] = None,
+) -> Iterator[pd.DataFrame]:
+    """Parse the body chunk by chunk.
+
+    Only the columns in `usecols` are converted, into `dtypes` if given.
+    With `chunksize` None the whole body is returned as a single chunk.
+    Chunks are indexed by their row number within the body and always hold
+    at least one row, unless the whole body is returned as one chunk.
+    """
+    if engine == "pandas":
+        reader = pd.read_csv(
+            f,
+            index_col=False,
+            sep=r"\s+",
+            names=variables,
+            usecols=usecols,
+            chunksize=chunksize,
+            # a dtype for every column also skips type inference
+            dtype=None if dtypes is None else {
+                col: _parse_dtype(dtype) for col, dtype in dtypes.items()
+            },
+        )
+        if chunksize is None:
+            yield _cast(_apply_filters(reader, filters), dtypes)
+            return
+        with reader:
+            for chunk in reader:
+                chunk = _apply_filters(chunk, filters)
+                if chunk.shape[0] > 0:
+                    yield _cast(chunk, dtypes)
+        return
+    if chunksize is None:
+        yield _parse_lines(
+            f, variables, engine, usecols, filters, 0, dtypes
+        )[0]
+        return
+    start = 0
+    while True:
+        lines = list(itertools.islice(f, chunksize))
+        if not lines:
+            return
+        chunk, n_rows = _parse_lines(
+            lines, variables, engine, usecols, filters, start, dtypes
+        )
+        start += n_rows
+        if chunk.shape[0] > 0:
+            yield chunk
+
+
+def _parse_lines(
+        lines: Union[BinaryIO, List[bytes]],
+        variables: List[str],
+        engine: str,
+        usecols: List[str],
+        filters: Filters,
+        start: int,
+        dtypes: Optional[Dict[str, np.dtype]] = None,
+) -> Tuple[pd.DataFrame, int]:
+    """Parse lines of the body with the numpy or pyarrow engine.
+
+    Returns:
+        The filtered rows indexed from `start`, and the number of rows
+        parsed before filtering.
+    """
+    if engine == "pyarrow":
+        if isinstance(lines, list):
+            body = b"".join(lines)
+        else:
+            body = lines.read()
+        body = _squeeze_whitespace(body)
+        if len(body) == 0:
+            empty = pd.DataFrame(np.empty((0, len(usecols))), columns=usecols)
+            return _cast(empty, dtypes), 0
+        dtypes = dtypes or {}
+        table = pa_csv.read_csv(
+            pa.BufferReader(body),
+            read_options=pa_csv.ReadOptions(column_names=variables),
+            parse_options=pa_csv.ParseOptions(delimiter=" "),
+            convert_options=pa_csv.ConvertOptions(
+                column_types={
+                    var: pa.from_numpy_dtype(
+                        _parse_dtype(dtypes.get(var, np.float64))
+                    )
+                    for var in usecols
+                },
+                include_columns=usecols,
+            ),
+        )
+        if filters:
+            mask = _filter_mask(table, filters)
+            data = table.filter(pa.array(mask)).to_pandas()
+            data.index = np.flatnonzero(mask) + start
+        else:
+            data = table.to_pandas()
+            data.index = pd.RangeIndex(start, start + table.num_rows)
+        return _cast(data, dtypes), table.num_rows
+
+    indices = [variables.index(var) for var in usecols]
+    if len(indices) == len(variables):
+        # read everything so that the number of columns can be checked
+        indices = None
+    with warnings.catch_warnings():
+        # an empty body is a valid (if unusual) file
+        warnings.filterwarnings("ignore", "loadtxt: input contained no")
+        values = np.loadtxt(lines, dtype=np.float64, ndmin=2, usecols=indices)
+    if values.size == 0:
+        values = values.reshape(0, len(usecols))
+    if values.shape[1] != len(usecols):
+        raise SyntaxError(
+            f"Expected {len(variables)} columns of data but found "
+            f"{values.shape[1]}."
+        )
+    data = pd.DataFrame(
+        values,
+        columns=usecols,
+        index=pd.RangeIndex(start, start + values.shape[0]),
+    )
+    return _cast(_apply_filters(data, filters), dtypes), values.shape[0]
+
+
+def _apply_filters(data: pd.DataFrame, filters: Filters) -> pd.DataFrame:
+    """Return the rows of data within the inclusive bounds of filters."""
+    if not filters:
+        return data
+    return data[_filter_mask(data, filters)]
+
+
+def _filter_mask(
+        data: Union[pd.DataFrame, pa.Table], filters: Filters
+) -> np.ndarray:
+    """Return a boolean mask of the rows within the bounds of filters."""
+    mask = np.ones(len(data), dtype=bool)
+    for col, (lower, upper) in filters.items():
+        values = np.asarray(data[col])
+        if lower is not None:
+            mask &= values >= lower
+        if upper is not None:
+            mask &= values <= upper
+    return mask
+
+
+def _write_body(
+        f: TextIO,
+        data: pd.DataFrame,
+        engine: str,
+        chunksize: int,
+        decimals: Optional[Dict[str, int]] = None,
+) -> None:
+    """Write the data as the whitespace separated body of a Tecplot file.
+
+    Args:
+        f: File opened in text mode, positioned after the zone line.
+        data: Data to write.
+        engine: One of ``WRITE_ENGINES``.
+        chunksize: Rows per chunk for the ``'chunked'`` engine.
+        decimals: Decimal places to round columns to before they are
+            formatted, see `_resolve_precision`.
+    """
+    if decimals:
+        decimals = {
+            col: places for col, places in decimals.items()
+            if col in data.columns
+        }
+    if engine == "pandas":
+        formatters = None
+        if decimals:
+            data = _round(data, decimals)
+            # fixed formats are much faster than to_string trimming the
+            # trailing zeros of the rounded values
+            formatters = {
+                col: _float_formatter(places)
+                for col, places in decimals.items()
+                if places > 0 and data[col].dtype.kind == "f"
+            }
+        data.to_string(
+            f, header=False, index=False, col_space=6, formatters=formatters
+        )
+        return
+    if decimals:
+        # round chunk by chunk to keep memory flat
+        for start in range(0, data.shape[0], chunksize):
+            _write_body(
+                f, _round(data.iloc[start:start + chunksize], decimals),
+                engine, chunksize,
+            )
+        return
+    data.to_csv(
+        f,
+        sep=" ",
+        na_rep="NaN",
+        header=False,
+        index=False,
+        lineterminator="\n",
+        chunksize=chunksize,
+    )
+
+
+def _resolve_precision(
+        precision, schema: Optional[str], variables: List[str]
+) -> Optional[Dict[str, int]]:
+    """Return the decimal places of each variable asked for by a write.
+
+    Args:
+        precision: The `precision` argument of `TecplotData.write_tecplot`.
+        schema: Name of the schema of the class being written, used for
+            ``'compact'``.
+        variables: Column names.
+
+    Returns:
+        Mapping of column name to decimal places, None to write every
+        column at full precision.
+    """
+    if precision is None:
+        return None
+    if isinstance(precision, dict):
+        missing = set(precision) - set(variables)
+        if missing:
+            raise KeyError(f"{sorted(missing)} not in the data columns.")
+        return {
+            var: int(precision[var]) for var in variables if var in precision
+        }
+    if isinstance(precision, str) and precision == "compact":
+        if schema is None:
+            raise ValueError(
+                "precision 'compact' needs a class with a schema, e.g. "
+                "SSWeather, pass the name of a schema instead"
+            )
+        precision = schema
+    if isinstance(precision, str) and precision in PRECISIONS:
+        declared = PRECISIONS[precision]
+        return {var: declared[var] for var in variables if var in declared}
+    if isinstance(precision, numbers.Integral):
+        return {var: int(precision) for var in variables}
+    raise ValueError(
+        f"precision should be 'compact', one of {tuple(PRECISIONS)}, an int "
+        f"or a dict of ints, got {precision}"
+    )
+
+
+def _float_formatter(places: int) -> Callable[[float], str]:
+    """Return a formatter of floats to a number of decimal places."""
+
+    def formatter(value: float) -> str:
+        if np.isnan(value):
+            return "NaN"
+        return f"{value:.{places}f}"
+
+    return formatter
+
+
+def _round(data: pd.DataFrame, decimals: Dict[str, int]) -> pd.DataFrame:
+    """Round float columns, writing those of no decimal places as integers.
+
+    Columns holding NaN are left as floats.
+    """
+    data = data.copy()
+    for col, places in decimals.items():
+        values = data[col].to_numpy()
+        if values.dtype.kind != "f":
+            continue
+        values = np.round(values, places)
+        if places <= 0 and np.isfinite(values).all():
+            values = values.astype(np.int64)
+        data[col] = values
+    return data
+
+
+def _squeeze_whitespace(body: bytes) -> bytes:
+    """Reduce whitespace padding in the body to single space delimiters.
+
+    Tecplot files are padded for alignment, which single character delimited
+    parsers such as pyarrow's CSV reader cannot handle. Leading and trailing
+    whitespace on each line is dropped and runs of whitespace collapsed, all
+    as vectorised operations on the raw bytes.
+    """
+    raw = np.frombuffer(body, dtype=np.uint8)
+    if raw.size == 0:
+        return body
+    # collapse each run of whitespace into its first byte, dropping the run
+    # entirely at the start of a line
+    separator = raw <= _SPACE
+    space = separator & (raw != _NEWLINE)
+    after_sep = np.empty_like(space)
+    after_sep[0] = True
+    after_sep[1:] = separator[:-1]
+    keep = ~(space & after_sep)
+    squeezed = raw[keep]
+    space = space[keep]
+    # then drop what is left of the trailing whitespace on each line
+    before_newline = np.ones_like(space)
+    before_newline[:-1] = squeezed[1:] == _NEWLINE
+    keep = ~(space & before_newline)
+    squeezed = squeezed[keep]
+    squeezed[space[keep]] = _SPACE
+    return squeezed.tobytes()
+
+
+class ZoneIndexEntry(NamedTuple):
+    """Location of a zone within a Tecplot file.
+
+    Attributes:
+        title: Title of the zone, the ``T`` parameter of the zone line.
+        zone: The zone line.
+        offset: Byte offset of the start of the zone line.
+        data_offset: Byte offset of the start of the zone data.
+        end: Byte offset of the end of the zone data.
+    """
+
+    title: str
+    zone: str
+    offset: int
+    data_offset: int
+    end: int
+
+
+def zone_index(
+        filename: Union[str, os.PathLike], persist: bool = False
+) -> List[ZoneIndexEntry]:
+    """Return the byte offsets of each zone in a Tecplot file.
+
+    The file is scanned once for zone lines without parsing any data, the
+    index is then kept in memory for as long as the file is unchanged. With
+    `persist` it is also saved next to the file (``<filename>.zidx``) so
+    that other processes can skip the scan.
+
+    Args:
+        filename: Path to datafile in Tecplot format.
+        persist: Save the index to ``<filename>.zidx``. A saved index is
+            always used if it matches the size and modification time of
+            the file.
+
+    Returns:
+        List of the zones in the order they appear in the file.
+
+    Examples:
+        >>> [entry.title for entry in zone_index("Weather.dat")]
+        ['member 0', 'member 1', 'member 2']
+    """
+    filename = os.fspath(filename)
+    stat = os.stat(filename)
+    sidecar = filename + _ZONE_INDEX_SUFFIX
+    try:
+        with open(sidecar, "r") as f:
+            saved = json.load(f)
+        if (saved["size"], saved["mtime_ns"]) == (
+                stat.st_size,
+                stat.st_mtime_ns,
+        ):
+            return [ZoneIndexEntry(*entry) for entry in saved["zones"]]
+    except (OSError, ValueError, KeyError, TypeError):
+        pass
+    index = list(
+        _scan_zones(os.path.abspath(filename), stat.st_size, stat.st_mtime_ns)
+    )
+    if persist:
+        saved = {
+            "size": stat.st_size,
+            "mtime_ns": stat.st_mtime_ns,
+            "zones": [list(entry) for entry in index],
+        }
+        # write then rename so concurrent readers never see a partial index
+        tmp_path = f"{sidecar}.{os.getpid()}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(saved, f)
+        os.replace(tmp_path, sidecar)
+    return index
+
+
+@functools.lru_cache(maxsize=64)
+def _scan_zones(
+        filename: str, size: int, mtime_ns: int
+) -> Tuple[ZoneIndexEntry, ...]:
+    """Scan a file for zone lines in a single forward pass.
+
+    Offsets are within the decompressed data of compressed files. The size
+    and modification time are only used as part of the key of the in memory
+    cache.
+    """
+    zones = []  # (offset, zone line, data offset) of each zone
+    with _open(filename) as f:
+        buffer = b""
+        base = 0  # offset of buffer[0] within the file
+        while True:
+            block = f.read(_ZONE_SCAN_BYTES)
+            buffer += block
+            position = 0
+            while True:
+                found = buffer.find(_ZONE_MARKER, position)
+                if found == -1:
+                    # keep the end of the buffer to catch split markers
+                    position = max(
+                        position, len(buffer) - len(_ZONE_MARKER) + 1
+                    )
+                    break
+                eol = buffer.find(b"\n", found + 1)
+                if eol == -1:
+                    if block:
+                        # the zone line continues in the next block
+                        position = found
+                        break
+                    eol = len(buffer) - 1
+                line = buffer[found + 1:eol + 1]
+                zones.append((base + found + 1, line, base + eol + 1))
+                # the newline ending the zone line may start the next marker
+                position = eol
+            if not block:
+                end = base + len(buffer)
+                break
+            buffer = buffer[position:]
+            base += position
+    index = []
+    for i, (offset, line, data_offset) in enumerate(zones):
+        line = _decode(line)
+        try:
+            title = TPHeaderZone(line).zonetitle
+        except AttributeError as exc:
+            raise SyntaxError(
+                f"Tecplot file {filename} bad zone line: {line}"
+            ) from exc
+        zone_end = zones[i + 1][0] if i + 1 < len(zones) else end
+        index.append(
+            ZoneIndexEntry(title, line, offset, data_offset, zone_end)
+        )
+    if not index:
+        raise SyntaxError(f"Tecplot file {filename} missing zone data\n")
+    return tuple(index)
+
+
+def _find_zone(
+        index: List[ZoneIndexEntry], zone: Union[int, str]
+) -> ZoneIndexEntry:
+    """Return the entry of a zone by number or title."""
+    if isinstance(zone, str):
+        for entry in index:
+            if entry.title == zone:
+                return entry
+        raise KeyError(f"No zone titled {zone!r}.")
+    try:
+        return index[zone]
+    except IndexError as exc:
+        raise IndexError(
+            f"Zone {zone} out of range, the file has {len(index)} zones."
+        ) from exc
+
+
+class _BoundedReader(io.RawIOBase):
+    """Read from a binary file up to a byte offset.
+
+    Used to hand the data of one zone to the parsers, which otherwise read
+    until the end of the file.
+    """
+
+    def __init__(self, f: BinaryIO, end: int):
+        super().__init__()
+        self._f = f
+        self._remaining = end - f.tell()
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        size = min(len(buffer), self._remaining)
+        if size <= 0:
+            return 0
+        data = self._f.read(size)
+        buffer[: len(data)] = data
+        self._remaining -= len(data)
+        return len(data)
+
+
+def _open_zone(f: BinaryIO, entry: ZoneIndexEntry) -> BinaryIO:
+    """Return a reader over the data of a single zone."""
+    f.seek(entry.data_offset)
+    return io.BufferedReader(_BoundedReader(f, entry.end))
+
+
 class TecplotData:
     """Represent a Tecplot File.
 
@@ -21,12 +1001,17 @@ class TecplotData:
         title: Title of the tecplot file.
         zone: Tecplot zone header.
         data: Data within the file as a Pandas DataFrame.
+        schema: Name of the entry in ``SCHEMAS`` used by
+            ``readfile(dtype="compact")``, None to read every column as
+            float32.
 
     Examples:
         >>> motor = TecplotData("Motor.dat")
     """
 
-    def __init__(self, filename=None):
+    schema: Optional[str] = None
+
+    def __init__(self, filename=None, **kwargs):
         self.title: str = "Title"
         self.pressure = 0
         self.temperature = 0
@@ -35,15 +1020,59 @@ class TecplotData:
         self.data: pd.DataFrame = pd.DataFrame()
         if filename is not None:
             self.filename = filename
-            self.readfile(filename)
+            self.readfile(filename, **kwargs)
         else:
             self.filename = None
 
-    def readfile(self, filename: Union[str, os.PathLike]) -> None:
+    def readfile(
+            self,
+            filename: Union[str, os.PathLike],
+            engine: str = "pandas",
+            columns: Optional[Sequence[str]] = None,
+            filters: Optional[Filters] = None,
+            cache: Union[bool, "TecplotCache", None] = None,
+            zone: Union[int, str, None] = None,
+            dtype=None,
+    ) -> None:
         """
         Read the file and load populate self.data with the contents.
+
+        The header is parsed once and the body is then handed to the chosen
+        engine from the same open file handle. Both ``F = POINT`` and
+        ``F = BLOCK`` packed data are supported, BLOCK data is always parsed
+        into float64 columns whichever engine is chosen.
+
         Args:
             filename: Path to datafile in Tecplot format.
+            engine: Parser for the body of the file, one of
+                ``READ_ENGINES``. ``'pandas'`` (default) infers the dtype of
+                each column. ``'numpy'`` and ``'pyarrow'`` skip type
+                inference and read every column as float64, which is
+                considerably faster on large History and Weather files,
+                ``'pyarrow'`` will also use multiple threads.
+            columns: Columns to load, default all of them. The other
+                columns are skipped by the parser rather than loaded and
+                dropped.
+            filters: Mapping of column name to inclusive ``(min, max)``
+                bounds, either of which may be None. Only rows within all
+                the bounds are kept, they are selected chunk by chunk while
+                parsing. The filter columns do not need to be in `columns`.
+            cache: Optional `TecplotCache`, or True for the default cache.
+                The first read of a file parses it in full and stores a
+                Parquet copy, later reads of the unchanged file load from
+                that copy instead.
+            zone: Number or title of the zone to load from a file with
+                several zones. The zone is found with `zone_index` and only
+                its data is parsed. Default None reads the data up to the
+                end of the file, which suits files with a single zone.
+            dtype: Dtypes to read the columns into, skipping type inference.
+                ``'compact'`` uses the schema of the class (`schema`),
+                e.g. float32 physical quantities and uint8 flags for
+                `SSHistory`, roughly halving the memory used. Also accepts
+                the name of one of ``SCHEMAS`` (e.g. ``'road'``), a single
+                dtype for every column (e.g. ``'float32'``) or a dict of
+                column name to dtype. Default None keeps the dtypes chosen
+                by the engine.
 
         Returns:
             None, data from the file is loaded into the instance as the
@@ -52,78 +1081,359 @@ class TecplotData:
         Examples:
             >>> data = TecplotData()
             >>> data.readfile("Velocity.dat")
+            >>> data.readfile("History.dat", engine="pyarrow")
+            >>> data.readfile(
+            >>>     "History.dat",
+            >>>     columns=["DDHHMMSS", "CarVel(km/h)"],
+            >>>     filters={"Distance(km)": (0, 1000)},
+            >>> )
+            >>> data.readfile("Weather.dat", cache=True)
+            >>> data.readfile("Ensemble.dat", zone="member 3")
+            >>> data.readfile("RoadFile.dat", dtype="road")
+            >>> history = SSHistory("History.dat", dtype="compact")
         """
         # This will act as the base class for specific filed
         # (e.g. History, Weather, Motor)
 
         if not isinstance(filename, (os.PathLike, str)):
             raise TypeError("filename should either be string or os.PathLike")
+        if engine not in READ_ENGINES:
+            raise ValueError(
+                f"engine should be one of {READ_ENGINES}, got {engine}"
+            )
         if isinstance(filename, pathlib.Path):
             filename = str(filename)
         self.filename = filename
-        with open(filename) as f:
-            # phrase title
-            try:
-                self.title = (
-                    re.match("Title = (.+)", f.readline()).group(1).strip('"')
+        if cache:
+            if cache is True:
+                cache = TecplotCache()
+            key = cache.key(filename, engine=engine, zone=zone, dtype=dtype)
+            if cache.load(self, key, columns, filters):
+                return
+            # cache the whole file and only then select what was asked for
+            self.readfile(filename, engine, zone=zone, dtype=dtype)
+            cache.store(self, key)
+            filters = filters or {}
+            usecols = _usecols(self.data.columns.to_list(), columns, filters)
+            self.data = _apply_filters(self.data.loc[:, usecols], filters)
+            self.data = self.data.reset_index(drop=True)
+            if columns is not None:
+                self.data = self.data.loc[:, list(columns)]
+            return
+        with _open(filename) as f:
+            variables = self._read_header(f)
+            logger.info("Readin for title block for %s OK.", self.filename)
+            if zone is not None:
+                entry = _find_zone(zone_index(filename), zone)
+                self.zone = TPHeaderZone(entry.zone)
+                f = _open_zone(f, entry)
+            dtypes = _resolve_dtypes(dtype, self.schema, variables)
+            if self.zone.is_block():
+                self.data = _read_block(
+                    f,
+                    variables,
+                    self.zone.ni * self.zone.nj * self.zone.nk,
+                    columns,
+                    filters,
+                    dtypes,
                 )
-            except AttributeError as exc:
-                raise SyntaxError(
-                    "Tecplot file " + filename + " missing title\n"
-                ) from exc
+            else:
+                self.data = _read_body(
+                    f, variables, engine, columns, filters, dtypes
+                )
+
+    @classmethod
+    def iter_chunks(
+            cls,
+            filename: Union[str, os.PathLike],
+            chunksize: int = READ_CHUNKSIZE,
+            engine: str = "pandas",
+            columns: Optional[Sequence[str]] = None,
+            filters: Optional[Filters] = None,
+            zone: Union[int, str, None] = None,
+            dtype=None,
+    ) -> Iterator["TecplotData"]:
+        """Stream the file in chunks of rows for out-of-core processing.
+
+        The header is parsed once and then shared by every chunk. Each chunk
+        is yielded as an instance of the class it is called on, so methods
+        such as `SSHistory.add_timestamp` can be applied chunk by chunk.
+
+        Args:
+            filename: Path to datafile in Tecplot format.
+            chunksize: Number of rows parsed at a time.
+            engine: Parser for the body of the file, see `readfile`.
+            columns: Columns to load, see `readfile`.
+            filters: Bounds to select rows by, see `readfile`. Chunks with
+                no rows left after filtering are skipped.
+            zone: Number or title of the zone to stream, see `readfile`.
+            dtype: Dtypes to read the columns into, see `readfile`.
+
+        Yields:
+            Objects holding the header of the file and a chunk of the data,
+            indexed by the row number within the file.
 
-            # phrase variable title
+        Examples:
+            >>> total = 0
+            >>> for chunk in SSHistory.iter_chunks("History.dat"):
+            >>>     chunk.add_timestamp(startday="20231022")
+            >>>     total += chunk.data["Solar/InputPower(W)"].sum()
+        """
+        if not isinstance(filename, (os.PathLike, str)):
+            raise TypeError("filename should either be string or os.PathLike")
+        if engine not in READ_ENGINES:
+            raise ValueError(
+                f"engine should be one of {READ_ENGINES}, got {engine}"
+            )
+        header = cls()
+        header.filename = str(filename)
+        filters = filters or {}
+        with _open(filename) as f:
+            variables = header._read_header(f)
+            if zone is not None:
+                entry = _find_zone(zone_index(filename), zone)
+                header.zone = TPHeaderZone(entry.zone)
+                f = _open_zone(f, entry)
+            if header.zone.is_block():
+                raise ValueError(
+                    f"{filename} is BLOCK packed and cannot be read in "
+                    "chunks of rows."
+                )
+            usecols = _usecols(variables, columns, filters)
+            dtypes = _resolve_dtypes(dtype, cls.schema, variables)
+            for data in _iter_body(
+                    f, variables, engine, chunksize, usecols, filters, dtypes
+            ):
+                chunk = copy.copy(header)
+                chunk.data = data
+                if columns is not None:
+                    chunk.data = data.loc[:, list(columns)]
+                yield chunk
+
+    @classmethod
+    def read_zones(
+            cls, filename: Union[str, os.PathLike], **kwargs
+    ) -> List["TecplotData"]:
+        """Read every zone of a file with several zones.
+
+        Args:
+            filename: Path to datafile in Tecplot format.
+            **kwargs: Passed on to `readfile`, e.g. engine or columns.
+
+        Returns:
+            An object per zone, in the order they appear in the file.
+
+        Examples:
+            >>> members = SSWeather.read_zones("Ensemble.dat")
+        """
+        return [
+            cls(filename, zone=i, **kwargs)
+            for i in range(len(zone_index(filename)))
+        ]
+
+    @classmethod
+    def peek(cls, filename: Union[str, os.PathLike]) -> "TecplotData":
+        """Read only the header of a file, up to and including the zone line.
+
+        Args:
+            filename: Path to datafile in Tecplot format, may be compressed.
+
+        Returns:
+            Object with the title, datum and zone of the file, its data is
+            an empty DataFrame with the variables as columns.
+
+        Examples:
+            >>> header = SSHistory.peek("History.dat")
+            >>> header.data.columns.to_list(), header.zone.ni
+        """
+        if not isinstance(filename, (os.PathLike, str)):
+            raise TypeError("filename should either be string or os.PathLike")
+        header = cls()
+        header.filename = os.fspath(filename)
+        with _open(filename) as f:
+            variables = header._read_header(f)
+        header.data = pd.DataFrame(columns=variables)
+        return header
+
+    @classmethod
+    def read_many(
+            cls,
+            paths: Sequence[Union[str, os.PathLike]],
+            columns: Optional[Sequence[str]] = None,
+            reducer: Optional[Callable[["TecplotData"], Sequence]] = None,
+            n_jobs: Optional[int] = None,
+            max_in_flight: Optional[int] = None,
+            load: bool = True,
+            **kwargs,
+    ) -> Union[List["TecplotData"], pd.DataFrame]:
+        """Read many files in parallel over a pool of processes.
+
+        With a `reducer` each file is reduced in the worker that read it,
+        so only the small results are sent back, and they are gathered
+        into a typed array per field. At most `max_in_flight` files are
+        queued or held by the workers at any time, bounding the memory
+        used.
+
+        Args:
+            paths: Paths to the files.
+            columns: Columns to load from each file, see `readfile`.
+            reducer: Function applied in the worker to each loaded object,
+                returning a tuple of scalars (e.g. a NamedTuple) such as
+                `SSHistory.summary`. It must be picklable, i.e. defined
+                at module level.
+            n_jobs: Number of worker processes, default the number of
+                cpu. With 1 the files are read in this process.
+            max_in_flight: Maximum number of files submitted but not yet
+                gathered, default twice `n_jobs`.
+            load: If False the reducer is given the path instead of the
+                loaded object, to read the file itself, e.g.
+                `SSHistory.summarise_file` which streams it.
+            **kwargs: Passed on to `readfile`, e.g. engine or dtype.
+
+        Returns:
+            Without a reducer, the objects read in the order of `paths`.
+            With a reducer, a DataFrame with a row per path and a column
+            per field of the results (named after the NamedTuple fields).
+            With no paths it has a float column per field of the NamedTuple
+            the reducer is annotated to return.
+
+        Examples:
+            >>> paths = glob.glob("History_*.dat")
+            >>> summaries = SSHistory.read_many(
+            >>>     paths, reducer=SSHistory.summarise_file, load=False
+            >>> )
+            >>> velocities = SSHistory.read_many(
+            >>>     paths, columns=["Distance(km)", "CarVel(km/h)"]
+            >>> )
+        """
+        paths = list(paths)
+        if not load and reducer is None:
+            raise ValueError("A reducer is needed to read without loading.")
+        if n_jobs is None:
+            n_jobs = os.cpu_count() or 1
+        n_jobs = max(1, min(n_jobs, len(paths)))
+        if max_in_flight is None:
+            max_in_flight = 2 * n_jobs
+        read = functools.partial(
+            _read_one,
+            cls,
+            columns=columns,
+            reducer=reducer,
+            load=load,
+            kwargs=kwargs,
+        )
+        fields = None if reducer is None else _result_fields(reducer)
+        if n_jobs == 1:
+            results = ((i, read(path)) for i, path in enumerate(paths))
+            gathered = _gather(results, len(paths), fields)
+        else:
+            with concurrent.futures.ProcessPoolExecutor(n_jobs) as pool:
+                gathered = _gather(
+                    _imap_bounded(pool, read, paths, max_in_flight),
+                    len(paths),
+                    fields,
+                )
+        return gathered
+
+    def _read_header(self, f: BinaryIO) -> List[str]:
+        """Parse the header lines up to and including the zone line.
+
+        Title, datum and zone details are loaded into the instance and the
+        file handle is left at the start of the data.
+
+        Args:
+            f: File opened in binary mode, positioned at the start.
+
+        Returns:
+            List of variable names.
+        """
+        # phrase title
+        try:
+            self.title = (
+                _TITLE_RE.match(_decode(f.readline())).group(1).strip('"')
+            )
+        except AttributeError as exc:
+            raise SyntaxError(
+                "Tecplot file " + self.filename + " missing title\n"
+            ) from exc
+
+        # phrase variable title
+        try:
+            variable = _VARIABLES_RE.match(_decode(f.readline())).group(1)
+        except AttributeError as exc:
+            raise SyntaxError(
+                "Tecplot file " + self.filename + " missing variable titles\n"
+            ) from exc
+        variable = variable.strip('"').split('", "')
+
+        # try phrase the two optional datum lines, then the zone title
+        while True:
+            line = _decode(f.readline())
+            mtch = _PRESSURE_TEMP_RE.match(line)
+            if mtch is not None:
+                pressure_temp = mtch.group(1).split(" ")
+                self.pressure = pressure_temp[0]
+                self.temperature = pressure_temp[1]
+                continue
+            mtch = _DATUM_RE.match(line)
+            if mtch is not None:
+                self.datum = mtch.group(1).split(" ")
+                continue
+            # phrase the zone title
             try:
-                variable = re.match("Variables = (.+)", f.readline()).group(1)
+                self.zone = TPHeaderZone(_ZONE_RE.match(line).group(0))
             except AttributeError as exc:
                 raise SyntaxError(
-                    "Tecplot file " + filename + " missing variable titles\n"
+                    "Tecplot file  " + self.filename + " missing zone data\n"
                 ) from exc
-            variable = variable.strip('"').split('", "')
+            return variable
 
-            # try phrase the two optional datum lines
-            for x, line in enumerate(f):
-                try:
-                    repressuretemp = re.match(
-                        r"#PAtm\(Pa\) TAtm\(K\)= (.+)", line
-                    )
-                    pressure_temp = repressuretemp.group(1).split(" ")
-                    self.pressure = pressure_temp[0]
-                    self.temperature = pressure_temp[1]
-                    continue
-                except AttributeError:
-                    try:
-                        self.datum = (
-                            re.match("#Datums= (.+)", line).group(1).split(" ")
-                        )
-                        # will throw error if there is not match
-                        continue
-                    except AttributeError:
-                        pass
-
-                # phrase the zone title
-                try:
-                    self.zone = TPHeaderZone(re.match("Zone .+", line).group(0))
-                    break
-                except AttributeError as exc:
-                    raise SyntaxError(
-                        "Tecplot file  " + filename + " missing zone data\n"
-                    ) from exc
-        logger.info("Readin for title block for %s OK.", self.filename)
-        self.data = pd.read_csv(
+    def write_tecplot(
+            self,
             filename,
-            skiprows=x + 3,
-            index_col=False,
-            sep=r"\s+",
-            names=variable,
-        )
-
-    def write_tecplot(self, filename, datum=False) -> None:
+            datum=False,
+            engine: str = "pandas",
+            chunksize: int = WRITE_CHUNKSIZE,
+            compression: Optional[str] = "infer",
+            zone_width: Optional[int] = None,
+            precision=None,
+    ) -> None:
         """Write the TecplotData to a .dat file.
 
+        The data is written point by point unless the zone packing format
+        is ``BLOCK``, in which case it is written variable by variable.
+
         Args:
             filename: Filename including extension (.dat)
             datum: If DSW datum lines are written, default false
+            engine: Formatter for the body of the file, one of
+                ``WRITE_ENGINES``. ``'pandas'`` (default) lays the data out
+                as an aligned table with ``DataFrame.to_string``.
+                ``'chunked'`` formats the columns with the vectorised csv
+                writer and writes `chunksize` rows at a time, keeping memory
+                flat on large weather files. Floats are written with the
+                shortest representation that reads back to the same value.
+            chunksize: Number of rows formatted at a time by the
+                ``'chunked'`` engine.
+            compression: One of ``COMPRESSIONS`` or None. The default
+                ``'infer'`` compresses according to the extension of
+                `filename` (``.gz``, ``.bz2``, ``.xz`` or ``.zst``). zstd is
+                compressed with a thread per core and needs the optional
+                zstandard package. `readfile` detects compressed files
+                whatever their name.
+            zone_width: Width of the I, J and K fields of the zone line.
+                Padding the zone line lets `append_tecplot` grow the zone in
+                place, e.g. a width of 10 allows up to 9999999999 points.
+                Default None writes the counts unpadded.
+            precision: Decimal places to round the columns to, shortening
+                the file and the time to write and read it. ``'compact'``
+                takes them from the entry of ``PRECISIONS`` named by the
+                `schema` of the class, e.g. a tenth of a degree for the sun
+                position of an `SSWeather`. Also accepted are the name of an
+                entry of ``PRECISIONS``, an int for every column or a dict
+                of column name to decimal places. Columns rounded to no
+                decimal places are written as integers. Default None writes
+                every value at the full precision of the engine.
 
         Returns:
             None
@@ -131,31 +1441,71 @@ class TecplotData:
         Examples:
             >>> velocity = TecplotData("Velocity.dat")
             >>> velocity.write_tecplot("Velocity.dat")
+            >>> weather.write_tecplot("Weather.dat", engine="chunked")
+            >>> weather.zone.F = "BLOCK"
+            >>> weather.write_tecplot("WeatherBlock.dat", engine="chunked")
+            >>> history.write_tecplot("History.dat.zst", engine="chunked")
+            >>> history.write_tecplot("History.dat", zone_width=10)
+            >>> weather.write_tecplot("Weather.dat", precision="compact")
         """
 
+        if engine not in WRITE_ENGINES:
+            raise ValueError(
+                f"engine should be one of {WRITE_ENGINES}, got {engine}"
+            )
+        self._check_export(filename)
+        decimals = _resolve_precision(
+            precision, self.schema, self.data.columns.to_list()
+        )
+        with _open(filename, "w", compression) as f:
+            self._write_header(f, datum)
+            self._write_zone(f, engine, chunksize, zone_width, decimals)
+            f.flush()
+
+    def _check_export(self, filename) -> None:
+        """Check there is data to write."""
         if self.data is None or self.zone is None or self.data.size == 0:
             raise AttributeError(
                 f"No valid data found in export for {filename}"
             )
-
+        if isinstance(self.data, DerivedFrame):
+            # write the derived columns not accessed yet as well
+            self.data.materialise()
         # raise warning if the zone details doesn't match the data.
         self.check_zone()
-        with open(filename, "w") as f:
-            f.write(f'Title = "{self.title}"\n')
-            varstr = (
-                str(self.data.columns.to_list()).strip("[]").replace("'", '"')
-            )
-            f.write(f"Variables = {varstr}\n")
-            if datum:
-                # may raise Attribute error of the attributes are not present, they all have default values
-                f.write(
-                    f"#PAtm(Pa) TAtm(K)= {self.pressure} {self.temperature}\n"
-                )
-                f.write(f'#Datums= {" ".join(self.datum)}\n')
 
-            f.write(f"{self.zone.to_string()}\n")  # need fix
-            self.data.to_string(f, header=False, index=False, col_space=6)
-            f.flush()
+    def _write_header(self, f: TextIO, datum: bool) -> None:
+        """Write the title, variables and optionally datum lines."""
+        f.write(f'Title = "{self.title}"\n')
+        varstr = (
+            str(self.data.columns.to_list()).strip("[]").replace("'", '"')
+        )
+        f.write(f"Variables = {varstr}\n")
+        if datum:
+            # may raise Attribute error of the attributes are not present, they all have default values
+            f.write(
+                f"#PAtm(Pa) TAtm(K)= {self.pressure} {self.temperature}\n"
+            )
+            f.write(f'#Datums= {" ".join(self.datum)}\n')
+
+    def _write_zone(
+            self,
+            f: TextIO,
+            engine: str,
+            chunksize: int,
+            zone_width: Optional[int] = None,
+            decimals: Optional[Dict[str, int]] = None,
+    ) -> None:
+        """Write the zone line and the data."""
+        f.write(f"{self.zone.to_string(zone_width)}\n")  # need fix
+        if self.zone.is_block():
+            # one variable after another, a value per line
+            for col in self.data.columns:
+                _write_body(f, self.data[[col]], engine, chunksize, decimals)
+                if engine == "pandas":
+                    f.write("\n")
+        else:
+            _write_body(f, self.data, engine, chunksize, decimals)
 
     def update_zone_1d(self):
         """Update the zone detail assuming a 1d data structure.
@@ -198,9 +1548,590 @@ class TecplotData:
     # deal with 3d data?
 
 
+def catalog(
+        directory: Union[str, os.PathLike],
+        pattern: str = "*.dat",
+        n_jobs: Optional[int] = None,
+) -> pd.DataFrame:
+    """Catalog the Tecplot files in a directory tree from their headers.
+
+    Only the header of each file is read, see `TecplotData.peek`, by a
+    pool of threads as the work is mostly waiting on the filesystem. Files
+    that do not have a valid Tecplot header, or are corrupt compressed
+    files, are left out with a warning.
+
+    Args:
+        directory: Root of the directory tree to scan.
+        pattern: Glob pattern of the file names to include, matched in
+            every subdirectory.
+        n_jobs: Number of threads, default 32 or fewer on small machines.
+
+    Returns:
+        DataFrame with a row per file and the columns 'path', 'title',
+        'variables', 'zone', 'I', 'J', 'K', 'F', 'size' (bytes) and
+        'mtime', sorted by path.
+
+    Examples:
+        >>> runs = catalog("sweep_2023", "History_*.dat*")
+        >>> runs[runs["I"] < 1000]
+    """
+    paths = sorted(
+        path
+        for path in pathlib.Path(directory).rglob(pattern)
+        if path.is_file()
+    )
+    columns = [
+        "path",
+        "title",
+        "variables",
+        "zone",
+        "I",
+        "J",
+        "K",
+        "F",
+        "size",
+        "mtime",
+    ]
+    with concurrent.futures.ThreadPoolExecutor(n_jobs) as pool:
+        rows = [row for row in pool.map(_catalog_entry, paths) if row]
+    data = pd.DataFrame(rows, columns=columns)
+    data["mtime"] = pd.to_datetime(data["mtime"], unit="ns")
+    return data
+
+
+def _catalog_entry(path: pathlib.Path) -> Optional[tuple]:
+    """Return the catalog row of a file, None if it is not a Tecplot file."""
+    try:
+        stat = path.stat()
+        header = TecplotData.peek(path)
+    except (
+            SyntaxError,
+            UnicodeDecodeError,
+            OSError,
+            EOFError,
+            ImportError,  # zstd file without zstandard installed
+            *_DECOMPRESSION_ERRORS,
+    ) as exc:
+        logger.warning("Skipping %s in catalog: %s", path, exc)
+        return None
+    zone = header.zone
+    return (
+        str(path),
+        header.title,
+        header.data.columns.to_list(),
+        zone.zonetitle,
+        zone.ni,
+        zone.nj,
+        zone.nk,
+        zone.F,
+        stat.st_size,
+        stat.st_mtime_ns,
+    )
+
+
+def _read_one(cls, path, columns=None, reducer=None, load=True, kwargs=None):
+    """Read a file, and reduce it if a reducer is given, in a worker."""
+    if not load:
+        result = reducer(path)
+        return tuple(result), getattr(result, "_fields", None)
+    tecplot = cls(path, columns=columns, **(kwargs or {}))
+    if reducer is None:
+        return tecplot
+    result = reducer(tecplot)
+    return tuple(result), getattr(result, "_fields", None)
+
+
+def _imap_bounded(
+        pool: concurrent.futures.Executor,
+        func: Callable,
+        items: Sequence,
+        max_in_flight: int,
+) -> Iterator[Tuple[int, object]]:
+    """Map func over items in the pool, yielding (index, result) pairs as
+    they complete, with at most `max_in_flight` items submitted at once."""
+    items = iter(enumerate(items))
+    pending = {}
+    while True:
+        for i, item in itertools.islice(items, max_in_flight - len(pending)):
+            pending[pool.submit(func, item)] = i
+        if not pending:
+            return
+        done, _ = concurrent.futures.wait(
+            pending, return_when=concurrent.futures.FIRST_COMPLETED
+        )
+        for future in done:
+            yield pending.pop(future), future.result()
+
+
+def _result_fields(reducer: Callable) -> Tuple[str, ...]:
+    """Return the fields of the NamedTuple a reducer is annotated to return,
+    empty if it is not."""
+    try:
+        result = get_type_hints(reducer).get("return")
+    except (NameError, TypeError):  # unresolved or unsupported annotations
+        return ()
+    return getattr(result, "_fields", ())
+
+
+def _gather(
+        results: Iterator[Tuple[int, object]],
+        n_results: int,
+        fields: Optional[Sequence[str]],
+) -> Union[List["TecplotData"], pd.DataFrame]:
+    """Put results into the order of their index.
+
+    Reduced results, given the `fields` of the reducer, are written into an
+    array per field, preallocated when the first result arrives. Real
+    numbers are stored as float64, anything else (e.g. str) as object. With
+    no results the fields are empty float64 columns.
+    """
+    if fields is None:
+        gathered = [None] * n_results
+        for i, tecplot in results:
+            gathered[i] = tecplot
+        return gathered
+    if n_results == 0:
+        return pd.DataFrame({field: np.empty(0) for field in fields})
+    arrays = None
+    for i, (values, fields) in results:
+        if arrays is None:
+            arrays = {}
+            for field, value in zip(fields or range(len(values)), values):
+                if isinstance(value, numbers.Real):
+                    arrays[field] = np.full(n_results, np.nan)
+                else:
+                    arrays[field] = np.full(n_results, None, dtype=object)
+        for array, value in zip(arrays.values(), values):
+            array[i] = value
+    return pd.DataFrame(arrays)
+
+
+def write_zones(
+        filename: Union[str, os.PathLike],
+        zones: Sequence[TecplotData],
+        datum: bool = False,
+        engine: str = "pandas",
+        chunksize: int = WRITE_CHUNKSIZE,
+        compression: Optional[str] = "infer",
+        precision=None,
+) -> None:
+    """Write several zones to one Tecplot file.
+
+    The title and datum of the first zone are used for the whole file and
+    every zone must have the same variables. Zones are told apart by their
+    zone titles, read them back with ``readfile(zone=...)`` or
+    `TecplotData.read_zones`.
+
+    Args:
+        filename: Filename including extension (.dat)
+        zones: Objects holding the zone details and data of each zone.
+        datum: If DSW datum lines are written, default false
+        engine: Formatter for the data, see `TecplotData.write_tecplot`.
+        chunksize: Number of rows formatted at a time by the ``'chunked'``
+            engine.
+        compression: Compression of the file, see
+            `TecplotData.write_tecplot`.
+        precision: Decimal places of the columns, see
+            `TecplotData.write_tecplot`. ``'compact'`` uses the schema of
+            the first zone.
+
+    Returns:
+        None
+
+    Examples:
+        >>> for i, member in enumerate(members):
+        >>>     member.zone.zonetitle = f"member {i}"
+        >>> write_zones("Ensemble.dat", members)
+    """
+    if engine not in WRITE_ENGINES:
+        raise ValueError(
+            f"engine should be one of {WRITE_ENGINES}, got {engine}"
+        )
+    if len(zones) == 0:
+        raise ValueError(f"No zones to write to {filename}")
+    variables = zones[0].data.columns.to_list()
+    for zone in zones:
+        zone._check_export(filename)
+        if zone.data.columns.to_list() != variables:
+            raise ValueError(
+                f"Zone {zone.zone.zonetitle!r} does not have the variables "
+                f"{variables}."
+            )
+    decimals = _resolve_precision(precision, zones[0].schema, variables)
+    with _open(filename, "w", compression) as f:
+        zones[0]._write_header(f, datum)
+        for previous, zone in zip([None, *zones], zones):
+            if (
+                    previous is not None
+                    and engine == "pandas"
+                    and not previous.zone.is_block()
+            ):
+                # to_string does not end the last line
+                f.write("\n")
+            zone._write_zone(f, engine, chunksize, decimals=decimals)
+        f.flush()
+
+
+def append_tecplot(
+        filename: Union[str, os.PathLike],
+        data: pd.DataFrame,
+        engine: str = "pandas",
+        chunksize: int = WRITE_CHUNKSIZE,
+) -> "TPHeaderZone":
+    """Append rows to the zone of a Tecplot file in place.
+
+    The rows are written to the end of the file and the point counts of the
+    zone line are patched in place, so the cost of an append is proportional
+    to the new data rather than the whole file. The zone grows in the I
+    direction: for a zone of J x K points the rows must be a whole number of
+    J x K slices, e.g. new forecast times for every distance of a weather
+    grid.
+
+    The new zone line must fit in the space of the old one. Write files that
+    will be appended to with ``write_tecplot(zone_width=...)`` to leave room
+    for the counts to grow.
+
+    Args:
+        filename: Uncompressed single zone POINT packed Tecplot file.
+        data: Rows to append, with the variables of the file as columns in
+            the same order.
+        engine: Formatter for the data, see `TecplotData.write_tecplot`.
+        chunksize: Number of rows formatted at a time by the ``'chunked'``
+            engine.
+
+    Returns:
+        The zone details of the file after the append, unchanged if `data`
+        has no rows.
+
+    Raises:
+        ValueError: If the file is compressed or BLOCK packed, the columns
+            do not match, the rows do not fill whole I slices or the zone
+            line has no room for the new counts.
+
+    Examples:
+        >>> history.write_tecplot("History.dat", zone_width=10)
+        >>> append_tecplot("History.dat", new_rows)
+    """
+    if engine not in WRITE_ENGINES:
+        raise ValueError(
+            f"engine should be one of {WRITE_ENGINES}, got {engine}"
+        )
+    if _infer_compression(filename, "r") is not None:
+        raise ValueError(
+            f"{filename} is compressed, it can not be appended to in place"
+        )
+    header = TecplotData()
+    header.filename = os.fspath(filename)
+    with open(filename, "rb") as f:
+        variables = header._read_header(f)
+        data_offset = f.tell()
+        f.seek(0)
+        head = f.read(data_offset)
+        f.seek(-1, os.SEEK_END)
+        ends_with_newline = f.read(1) == b"\n"
+    zone = header.zone
+    if zone.is_block():
+        raise ValueError(
+            f"{filename} is BLOCK packed, only POINT packed files can be "
+            "appended to"
+        )
+    if data.columns.to_list() != variables:
+        raise ValueError(
+            f"Columns {data.columns.to_list()} do not match the variables "
+            f"{variables} of {filename}"
+        )
+    if len(data) == 0:
+        # nothing to append, pandas would write the repr of an empty frame
+        return zone
+    points = zone.ni * zone.nj * zone.nk + len(data)
+    if points % (zone.nj * zone.nk) != 0:
+        raise ValueError(
+            f"{len(data)} rows do not fill whole I slices of "
+            f"J = {zone.nj}, K = {zone.nk} points"
+        )
+    zone.ni = points // (zone.nj * zone.nk)
+
+    # the zone line is the last line of the header
+    head = head.rstrip(b"\r\n")
+    zone_offset = head.rfind(b"\n") + 1
+    old_line = head[zone_offset:]
+    new_line = zone.to_string().encode(_ENCODING)
+    if len(new_line) > len(old_line):
+        raise ValueError(
+            f"The zone line of {filename} has no room for "
+            f"{zone.to_string()}, write the file with zone_width"
+        )
+    # trailing spaces are ignored when the zone line is parsed
+    new_line = new_line.ljust(len(old_line))
+
+    # append the data before the counts, so an interrupted append leaves a
+    # zone line that undercounts rather than overcounts the data
+    with open(filename, "a", encoding=_ENCODING) as f:
+        if not ends_with_newline:
+            # to_string does not end the last line
+            f.write("\n")
+        _write_body(f, data, engine, chunksize)
+    with open(filename, "r+b") as f:
+        f.seek(zone_offset)
+        f.write(new_line)
+    return zone
+
+
+class TecplotDiff(NamedTuple):
+    """Differences between two Tecplot files, see `compare_tecplot`.
+
+    Attributes:
+        header: Description of each difference in the title, datum, zone
+            and variables of the files.
+        columns: Indexed by the variables of both files, with the maximum
+            absolute and relative error of each and the number of values
+            outside of the tolerances as ``'mismatches'``.
+        rows: Number of rows of data in each file.
+    """
+
+    header: List[str]
+    columns: pd.DataFrame
+    rows: Tuple[int, int]
+
+    @property
+    def equal(self) -> bool:
+        """True if the files match within the tolerances."""
+        return (
+                not self.header
+                and self.rows[0] == self.rows[1]
+                and not self.columns["mismatches"].any()
+        )
+
+
+def compare_tecplot(
+        a: Union[str, os.PathLike],
+        b: Union[str, os.PathLike],
+        rtol: float = 1e-9,
+        atol: float = 0.0,
+        chunksize: int = READ_CHUNKSIZE,
+        engine: str = "pandas",
+        zone: Union[int, str, None] = None,
+) -> TecplotDiff:
+    """Compare the values of two Tecplot files, ignoring their formatting.
+
+    The headers are compared first, then the data of the variables in both
+    files is read chunk by chunk as float64 and compared column by column,
+    matching the columns by name. Values `x` of `a` differ from `y` of `b`
+    if ``|x - y| > atol + rtol * |y|``, as in `numpy.isclose`, and NaN
+    matches NaN. Files of any size are compared in memory of a chunk.
+
+    Args:
+        a: Path to the file to check.
+        b: Path to the reference file, e.g. a golden copy.
+        rtol: Relative tolerance, relative to the values of `b`.
+        atol: Absolute tolerance.
+        chunksize: Number of rows compared at a time.
+        engine: Parser for the body of the files, see
+            `TecplotData.readfile`.
+        zone: Number or title of the zone to compare in both files,
+            default the first.
+
+    Returns:
+        The differences found, ``diff.equal`` is True if there are none.
+
+    Examples:
+        >>> diff = compare_tecplot("Weather-new.dat", "Weather-golden.dat")
+        >>> assert diff.equal, diff
+        >>> diff.columns.sort_values("max_rel_error")
+    """
+    if engine not in READ_ENGINES:
+        raise ValueError(
+            f"engine should be one of {READ_ENGINES}, got {engine}"
+        )
+    headers = [TecplotData.peek(filename) for filename in (a, b)]
+    if zone is not None:
+        for header in headers:
+            entry = _find_zone(zone_index(header.filename), zone)
+            header.zone = TPHeaderZone(entry.zone)
+    header_a, header_b = headers
+    differences = _header_differences(header_a, header_b)
+    variables_a = header_a.data.columns.to_list()
+    variables_b = header_b.data.columns.to_list()
+    differences += _variable_differences(variables_a, variables_b, a, b)
+    columns = [var for var in variables_a if var in variables_b]
+
+    max_abs = np.zeros(len(columns))
+    max_rel = np.zeros(len(columns))
+    mismatches = np.zeros(len(columns), dtype=np.int64)
+    rows = [0, 0]
+    chunks_a, chunks_b = (
+        _iter_values(header, columns, chunksize, engine, zone)
+        for header in headers
+    )
+    for x, y in _align_chunks(chunks_a, chunks_b):
+        # rows of the longer file are only counted
+        if x is not None:
+            rows[0] += len(x)
+        if y is not None:
+            rows[1] += len(y)
+        if x is None or y is None:
+            continue
+        chunk_mismatches, chunk_abs, chunk_rel = _chunk_errors(
+            x, y, rtol, atol
+        )
+        mismatches += chunk_mismatches
+        max_abs = np.fmax(max_abs, chunk_abs)
+        max_rel = np.fmax(max_rel, chunk_rel)
+    return TecplotDiff(
+        differences,
+        pd.DataFrame(
+            {
+                "max_abs_error": max_abs,
+                "max_rel_error": max_rel,
+                "mismatches": mismatches,
+            },
+            index=pd.Index(columns, name="variable"),
+        ),
+        (rows[0], rows[1]),
+    )
+
+
+def _header_differences(
+        header_a: "TecplotData", header_b: "TecplotData"
+) -> List[str]:
+    """Describe each difference in the title, datum and zone of two files."""
+    differences = []
+    for name in ["title", "pressure", "temperature", "datum"]:
+        value_a, value_b = getattr(header_a, name), getattr(header_b, name)
+        if value_a != value_b:
+            differences.append(f"{name}: {value_a!r} != {value_b!r}")
+    for name in ["zonetitle", "ni", "nj", "nk"]:
+        value_a = getattr(header_a.zone, name)
+        value_b = getattr(header_b.zone, name)
+        if value_a != value_b:
+            differences.append(f"zone {name}: {value_a!r} != {value_b!r}")
+    if header_a.zone.is_block() != header_b.zone.is_block():
+        differences.append(
+            f"zone F: {header_a.zone.F!r} != {header_b.zone.F!r}"
+        )
+    return differences
+
+
+def _variable_differences(
+        variables_a: List[str],
+        variables_b: List[str],
+        a: Union[str, os.PathLike],
+        b: Union[str, os.PathLike],
+) -> List[str]:
+    """Describe each variable found in only one of files `a` and `b`."""
+    return [
+        f"variable {variable!r} only in {a}"
+        for variable in variables_a
+        if variable not in variables_b
+    ] + [
+        f"variable {variable!r} only in {b}"
+        for variable in variables_b
+        if variable not in variables_a
+    ]
+
+
+def _iter_values(
+        header: "TecplotData",
+        columns: List[str],
+        chunksize: int,
+        engine: str,
+        zone: Union[int, str, None],
+) -> Iterator[np.ndarray]:
+    """Yield the float64 values of columns of a file, chunk by chunk."""
+    if header.zone.is_block():
+        # BLOCK packed data can not be read in rows, read it all
+        yield TecplotData(
+            header.filename,
+            engine=engine,
+            columns=columns,
+            zone=zone,
+            dtype="float64",
+        ).data.to_numpy()
+        return
+    for chunk in TecplotData.iter_chunks(
+            header.filename,
+            chunksize,
+            engine=engine,
+            columns=columns,
+            zone=zone,
+            dtype="float64",
+    ):
+        yield chunk.data.to_numpy()
+
+
+def _align_chunks(
+        chunks_a: Iterator[np.ndarray], chunks_b: Iterator[np.ndarray]
+) -> Iterator[Tuple[Optional[np.ndarray], Optional[np.ndarray]]]:
+    """Pair up the rows of two files read in chunks.
+
+    The chunks are realigned when they differ in length, e.g. at the end of
+    a BLOCK file or of a shorter file. Once either file runs out, the rest
+    of the other is yielded paired with None.
+    """
+    rest_a = rest_b = np.empty((0, 0))
+    while True:
+        if len(rest_a) == 0:
+            rest_a = next(chunks_a, None)
+        if len(rest_b) == 0:
+            rest_b = next(chunks_b, None)
+        if rest_a is None or rest_b is None:
+            break
+        n = min(len(rest_a), len(rest_b))
+        if n:
+            yield rest_a[:n], rest_b[:n]
+            rest_a, rest_b = rest_a[n:], rest_b[n:]
+    if rest_a is not None:
+        for chunk in itertools.chain([rest_a], chunks_a):
+            yield chunk, None
+    if rest_b is not None:
+        for chunk in itertools.chain([rest_b], chunks_b):
+            yield None, chunk
+
+
+def _chunk_errors(
+        x: np.ndarray, y: np.ndarray, rtol: float, atol: float
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Compare aligned chunks of values column by column.
+
+    Returns:
+        The number of values outside of the tolerances, and the maximum
+        absolute and relative error, of each column. NaNs are counted as
+        mismatches, unless both values are NaN, but left out of the
+        errors.
+    """
+    mismatches = np.count_nonzero(
+        ~np.isclose(x, y, rtol=rtol, atol=atol, equal_nan=True), axis=0
+    )
+    error = np.abs(x - y)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        relative = np.where(error == 0, 0.0, error / np.abs(y))
+    return (
+        mismatches,
+        np.fmax.reduce(error, axis=0),
+        np.fmax.reduce(relative, axis=0),
+    )
+
+
+def _race_seconds(ddhhmmss: np.ndarray) -> np.ndarray:
+    """Convert DSW DDHHMMSS times to seconds since the start of day 1."""
+    return (
+        (ddhhmmss // 1000000 - 1) * 86400
+        + ddhhmmss // 10000 % 100 * 3600
+        + ddhhmmss // 100 % 100 * 60
+        + ddhhmmss % 100
+    )
+
+
+def _start_of_day(day: str) -> np.datetime64:
+    """Return midnight at the start of a day as a datetime64[ns]."""
+    return np.datetime64(pd.to_datetime(day).normalize().to_datetime64(), "ns")
+
+
 class SSWeather(TecplotData):
     """Represents a SolarSim Weather file."""
 
+    schema = "weather"
+
     def add_timestamp(
             self, startday: str, day: str = "Day", time: str = "Time(HHMM)"
     ) -> None:
@@ -222,31 +2153,26 @@ class SSWeather(TecplotData):
             >>> weather_file.add_timestamp(startday='13102019')
             >>> weather_file.add_timestamp(startday='13102019', day = 'Day', time = 'Time(HHMM)')
         """
-        startday = pd.to_datetime(startday)
-        self.data["DateTime"] = pd.to_datetime(
-            self.data[time]
-                .astype(int)
-                .astype(str)
-                .str.pad(4, side="left", fillchar="0"),
-            format="%H%M",
-        )
-        self.data["DateTime"] = pd.to_datetime(
-            startday.strftime("%Y%m%d")
-            + self.data["DateTime"].dt.strftime("%H%M")
-        )
-        self.data["DateTime"] = self.data["DateTime"] + pd.to_timedelta(
-            self.data[day] - 1, unit="D"
+        hhmm = self.data[time].to_numpy().astype(np.int64)
+        days = self.data[day].to_numpy().astype(np.int64)
+        seconds = (days - 1) * 86400 + hhmm // 100 * 3600 + hhmm % 100 * 60
+        self.data["DateTime"] = _start_of_day(startday) + seconds.astype(
+            "timedelta64[s]"
         )
         logger.debug(
             "Timestamp column added to weather file %s.", self.filename
         )
 
-    def add_day_time_cols(self):
+    def add_day_time_cols(self, startday: Optional[str] = None):
         """Create the 'Day' and 'Time' columns.
 
         Create the 'Day' and 'Time' columns in weather file when the dataframe
         is indexed by datetime.
 
+        Args:
+            startday: First day of the race, default the date of the first
+                row. Pass it when working on chunks of a file.
+
         Raises:
             TypeError when the index is not a DatetimeIndex.
         """
@@ -255,10 +2181,17 @@ class SSWeather(TecplotData):
         if not isinstance(self.data.index, pd.DatetimeIndex):
             raise TypeError("Data index should be pd.DateTimeIndex.")
         # convert to day of race, 1 indexed
-        self.data.loc[:, "Day"] = [
-            i.days + 1 for i in (self.data.index.date - self.data.index.date[0])
-        ]
-        self.data.loc[:, "Time(HHMM)"] = self.data.index.strftime("%H%M")
+        index = self.data.index
+        dates = index.normalize()
+        if dates.tz is not None:
+            # the day changes at local midnight
+            dates = dates.tz_localize(None)
+        if startday is None:
+            first_day = dates[0]
+        else:
+            first_day = pd.to_datetime(startday).normalize()
+        self.data["Day"] = np.asarray((dates - first_day).days + 1)
+        self.data["Time(HHMM)"] = np.asarray(index.hour * 100 + index.minute)
 
     def check_rectangular(self):
         """Check if the weather file is a fully rectangular grid in space and
@@ -283,9 +2216,583 @@ class SSWeather(TecplotData):
         ):
             warnings.warn("Zone data ni (Time) mismatch.")
 
+    def grid(
+            self,
+            startday: Optional[str] = None,
+            variables: Optional[Sequence[str]] = None,
+    ) -> "WeatherGrid":
+        """Return the weather as a dense time by distance by variable grid.
+
+        The grid is built once from the 'Day', 'Time(HHMM)' and
+        'Distance(km)' columns, whatever the order of the rows, and can then
+        be queried for any number of points with `WeatherGrid.interpolate`.
+
+        Args:
+            startday: First day of the race, needed to query the grid by
+                datetime rather than by seconds since the start of day 1.
+            variables: Columns to include, default every numeric column
+                other than the axes.
+
+        Returns:
+            The grid of the weather.
+
+        Raises:
+            ValueError if the file is not a full rectangular grid, i.e. some
+            combination of time and distance is missing or repeated.
+
+        Examples:
+            >>> weather = SSWeather("Weather.dat")
+            >>> grid = weather.grid(startday="20231022")
+            >>> grid.values.shape
+            (1008, 31, 8)
+        """
+        axes = ["Day", "Time(HHMM)", "Distance(km)"]
+        if variables is None:
+            variables = [
+                col
+                for col in self.data.select_dtypes(np.number).columns
+                if col not in axes
+            ]
+        hhmm = self.data["Time(HHMM)"].to_numpy().astype(np.int64)
+        seconds = (
+            (self.data["Day"].to_numpy().astype(np.int64) - 1) * 86400
+            + hhmm // 100 * 3600
+            + hhmm % 100 * 60
+        )
+        distance = self.data["Distance(km)"].to_numpy(dtype=np.float64)
+        order = np.lexsort((distance, seconds))
+        times = np.unique(seconds)
+        distances = np.unique(distance)
+        n_points = times.size * distances.size
+        if (
+                n_points != order.size
+                or np.any(seconds[order] != np.repeat(times, distances.size))
+                or np.any(distance[order] != np.tile(distances, times.size))
+        ):
+            raise ValueError(
+                f"Weather data is not a rectangular grid, {len(self.data)} "
+                f"rows for {times.size} times and {distances.size} distances."
+            )
+        values = self.data[list(variables)].to_numpy()[order]
+        return WeatherGrid(
+            times,
+            distances,
+            values.reshape(times.size, distances.size, len(variables)),
+            list(variables),
+            None if startday is None else _start_of_day(startday),
+        )
+
+    def sample_histories(
+            self,
+            histories: Sequence[Union["SSHistory", pd.DataFrame]],
+            variables: Optional[Sequence[str]] = None,
+            startday: Optional[str] = None,
+    ) -> List[pd.DataFrame]:
+        """Sample the weather met along many History trajectories at once.
+
+        The grid is built once and the points of all the histories are
+        located and interpolated in a single vectorised pass, see
+        `WeatherGrid.interpolate`. Times are taken from the 'DDHHMMSS'
+        column, or from 'DateTime' if there is none, which needs
+        `startday`.
+
+        Args:
+            histories: History files (or their data) of runs using this
+                weather file.
+            variables: Weather variables to sample, default all of them.
+            startday: First day of the race, only needed for histories
+                without a 'DDHHMMSS' column.
+
+        Returns:
+            A DataFrame per history with the weather variables, indexed
+            like the history data.
+
+        Examples:
+            >>> histories = [SSHistory(path) for path in paths]
+            >>> weather = get_weather(paths[0])
+            >>> sampled = weather.sample_histories(
+            >>>     histories, ["DirectSun(W/m2)", "WindVel(m/s)"]
+            >>> )
+            >>> histories[0].data.join(sampled[0])
+        """
+        grid = self.grid(startday, variables)
+        frames = [
+            history.data if isinstance(history, TecplotData) else history
+            for history in histories
+        ]
+        distances = []
+        times = []
+        for data in frames:
+            distances.append(data["Distance(km)"].to_numpy(dtype=np.float64))
+            if "DDHHMMSS" in data.columns:
+                ddhhmmss = data["DDHHMMSS"].to_numpy().astype(np.int64)
+                times.append(_race_seconds(ddhhmmss).astype(np.float64))
+            else:
+                times.append(grid.to_seconds(data["DateTime"].to_numpy()))
+        if not frames:
+            return []
+        sampled = grid.interpolate(
+            np.concatenate(distances), np.concatenate(times)
+        ).to_numpy()
+        ends = np.cumsum([len(data) for data in frames])
+        return [
+            pd.DataFrame(values, columns=grid.variables, index=data.index)
+            for values, data in zip(np.split(sampled, ends[:-1]), frames)
+        ]
+
+
+class GridLocation(NamedTuple):
+    """Position of query points within a `WeatherGrid`.
+
+    Each point lies between the lower and upper grid index along each axis,
+    the weight is the fraction of the way from the lower to the upper one.
+    """
+
+    time_lower: np.ndarray
+    time_upper: np.ndarray
+    time_weight: np.ndarray
+    distance_lower: np.ndarray
+    distance_upper: np.ndarray
+    distance_weight: np.ndarray
+
+
+class WeatherGrid:
+    """Dense view of a rectangular weather file.
+
+    Attributes:
+        times: Sorted times of the grid in seconds since the start of day 1.
+        distances: Sorted distances of the grid in km.
+        values: Array of shape (times, distances, variables).
+        variables: Names of the variables along the last axis of values.
+        start: Start of day 1 as a datetime64, None if unknown.
+
+    Examples:
+        >>> grid = SSWeather("Weather.dat").grid(startday="20231022")
+        >>> history = SSHistory("History.dat")
+        >>> history.add_timestamp(startday="20231022")
+        >>> sun = grid.interpolate(
+        >>>     history.data["Distance(km)"],
+        >>>     history.data["DateTime"],
+        >>>     ["DirectSun(W/m2)", "DiffuseSun(W/m2)"],
+        >>> )
+    """
+
+    def __init__(
+            self,
+            times: np.ndarray,
+            distances: np.ndarray,
+            values: np.ndarray,
+            variables: List[str],
+            start: Optional[np.datetime64] = None,
+    ):
+        self.times = times
+        self.distances = distances
+        self.values = values
+        self.variables = variables
+        self.start = start
+
+    @property
+    def datetimes(self) -> np.ndarray:
+        """Times of the grid as datetime64."""
+        if self.start is None:
+            raise ValueError("Grid built without a startday.")
+        return self.start + self.times.astype("timedelta64[s]")
+
+    def to_seconds(self, time) -> np.ndarray:
+        """Return query times as seconds since the start of day 1."""
+        time = np.asarray(time)
+        if np.issubdtype(time.dtype, np.datetime64):
+            if self.start is None:
+                raise ValueError(
+                    "Grid built without a startday, query by seconds since "
+                    "the start of day 1 instead."
+                )
+            return (time - self.start) / np.timedelta64(1, "s")
+        return time.astype(np.float64)
+
+    def locate(self, distance, time) -> GridLocation:
+        """Find the grid cell of each query point.
+
+        Points outside the grid are moved onto its edge. The result can be
+        reused by `interpolate` for several queries of the same points.
+
+        Args:
+            distance: Distances in km.
+            time: Datetimes, or seconds since the start of day 1.
+
+        Returns:
+            Grid indices and weights of each point.
+        """
+        time_lower, time_upper, time_weight = _bracket(
+            self.times, self.to_seconds(time)
+        )
+        distance_lower, distance_upper, distance_weight = _bracket(
+            self.distances, np.asarray(distance, dtype=np.float64)
+        )
+        return GridLocation(
+            time_lower,
+            time_upper,
+            time_weight,
+            distance_lower,
+            distance_upper,
+            distance_weight,
+        )
+
+    def interpolate(
+            self,
+            distance=None,
+            time=None,
+            variables: Optional[Sequence[str]] = None,
+            location: Optional[GridLocation] = None,
+    ) -> pd.DataFrame:
+        """Bilinearly interpolate the weather at many points at once.
+
+        Angles such as 'WindDir(deg)' are interpolated like any other value,
+        without wrapping around 360.
+
+        Args:
+            distance: Distances in km.
+            time: Datetimes, or seconds since the start of day 1.
+            variables: Variables to return, default all of them.
+            location: Result of `locate` to use instead of distance and
+                time.
+
+        Returns:
+            DataFrame with a column per variable and a row per point.
+        """
+        if location is None:
+            location = self.locate(distance, time)
+        if variables is None:
+            variables = self.variables
+            values = self.values
+        else:
+            variables = list(variables)
+            values = self.values[
+                :, :, [self.variables.index(var) for var in variables]
+            ]
+        distance_weight = location.distance_weight[:, np.newaxis]
+        time_weight = location.time_weight[:, np.newaxis]
+        lower = (
+            values[location.time_lower, location.distance_lower]
+            * (1 - distance_weight)
+            + values[location.time_lower, location.distance_upper]
+            * distance_weight
+        )
+        upper = (
+            values[location.time_upper, location.distance_lower]
+            * (1 - distance_weight)
+            + values[location.time_upper, location.distance_upper]
+            * distance_weight
+        )
+        result = lower * (1 - time_weight) + upper * time_weight
+        index = distance.index if isinstance(distance, pd.Series) else None
+        return pd.DataFrame(result, columns=variables, index=index)
+
+
+def _bracket(
+        axis: np.ndarray, x: np.ndarray
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Return the lower index, upper index and weight of x along an axis."""
+    x = np.clip(np.atleast_1d(x), axis[0], axis[-1])
+    if axis.size == 1:
+        lower = np.zeros(x.shape, dtype=np.intp)
+        return lower, lower, np.zeros(x.shape)
+    lower = np.searchsorted(axis, x, side="right") - 1
+    lower = np.clip(lower, 0, axis.size - 2)
+    upper = lower + 1
+    weight = (x - axis[lower]) / (axis[upper] - axis[lower])
+    return lower, upper, weight
+
+
+class HistorySummary(NamedTuple):
+    """Summary statistics of a History file.
+
+    The first seven fields are in the order returned by
+    `S5.HPC.file_io.read_history`.
+
+    Attributes:
+        driving_time: Final driving time in s.
+        dist: Final distance in km.
+        soc: Final battery charge in %.
+        avg_vel: Average velocity while driving in km/h.
+        Vstd: Standard deviation of the velocity while driving in km/h.
+        SoCMax: Maximum battery charge in %.
+        SoCMin: Minimum battery charge in %.
+        solar_energy: Energy from the array in Wh.
+        battery_energy: Net energy out of the battery in Wh.
+        controller_energy: Energy into the motor controller in Wh.
+    """
+
+    driving_time: float
+    dist: float
+    soc: float
+    avg_vel: float
+    Vstd: float
+    SoCMax: float
+    SoCMin: float
+    solar_energy: float
+    battery_energy: float
+    controller_energy: float
+
+    @staticmethod
+    def merge_moments(
+            count: int, mean: float, m2: float, values: np.ndarray
+    ) -> Tuple[int, float, float]:
+        """Merge values into the moments of the values before them.
+
+        Uses Chan's parallel form of Welford's algorithm, so a velocity
+        standard deviation can be built up chunk by chunk.
+
+        Args:
+            count: Number of earlier values.
+            mean: Mean of the earlier values.
+            m2: Sum of the squared deviations of the earlier values from
+                their mean.
+            values: New values.
+
+        Returns:
+            The count, mean and sum of squared deviations of all the values.
+        """
+        if values.size == 0:
+            return count, mean, m2
+        # same operations as pandas' mean and std for one chunk
+        chunk_mean = values.sum() / values.size
+        chunk_m2 = ((chunk_mean - values) ** 2).sum()
+        if count == 0:
+            return values.size, chunk_mean, chunk_m2
+        total = count + values.size
+        delta = chunk_mean - mean
+        mean += delta * values.size / total
+        m2 += chunk_m2 + delta ** 2 * count * values.size / total
+        return total, mean, m2
+
+
+class HistoryState(NamedTuple):
+    """Latest state of a History file being followed.
+
+    Attributes:
+        time: Race time in s, from 'DayAndTime(s)'.
+        distance: Distance in km.
+        soc: Battery charge in %.
+        rows: Number of rows written so far.
+    """
+
+    time: float
+    distance: float
+    soc: float
+    rows: int
+
+
+_HISTORY_STATE_COLUMNS = {
+    "time": "DayAndTime(s)",
+    "distance": "Distance(km)",
+    "soc": "BatteryCharge(%)",
+}
+_HISTORY_ENERGY_COLUMNS = {
+    "solar_energy": "Solar/InputPower(W)",
+    "battery_energy": "BatteryPowerOut(W)",
+    "controller_energy": "ControllerPowerIn(W)",
+}
+_HISTORY_TIME_COLUMN = "DayAndTime(s)"
+
+
+def _summary_columns(
+        variables: List[str],
+) -> Tuple[List[str], Dict[str, str]]:
+    """Return the History columns a summary needs, and the power column of
+    each energy the History has."""
+    energies = {
+        name: col
+        for name, col in _HISTORY_ENERGY_COLUMNS.items()
+        if col in variables and _HISTORY_TIME_COLUMN in variables
+    }
+    columns = [
+        "DrivingTime(s)",
+        "Distance(km)",
+        "BatteryCharge(%)",
+        "CarVel(km/h)",
+        "Driving",
+    ]
+    if "AverageCarVel(km/h)" in variables:
+        columns.append("AverageCarVel(km/h)")
+    if energies:
+        columns += [_HISTORY_TIME_COLUMN, *energies.values()]
+    return columns, energies
+
+
+def _integrate_power(
+        data: pd.DataFrame,
+        energies: Dict[str, str],
+        energy: Dict[str, float],
+        previous: Optional[pd.DataFrame],
+) -> pd.DataFrame:
+    """Add the energy in Wh of a chunk of History power columns to `energy`.
+
+    Args:
+        data: Chunk of the History data.
+        energies: Power column of each energy to integrate.
+        energy: Energy of the earlier chunks, updated in place.
+        previous: Last row of the previous chunk, None for the first one.
+
+    Returns:
+        The last row of the chunk, to integrate the next chunk from.
+    """
+    rows = data[[_HISTORY_TIME_COLUMN, *energies.values()]]
+    if previous is not None:
+        rows = pd.concat([previous, rows])
+    time = rows[_HISTORY_TIME_COLUMN].to_numpy()
+    for name, col in energies.items():
+        power = rows[col].to_numpy()
+        energy[name] += (
+                np.sum((power[1:] + power[:-1]) * np.diff(time)) / 2 / 3600
+        )
+    return rows.iloc[[-1]]
+
+
+class DerivedFrame(pd.DataFrame):
+    """DataFrame computing columns in other units on first access.
+
+    Columns named in `derived` but not held are computed from their base
+    column the first time they are accessed by name, with ``[]`` or
+    ``.loc``, and then kept as ordinary columns after those parsed. They
+    are not listed in `columns` before they are first accessed, but
+    `TecplotData.write_tecplot` computes them all before writing.
+
+    Attributes:
+        derived: Mapping of column name to the ``(column, factor)`` it is
+            computed from, see ``DERIVED_COLUMNS``.
+    """
+
+    _metadata = ["derived"]
+
+    def __init__(
+            self,
+            *args,
+            derived: Optional[Dict[str, Tuple[str, float]]] = None,
+            **kwargs,
+    ):
+        super().__init__(*args, **kwargs)
+        self.derived = dict(derived or {})
+
+    @property
+    def _constructor(self):
+        return DerivedFrame
+
+    def __getitem__(self, key):
+        self._materialise(key)
+        return super().__getitem__(key)
+
+    def __contains__(self, key) -> bool:
+        return super().__contains__(key) or self._derivable(key)
+
+    @property
+    def loc(self):
+        return _DerivedLocIndexer(self)
+
+    def _derivable(self, name) -> bool:
+        """Return True if name is a derived column that can be computed."""
+        return (
+                isinstance(name, str)
+                and name in self.derived
+                and self.derived[name][0] in self.columns
+        )
+
+    def materialise(self) -> None:
+        """Compute every derived column that is not held."""
+        self._materialise(list(self.derived))
+
+    def _materialise(self, key) -> None:
+        """Compute the derived columns named by key that are not held."""
+        if isinstance(key, str):
+            key = [key]
+        elif not isinstance(key, (list, tuple, pd.Index)):
+            return
+        for name in key:
+            if self._derivable(name) and name not in self.columns:
+                base, factor = self.derived[name]
+                # insert, unlike setitem, does not warn on a copy of a slice
+                self.insert(
+                    self.shape[1],
+                    name,
+                    super().__getitem__(base).to_numpy() * factor,
+                )
+
+
+class _DerivedLocIndexer:
+    """``.loc`` of a DerivedFrame, computing the derived columns used."""
+
+    def __init__(self, frame: DerivedFrame):
+        self._frame = frame
+        self._indexer = pd.DataFrame.loc.fget(frame)
+
+    def __call__(self, *args, **kwargs) -> "_DerivedLocIndexer":
+        # e.g. loc(axis=1), as used within pandas
+        indexer = _DerivedLocIndexer(self._frame)
+        indexer._indexer = self._indexer(*args, **kwargs)
+        return indexer
+
+    def __getitem__(self, key):
+        if self._indexer.axis == 1:
+            self._frame._materialise(key)
+        elif isinstance(key, tuple) and len(key) == 2:
+            self._frame._materialise(key[1])
+        return self._indexer[key]
+
+    def __setitem__(self, key, value):
+        self._indexer[key] = value
+
+    def __getattr__(self, name):
+        return getattr(self._indexer, name)
+
 
 class SSHistory(TecplotData):
-    """Represents a SolarSim History file."""
+    """Represents a SolarSim History file.
+
+    Pass ``lazy_derived=True`` to `readfile`, or the constructor, to skip
+    parsing the columns that repeat another column in different units.
+    """
+
+    schema = "history"
+
+    def readfile(
+            self,
+            filename: Union[str, os.PathLike],
+            engine: str = "pandas",
+            columns: Optional[Sequence[str]] = None,
+            filters: Optional[Filters] = None,
+            cache: Union[bool, "TecplotCache", None] = None,
+            zone: Union[int, str, None] = None,
+            dtype=None,
+            lazy_derived: bool = False,
+    ) -> None:
+        """Read a History file, see `TecplotData.readfile`.
+
+        Args:
+            lazy_derived: If True and `columns` is None, the columns in
+                ``DERIVED_COLUMNS`` are not parsed, e.g. 'CarVel(m/s)' and
+                'CarVel(mph)' which are 'CarVel(km/h)' in other units.
+                They are computed when first accessed by name instead, see
+                `DerivedFrame`, and can differ from the file in the last
+                digits written.
+
+        Examples:
+            >>> histories = SSHistory.read_many(paths, lazy_derived=True)
+            >>> histories[0].data["CarVel(mph)"]
+        """
+        derived = {}
+        if lazy_derived and columns is None:
+            variables = self.peek(filename).data.columns.to_list()
+            derived = {
+                name: rule
+                for name, rule in DERIVED_COLUMNS[self.schema].items()
+                if name in variables and rule[0] in variables
+            }
+            columns = [var for var in variables if var not in derived]
+        super().readfile(
+            filename, engine, columns, filters, cache, zone, dtype
+        )
+        if derived:
+            self.data = DerivedFrame(self.data, derived=derived)
 
     def add_timestamp(self, startday="20191013", datetime_col="DDHHMMSS"):
         """Add a timestamp column with datetime.
@@ -303,38 +2810,278 @@ class SSHistory(TecplotData):
             >>> history = SSHistory("History.dat")
             >>> history.add_timestamp(startday='13102019')
         """
-        self.data.loc[:, "Day"] = (
-            self.data[datetime_col]
-                .astype(int)
-                .astype(str)
-                .str.pad(8, fillchar="0")
-                .str[0:2]
-                .astype(int)
-        )
-        startday = pd.to_datetime(startday)
-        self.data.loc[:, "DateTime"] = pd.to_datetime(
-            self.data[datetime_col]
-                .astype(int)
-                .astype(str)
-                .str.pad(8, fillchar="0")
-                .str[2:8],
-            format="%H%M%S",
-        )
-        self.data.loc[:, "DateTime"] = pd.to_datetime(
-            startday.strftime("%Y%m%d")
-            + self.data["DateTime"].dt.strftime("%H%M%S")
-        )
-        self.data.loc[:, "DateTime"] = self.data["DateTime"] + pd.to_timedelta(
-            self.data["Day"] - 1, unit="D"
+        ddhhmmss = self.data[datetime_col].to_numpy().astype(np.int64)
+        seconds = _race_seconds(ddhhmmss)
+        self.data["Day"] = ddhhmmss // 1000000
+        self.data["DateTime"] = _start_of_day(startday) + seconds.astype(
+            "timedelta64[s]"
         )
         logger.debug(
             "Timestamp column added to history file %s.", self.filename
         )
 
-    def summary(self):
-        """return a named tuple of summary"""
-        # DoD to be determined
-        raise NotImplementedError
+    def summary(self) -> HistorySummary:
+        """Summarise the loaded History data.
+
+        Returns:
+            The summary of the data, see `summarise_file`.
+
+        Raises:
+            SyntaxError: If the History has no rows.
+
+        Examples:
+            >>> hist = SSHistory("History.dat")
+            >>> hist.summary().Vstd
+        """
+        return self.summarise_file(self)
+
+    @classmethod
+    def summarise_file(
+            cls,
+            history: Union[str, os.PathLike, "SSHistory"],
+            chunksize: int = READ_CHUNKSIZE,
+            engine: str = "pandas",
+    ) -> HistorySummary:
+        """Summarise a History file in a single streaming pass.
+
+        Only the columns needed are parsed, chunk by chunk, so memory use
+        does not grow with the length of the file. The velocity statistics
+        of each chunk are merged with `HistorySummary.merge_moments` and
+        the power columns are integrated over
+        'DayAndTime(s)' with the trapezium rule. Energies are NaN if the
+        file does not have the power columns.
+
+        Args:
+            history: Path to the History file, or an already loaded
+                History to summarise its data.
+            chunksize: Number of rows parsed at a time.
+            engine: Parser for the body of the file, see `readfile`.
+
+        Returns:
+            The summary of the file.
+
+        Raises:
+            SyntaxError: If the History has no rows.
+            KeyError: If the History does not have the columns needed.
+
+        Examples:
+            >>> summary = SSHistory.summarise_file("History.dat")
+            >>> summary.dist, summary.Vstd
+        """
+        if isinstance(history, TecplotData):
+            filename = history.filename
+            variables = history.data.columns.to_list()
+        else:
+            filename = history
+            header = cls()
+            header.filename = str(filename)
+            with _open(filename) as f:
+                variables = header._read_header(f)
+        columns, energies = _summary_columns(variables)
+        has_avg_vel = "AverageCarVel(km/h)" in columns
+        n_driving = 0
+        mean_vel = 0.0
+        m2_vel = 0.0
+        soc_max = -np.inf
+        soc_min = np.inf
+        energy = dict.fromkeys(_HISTORY_ENERGY_COLUMNS, np.nan)
+        energy.update(dict.fromkeys(energies, 0.0))
+        previous = None  # last row of the previous chunk, for integration
+        last = None
+        if isinstance(history, TecplotData):
+            chunks = [history.data]
+        else:
+            # every column is read as float64, skipping type inference
+            chunks = (
+                chunk.data
+                for chunk in cls.iter_chunks(
+                    filename,
+                    chunksize,
+                    engine=engine,
+                    columns=columns,
+                    dtype="float64",
+                )
+            )
+        for data in chunks:
+            if data.empty:
+                continue
+            soc = data["BatteryCharge(%)"].to_numpy()
+            soc_max = max(soc_max, soc.max())
+            soc_min = min(soc_min, soc.min())
+            vel = data["CarVel(km/h)"].to_numpy()[
+                data["Driving"].to_numpy() == 1
+            ]
+            n_driving, mean_vel, m2_vel = HistorySummary.merge_moments(
+                n_driving, mean_vel, m2_vel, vel
+            )
+            if energies:
+                previous = _integrate_power(data, energies, energy, previous)
+            last = data.iloc[-1]
+
+        if last is None:
+            raise SyntaxError(f"History file {filename} has no data.")
+        if has_avg_vel:
+            avg_vel = last["AverageCarVel(km/h)"]
+        elif n_driving:
+            # Note that due to downsampling in History file there will be a
+            # small discrepancy between ones previously calculated in
+            # SolarSim and this one here
+            avg_vel = mean_vel
+        else:
+            avg_vel = np.nan
+        return HistorySummary(
+            last["DrivingTime(s)"],
+            last["Distance(km)"],
+            last["BatteryCharge(%)"],
+            avg_vel,
+            np.sqrt(m2_vel / n_driving) if n_driving else np.nan,
+            soc_max,
+            soc_min,
+            energy["solar_energy"],
+            energy["battery_energy"],
+            energy["controller_energy"],
+        )
+
+    @classmethod
+    def follow(
+            cls,
+            filename: Union[str, os.PathLike],
+            columns: Optional[List[str]] = None,
+    ) -> "HistoryFollower":
+        """Follow a History file while SolarSim is still writing it.
+
+        Args:
+            filename: Path to the History file, which need not exist yet.
+            columns: Columns of the rows returned by
+                `HistoryFollower.poll`, default all of them.
+
+        Returns:
+            A follower, call its `poll` method to parse new rows.
+
+        Examples:
+            >>> follower = SSHistory.follow("History.dat")
+            >>> new_rows = follower.poll()
+            >>> follower.state.distance, follower.state.soc
+        """
+        return HistoryFollower(filename, columns)
+
+
+class HistoryFollower:
+    """Incrementally parse a History file as it is written.
+
+    Each `poll` reads only the bytes appended since the last one. The
+    offset of the first incomplete line is kept, so a row is parsed once
+    it has been written completely. Nothing is parsed until the header
+    lines are complete, and the file is followed from the start again if
+    it is truncated or replaced by a shorter one, as when a run restarts.
+
+    Attributes:
+        filename: Path to the History file.
+        columns: Columns of the rows returned by `poll`, None for all.
+        variables: Variables of the file, None until the header is read.
+        offset: Byte offset of the first line not parsed yet.
+        rows: Number of rows parsed.
+        state: Latest state of the run, None until a row is parsed.
+    """
+
+    def __init__(
+            self,
+            filename: Union[str, os.PathLike],
+            columns: Optional[List[str]] = None,
+    ):
+        self.filename = filename
+        self.columns = columns
+        self.variables: Optional[List[str]] = None
+        self.offset = 0
+        self.rows = 0
+        self.state: Optional[HistoryState] = None
+
+    def poll(self, final: bool = False) -> pd.DataFrame:
+        """Parse the rows appended to the file since the last poll.
+
+        Args:
+            final: Also parse a last line that does not end with a newline,
+                once the file is known to be complete.
+
+        Returns:
+            The new rows, indexed by their row number in the file. Empty if
+            there are no new complete rows or the file does not exist yet.
+
+        Raises:
+            KeyError: If a column is not in the file.
+        """
+        try:
+            f = open(self.filename, "rb")
+        except FileNotFoundError:
+            return self._empty()
+        with f:
+            size = os.fstat(f.fileno()).st_size
+            if size < self.offset:
+                logger.debug(
+                    "%s was truncated, following it again", self.filename
+                )
+                self.variables = None
+                self.offset = 0
+                self.rows = 0
+                self.state = None
+            if self.variables is None and not self._read_header(f):
+                return self._empty()
+            f.seek(self.offset)
+            body = f.read(size - self.offset)
+        if not final:
+            # leave a partly written last line for the next poll
+            body = body[: body.rfind(b"\n") + 1]
+        self.offset += len(body)
+        lines = [line for line in body.splitlines(True) if line.strip()]
+        if not lines:
+            return self._empty()
+        usecols = self._usecols()
+        data, n_rows = _parse_lines(
+            lines, self.variables, "numpy", usecols, None, self.rows
+        )
+        self.rows += n_rows
+        last = data.iloc[-1]
+        self.state = HistoryState(
+            **{
+                name: last[col] if col in data.columns else np.nan
+                for name, col in _HISTORY_STATE_COLUMNS.items()
+            },
+            rows=self.rows,
+        )
+        return data[self.columns or self.variables]
+
+    def _read_header(self, f: BinaryIO) -> bool:
+        """Read the header if it has been written, return True if it has."""
+        # the header is at most five lines: title, variables, two datum
+        # lines and the zone line, which counts once its newline is written
+        head = b"".join(itertools.islice(f, 5))
+        head = head[: head.rfind(b"\n") + 1]
+        header = SSHistory()
+        header.filename = os.fspath(self.filename)
+        buffer = io.BytesIO(head)
+        try:
+            variables = header._read_header(buffer)
+        except SyntaxError:
+            return False
+        for col in self.columns or []:
+            if col not in variables:
+                raise KeyError(f"{col} is not a variable of {self.filename}")
+        self.variables = variables
+        self.offset = buffer.tell()
+        return True
+
+    def _usecols(self) -> List[str]:
+        """Return the columns to parse, the state columns included."""
+        if self.columns is None:
+            return self.variables
+        needed = set(self.columns).union(_HISTORY_STATE_COLUMNS.values())
+        return [var for var in self.variables if var in needed]
+
+    def _empty(self) -> pd.DataFrame:
+        """Return a frame with the columns of `poll` and no rows."""
+        return pd.DataFrame(
+            columns=self.columns or self.variables, dtype=np.float64
+        )
 
 
 class TPHeaderZone:
@@ -352,7 +3099,7 @@ class TPHeaderZone:
         ni: Number of datapoints in the I direction.
         nj: Number of datapoints in the J direction.
         nk: Number of datapoints in the K direction.
-        F: Tecplot data packing format (`POINT`)
+        F: Tecplot data packing format, `POINT` or `BLOCK`.
     """
 
     def __init__(self, zonestr='Zone T = " ", I = 1, J = 1, K = 1, F = POINT'):
@@ -373,25 +3120,185 @@ class TPHeaderZone:
         except SyntaxError as exc:
             raise SyntaxError(f"Bad zone title format: {zonestr}") from exc
 
-    def to_string(self) -> str:
+    def is_block(self) -> bool:
+        """Return True if the data is BLOCK (variable by variable) packed."""
+        return self.F.strip().upper() == "BLOCK"
+
+    def to_string(self, width: Optional[int] = None) -> str:
         """Return the zone line as a str for writing to .dat.
 
+        Args:
+            width: If given, I, J and K are right aligned in fields of this
+                many characters, leaving room for `append_tecplot` to
+                patch larger counts into the line in place.
+
         Returns:
             Str complied from the obj attributes as the zone line in the header.
         """
 
-        output = f'Zone T = "{self.zonetitle}"'
-        output = (
-                output
-                + f", I = {int(self.ni)}, J = {int(self.nj)}, K = {int(self.nk)}, "
-                  f"F = {self.F}"
+        width = width or 0
+        ni, nj, nk = (
+            f"{int(n):>{width}}" for n in (self.ni, self.nj, self.nk)
         )
+        output = f'Zone T = "{self.zonetitle}"'
+        output = output + f", I = {ni}, J = {nj}, K = {nk}, F = {self.F}"
         return output
 
     def __repr__(self):
         return self.to_string()
 
 
+class TecplotCache:
+    """Columnar (Parquet) copies of parsed Tecplot files.
+
+    Each entry holds the title, datum, zone and data of a file and is keyed
+    on the absolute path, size and modification time of the file, so an
+    edited file is parsed again. Entries are evicted least recently used
+    first once the cache grows past `max_bytes`.
+
+    The cache directory defaults to the ``S5_CACHE_DIR`` environment
+    variable, falling back to ``~/.cache/S5``. On HPC point it at node-local
+    scratch, e.g. ``export S5_CACHE_DIR=$TMPDIR/S5``.
+
+    Attributes:
+        cache_dir: Directory holding the cached files.
+        max_bytes: Size limit of the cache directory in bytes.
+
+    Examples:
+        >>> cache = TecplotCache("/scratch/s5_cache", max_bytes=10 * 2**30)
+        >>> weather = SSWeather("Weather.dat", cache=cache)
+        >>> history = SSHistory("History.dat", cache=True)
+    """
+
+    def __init__(
+            self,
+            cache_dir: Union[str, os.PathLike, None] = None,
+            max_bytes: int = 2 * 2 ** 30,
+    ):
+        if cache_dir is None:
+            cache_dir = os.environ.get(
+                "S5_CACHE_DIR",
+                os.path.join(os.path.expanduser("~"), ".cache", "S5"),
+            )
+        self.cache_dir = str(cache_dir)
+        self.max_bytes = max_bytes
+
+    def key(self, filename: Union[str, os.PathLike], **options) -> str:
+        """Return the cache key of a file.
+
+        Args:
+            filename: Path to the Tecplot file.
+            **options: Read options that change the parsed data, such as the
+                engine.
+        """
+        stat = os.stat(filename)
+        ident = repr(
+            (
+                os.path.abspath(filename),
+                stat.st_size,
+                stat.st_mtime_ns,
+                sorted(options.items()),
+            )
+        )
+        return hashlib.sha256(ident.encode()).hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, key + ".parquet")
+
+    def load(
+            self,
+            tecplot: "TecplotData",
+            key: str,
+            columns: Optional[Sequence[str]] = None,
+            filters: Optional[Filters] = None,
+    ) -> bool:
+        """Load a cached file into `tecplot`.
+
+        Only the requested columns and rows are read from the Parquet file.
+
+        Returns:
+            True if the file was in the cache.
+        """
+        path = self._path(key)
+        try:
+            schema = pq.read_schema(path)
+        except FileNotFoundError:
+            return False
+        filters = filters or {}
+        usecols = _usecols(schema.names, columns, filters)
+        pq_filters = []
+        for col, (lower, upper) in filters.items():
+            if lower is not None:
+                pq_filters.append((col, ">=", lower))
+            if upper is not None:
+                pq_filters.append((col, "<=", upper))
+        table = pq.read_table(
+            path, columns=usecols, filters=pq_filters or None
+        )
+        header = json.loads(schema.metadata[_CACHE_METADATA_KEY])
+        tecplot.title = header["title"]
+        tecplot.pressure = header["pressure"]
+        tecplot.temperature = header["temperature"]
+        tecplot.datum = header["datum"]
+        tecplot.zone = TPHeaderZone(header["zone"])
+        tecplot.data = table.to_pandas()
+        if columns is not None:
+            tecplot.data = tecplot.data.loc[:, list(columns)]
+        # mark as recently used for eviction
+        os.utime(path)
+        logger.info("Loaded %s from cache %s.", tecplot.filename, path)
+        return True
+
+    def store(self, tecplot: "TecplotData", key: str) -> None:
+        """Store `tecplot` in the cache and evict old entries if needed."""
+        os.makedirs(self.cache_dir, exist_ok=True)
+        header = {
+            "title": tecplot.title,
+            "pressure": tecplot.pressure,
+            "temperature": tecplot.temperature,
+            "datum": tecplot.datum,
+            "zone": tecplot.zone.to_string(),
+        }
+        table = pa.Table.from_pandas(tecplot.data, preserve_index=False)
+        table = table.replace_schema_metadata(
+            {
+                **(table.schema.metadata or {}),
+                _CACHE_METADATA_KEY: json.dumps(header),
+            }
+        )
+        path = self._path(key)
+        # write then rename so concurrent readers never see a partial file
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        pq.write_table(table, tmp_path)
+        os.replace(tmp_path, path)
+        self.evict()
+
+    def evict(self) -> None:
+        """Remove least recently used entries until under `max_bytes`."""
+        entries = []
+        for entry in os.scandir(self.cache_dir):
+            if entry.name.endswith(".parquet"):
+                stat = entry.stat()
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:  # already evicted by another process
+                pass
+            total -= size
+
+    def clear(self) -> None:
+        """Remove every entry in the cache."""
+        if not os.path.isdir(self.cache_dir):
+            return
+        for entry in os.scandir(self.cache_dir):
+            if entry.name.endswith(".parquet"):
+                os.remove(entry.path)
+
+
 class DSWinput:
     """Repersent DSW input file such as LogVolts.in or SolarSim.in.
 
@@ -411,7 +3318,8 @@ class DSWinput:
         """Read in the input file.
 
         Args:
-            filename: File name of the file to read in.
+            filename: File name of the file to read in, which may be
+                compressed.
 
         Returns:
             A DSWinput object representing the file that was read.
@@ -419,7 +3327,7 @@ class DSWinput:
         Examples:
             >>> control_file = DSWinput.readfile('SolarSim.in')
         """
-        with open(filename) as f:
+        with _open(filename, "r") as f:
             self.lines = f.readlines()
         return self
 
@@ -469,11 +3377,32 @@ class DSWinput:
                 return 1
         raise ValueError("param not in input file")
 
+    def file_params(self) -> Dict[str, str]:
+        """Get the parameters naming input files and their paths.
+
+        Parameters are taken to name files if their name ends in ``File``,
+        e.g. ``WeatherFile``. Quotes around the paths are removed.
+
+        Returns:
+            Mapping of parameter name to path, in the order of the file.
+
+        Examples:
+            >>> control_file = DSWinput('SolarSim.in')
+            >>> control_file.file_params()["WeatherFile"]
+        """
+        params = {}
+        for line in self.lines:
+            mtch = _INPUT_PARAM_RE.match(line)
+            if mtch is not None and mtch.group(1).endswith("File"):
+                params[mtch.group(1)] = mtch.group(2).strip().strip('"')
+        return params
+
     def write_input(self, filename: str) -> None:
         """Write input file to a file.
 
         Args:
-            filename: Name of the output file.
+            filename: Name of the output file, compressed according to
+                its extension (``.gz``, ``.bz2``, ``.xz`` or ``.zst``).
 
         Returns:
             None
@@ -483,7 +3412,7 @@ class DSWinput:
             >>> control_file.write_input('SolarSim.in')
         """
 
-        with open(filename, "w") as f:
+        with _open(filename, "w") as f:
             f.writelines(self.lines)
 
     def format(self, sysformat: str) -> None:
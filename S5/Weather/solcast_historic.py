@@ -244,11 +244,8 @@ if __name__ == '__main__':  # pragma: no cover
             """quick test to make sure noting have bwoken yet..."""
             f1_path = r'E:\solar_car_race_strategy\SolCastHistoric\Weather-SolCast-temp.dat'
             f2_path = r'E:\solar_car_race_strategy\SolCastHistoric\Weather-SolCast-N200-20220530.dat'
-            with open(f1_path) as f1:
-                with open(f2_path) as f2:
-                    f1lines = f1.readlines()
-                    f2lines = f2.readlines()
-            assert f1lines == f2lines
+            diff = TP.compare_tecplot(f1_path, f2_path)
+            assert diff.equal, diff
 
 
         test_dev_compare_outfile()
@@ -1,7 +1,12 @@
+import asyncio
+import functools
+import itertools
 import multiprocessing as mp
 import os
+import signal
 import subprocess as sp
-from itertools import cycle
+import sys
+import time
 from unittest import mock
 
 import numpy as np
@@ -13,48 +18,130 @@ import S5.HPC.SolarSim as SS
 import S5.HPC.file_io as S5io
 from S5 import Tecplot as TP
 
+POPEN_KWARGS = (
+    {'creationflags': sp.CREATE_NEW_PROCESS_GROUP} if os.name == 'nt'
+    else {'start_new_session': True}
+)
 
-@pytest.fixture(scope='function')
-def mock_Popen(mock_sp):
-    with mock.patch.object(sp, "Popen") as mock_Popen:
-        mock_Popen.return_value = mock_sp
-        yield mock_Popen
+
+@pytest.fixture()
+def solarsim_output():
+    """What the mocked SolarSim writes to stdout."""
+    return b'Read in OK.\n'
 
 
 @pytest.fixture(scope='function')
-def mock_sp():
-    mock_sp = mock.MagicMock(name='mock_sp')
-    mock_stdout = mock.MagicMock(name='mock_sp.stdout')
-    mock_sp.poll = mock.MagicMock(side_effect=cycle([1, 1, None]))
-    mock_sp.stdout = mock_stdout
-    return mock_sp
+def mock_Popen(solarsim_output):
+    processes = []
+
+    def start(*args, **kwargs):
+        """Return a finished SolarSim process, with its stdout in a pipe."""
+        read_fd, write_fd = os.pipe()
+        with os.fdopen(write_fd, 'wb') as f:
+            f.write(solarsim_output)
+        mock_sp = mock.MagicMock(name='mock_sp')
+        mock_sp.stdout = os.fdopen(read_fd, 'rb')
+        mock_sp.poll = mock.MagicMock(return_value=0)
+        mock_sp.wait = mock.MagicMock(return_value=0)
+        mock_sp.returncode = 0
+        processes.append(mock_sp)
+        return mock_sp
+
+    with mock.patch.object(sp, "Popen", side_effect=start) as mock_Popen:
+        yield mock_Popen
+    for process in processes:
+        process.stdout.close()
 
 
 @pytest.fixture()
-def mock_read_history(history_file):
-    mock_result = S5io.read_history(history_file)
-    with mock.patch.object(SS, 'read_history', autospec=True) as mock_read_history:
-        mock_read_history.return_value = mock_result
-        yield mock_read_history
+def fake_solarsim(tmp_path):
+    """Write a script standing in for SolarSim, running `body` after
+    printing its read in message, or `read_in` then the message."""
+    def write(body, read_in=''):
+        path = tmp_path / 'SolarSim.X'
+        path.write_text(
+            f'#!{sys.executable}\n'
+            'import os, subprocess, sys, time\n'
+            + read_in
+            + 'print("Read in OK.", flush=True)\n'
+            + body
+        )
+        path.chmod(0o755)
+        return str(path)
+    return write
+
+
+# a SolarSim recording when it ran and the target velocity it read in, from
+# the TargetVelFile of its control file
+TIMED_READ_IN = (
+    'start = time.time()\n'
+    'target_vel = "TargetVel.dat"\n'
+    'if os.path.exists(sys.argv[1]):\n'
+    '    for line in open(sys.argv[1]):\n'
+    '        if line.startswith("TargetVelFile"):\n'
+    '            target_vel = line.split("=", 1)[1].strip().strip(\'"\')\n'
+    'target = open(target_vel).read() if os.path.exists(target_vel) else ""\n'
+    'time.sleep(0.2)\n'
+)
+SWEEP_CONTROL = 'Title = "sweep"\nTargetVelFile = "TargetVel.dat"\n'
+
+TIMED_RUN = (
+    'read_in = time.time()\n'
+    'time.sleep(0.3)\n'
+    'with open(sys.argv[3], "w") as f:\n'
+    '    f.write(f"{start} {read_in} {time.time()}\\n" + target)\n'
+)
+
+
+def max_concurrent(intervals):
+    """Return the maximum number of (start, end) intervals overlapping."""
+    events = sorted([(start, 1) for start, _ in intervals] + [(end, -1) for _, end in intervals])
+    return max(itertools.accumulate(change for _, change in events))
+
+
+def read_timings(paths):
+    """Return the (start, read in, end) times recorded by TIMED_RUN."""
+    timings = []
+    for path in paths:
+        with open(path) as f:
+            timings.append([float(t) for t in f.readline().split()])
+    return timings
 
 
-@pytest.mark.parametrize('SS_mode', ['HPC', "Normal"])
-def test_run_ss(mock_Popen, SS_mode):
+@pytest.fixture()
+def sweep_histories(history_file, tmp_path):
+    """Copy the history file in as the results of a sweep, returning the
+    expected summary of each run."""
+    def copy_history(filename, distance):
+        hist = TP.SSHistory(history_file)
+        hist.data["Distance(km)"] += distance
+        hist.write_tecplot(tmp_path / filename)
+        return S5io.read_history(tmp_path / filename)
+    return copy_history
+
+
+@pytest.mark.parametrize('solarsim_output', [
+    b'Read in OK.\n',
+    b'DDHHMM=010830  DrivingTime=     1s  Distance=   0 km  LapN=  1   DistanceWithinLap=  0.0 km   CarVel=  0.0 km/h   YawAngle=86.8 deg ControllerPower=-3000.0 W  Battery= 98.0 %  AverageVel=  0.0 km/h  SolarPower=353.1 W\n',
+    b'Reading Weather.dat\nRead in OK.',
+    b'',
+])
+def test_run_ss(mock_Popen, solarsim_output, capsys, tmp_path, monkeypatch):
+    # run_ss removes existing outputs before it starts
+    monkeypatch.chdir(tmp_path)
     solarsim_location = r'.\SolarSim4.1.exe'
     control = r'SolarSim.in'
     summary = r'Summary.dat'
     history = r'History.dat'
     solartotals = r'SolarTotals.dat'
-    if SS_mode == 'HPC':
-        mock_Popen.return_value.readline = mock.MagicMock(return_value=b'Read in OK.\n')
-    elif SS_mode == 'Normal':
-        mock_Popen.return_value.readline = mock.MagicMock(
-            return_value=b'DDHHMM=010830  DrivingTime=     1s  Distance=   0 km  LapN=  1   DistanceWithinLap=  0.0 km   CarVel=  0.0 km/h   YawAngle=86.8 deg ControllerPower=-3000.0 W  Battery= 98.0 %  AverageVel=  0.0 km/h  SolarPower=353.1 W\n')
-    SS.run_ss(solarsim_location, control, summary, history, solartotals)
-    mock_Popen.assert_called_once_with([solarsim_location, control, summary, history, solartotals], stdout=sp.PIPE)
+    assert SS.run_ss(solarsim_location, control, summary, history, solartotals) == 0
+    mock_Popen.assert_called_once_with([solarsim_location, control, summary, history, solartotals], stdout=sp.PIPE,
+                                       **POPEN_KWARGS)
+    assert ('read in completed' in capsys.readouterr().out) == bool(solarsim_output)
 
 
-def test_run_ss_with_lock(mock_Popen):
+def test_run_ss_with_lock(mock_Popen, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
     solarsim_location = r'.\SolarSim4.1.exe'
     control = r'SolarSim.in'
     summary = r'Summary.dat'
@@ -63,23 +150,56 @@ def test_run_ss_with_lock(mock_Popen):
     lock = mp.Lock()
     lock.acquire()
     SS.run_ss(solarsim_location, control, summary, history, solartotals, lock)
-    mock_Popen.assert_called_once_with([solarsim_location, control, summary, history, solartotals], stdout=sp.PIPE)
-
-
-def test_run_ss_timeout(mock_Popen, monkeypatch, capsys):
-    mock_Popen.return_value.poll = mock.MagicMock(return_value=None)
-    solarsim_location = r'.\SolarSim4.1.exe'
-    control = r'SolarSim.in'
-    summary = r'Summary.dat'
-    history = r'History.dat'
-    solartotals = r'SolarTotals.dat'
+    mock_Popen.assert_called_once_with([solarsim_location, control, summary, history, solartotals], stdout=sp.PIPE,
+                                       **POPEN_KWARGS)
+    assert lock.acquire(block=False)
+
+
+@pytest.mark.skipif(os.name == 'nt', reason='fake SolarSim is a POSIX script')
+def test_run_ss_process(fake_solarsim, tmp_path, capsys, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    # more output than a pipe holds, written after read in
+    executable = fake_solarsim(
+        'for i in range(20000):\n'
+        '    print("DDHHMM=010830  DrivingTime=     1s  Distance=   0 km")\n'
+        'sys.exit(3)\n'
+    )
     lock = mp.Lock()
     lock.acquire()
-    monkeypatch.setattr(np, "timedelta64", mock.MagicMock(return_value=0))
-    SS.run_ss(solarsim_location, control, summary, history, solartotals, lock)
-    mock_Popen.assert_called_once_with([solarsim_location, control, summary, history, solartotals], stdout=sp.PIPE)
-    assert capsys.readouterr().out.find("SolarSim process timeout. Potential deadlock from subprocess.Popen, consider " \
-                                        "increasing SolarSim update interval")
+    assert SS.run_ss(executable, 'SolarSim.in', 'Summary.dat', 'History.dat', 'SolarTotals.dat', lock) == 3
+    assert lock.acquire(block=False)
+    assert 'timeout' not in capsys.readouterr().out
+
+
+@pytest.mark.skipif(os.name == 'nt', reason='fake SolarSim is a POSIX script')
+def test_run_ss_timeout(fake_solarsim, tmp_path, capsys, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    # SolarSim goes quiet after read in, with a process of its own running
+    executable = fake_solarsim(
+        'child = subprocess.Popen([sys.executable, "-c", "import time; time.sleep(60)"])\n'
+        'with open(sys.argv[2], "w") as f:\n'
+        '    f.write(str(child.pid))\n'
+        'time.sleep(60)\n'
+    )
+    summary = tmp_path / 'Summary.dat'
+    start = time.monotonic()
+    returncode = SS.run_ss(executable, 'SolarSim.in', summary, 'History.dat', 'SolarTotals.dat', timeout=2)
+    assert time.monotonic() - start < 10
+    assert returncode == -signal.SIGKILL
+    assert 'SolarSim process timeout' in capsys.readouterr().out
+    # the whole process group is killed
+    child = int(summary.read_text())
+    deadline = time.monotonic() + 5
+    while time.monotonic() < deadline:
+        try:
+            with open(f'/proc/{child}/stat') as f:
+                if f.read().split()[2] == 'Z':
+                    break
+        except FileNotFoundError:
+            break
+        time.sleep(0.05)
+    else:
+        pytest.fail('child of SolarSim still running')
 
 
 def test_const_vel(tmp_path, mock_Popen):
@@ -107,13 +227,12 @@ def test_vel_sweep_output_filename(tmp_path, mock_Popen, monkeypatch):
     solarsim_location = r'.\SolarSim4.1.exe'
     original_dir = os.getcwd()
     os.chdir(tmp_path)
-    mock_Popen.return_value.readline = mock.MagicMock(return_value=b'Read in OK.\n')
 
     SS.vel_sweep(vel_list, solarsim_location)
     os.chdir(original_dir)
     v = vel_list[0]
     mock_Popen.assert_called_once_with([solarsim_location, "SolarSim.in", f"Summary_{v}.dat", f"History_{v}.dat",
-                                        f"SolarTotals_{v}.dat"], stdout=sp.PIPE)
+                                        f"SolarTotals_{v}.dat"], stdout=sp.PIPE, **POPEN_KWARGS)
 
 
 def test_vel_sweep_times_called(tmp_path, mock_Popen, monkeypatch):
@@ -121,28 +240,187 @@ def test_vel_sweep_times_called(tmp_path, mock_Popen, monkeypatch):
     solarsim_location = r'.\SolarSim4.1.exe'
     original_dir = os.getcwd()
     os.chdir(tmp_path)
-    mock_Popen.return_value.readline = mock.MagicMock(return_value=b'Read in OK.\n')
 
     SS.vel_sweep(vel_list, solarsim_location)
     os.chdir(original_dir)
     assert mock_Popen.call_count == len(vel_list)
 
 
-@pytest.mark.skip('Tests for multiprocessing functions to be implemented')
-def test_vel_sweep_par():
-    # TODO: fix tests involveing multiprocessing
-    pass
-
-
-# TODO:improve to test the content of the output dataframe
-def test_read_vel_sweep(tmp_path, mock_read_history):
+@pytest.mark.skipif(os.name == 'nt', reason='fake SolarSim is a POSIX script')
+@pytest.mark.parametrize('stage_dir', ['runs', None])
+def test_vel_sweep_par(tmp_path, fake_solarsim, monkeypatch, stage_dir):
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / 'SolarSim.in').write_text(SWEEP_CONTROL)
+    executable = fake_solarsim(TIMED_RUN, read_in=TIMED_READ_IN)
+    vel_list = [60.5, 61.5, 62.5, 63.5]
+    SS.vel_sweep_par(vel_list, executable, n_jobs=3, stage_dir=stage_dir)
+    timings = read_timings(f'History_{v}.dat' for v in vel_list)
+    read_ins = max_concurrent([(start, read_in) for start, read_in, _ in timings])
+    if stage_dir is None:
+        # the shared target velocity file is rewritten for each read in
+        assert read_ins == 1
+    else:
+        assert read_ins > 1
+        assert (tmp_path / 'runs' / 'vel_60.5' / 'TargetVel.dat').exists()
+        assert not (tmp_path / 'TargetVel.dat').exists()
+    assert max_concurrent([(start, end) for start, _, end in timings]) > 1
+    for v in vel_list:
+        with open(f'History_{v}.dat') as f:
+            assert str(v) in f.read()
+
+
+@pytest.mark.skipif(os.name == 'nt', reason='fake SolarSim is a POSIX script')
+def test_vel_sweep_par_cache(tmp_path, fake_solarsim, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / 'SolarSim.in').write_text(SWEEP_CONTROL)
+    launches = tmp_path / 'launches'
+    executable = fake_solarsim(
+        f'open({str(launches)!r}, "a").write(sys.argv[3] + "\\n")\n' + TIMED_RUN
+        + 'for output in (sys.argv[2], sys.argv[4]):\n'
+        '    open(output, "w").close()\n',
+        read_in=TIMED_READ_IN,
+    )
+    cache = SS.RunCache(tmp_path / 'cache')
+    SS.vel_sweep_par([60.5, 61.5], executable, n_jobs=2, cache=cache)
+    first = (tmp_path / 'History_61.5.dat').read_text()
+    os.remove(tmp_path / 'History_61.5.dat')
+    SS.vel_sweep_par([60.5, 61.5, 62.5], executable, n_jobs=2, cache=cache)
+    assert sorted(launches.read_text().split()) == [
+        str(tmp_path / f'History_{v}.dat') for v in (60.5, 61.5, 62.5)
+    ]
+    assert (tmp_path / 'History_61.5.dat').read_text() == first
+    assert len(os.listdir(tmp_path / 'cache')) == 3
+    # a serial run of the same inputs is a hit as well
+    S5io.write_vel(62.5, 'TargetVel.dat')
+    assert SS.run_ss(executable, 'SolarSim.in', 'Summary.dat', 'History.dat', 'SolarTotals.dat', cache=cache) == 0
+    assert len(launches.read_text().split()) == 3
+    assert (tmp_path / 'History.dat').read_text() == (tmp_path / 'History_62.5.dat').read_text()
+
+
+@pytest.mark.skipif(os.name == 'nt', reason='fake SolarSim is a POSIX script')
+def test_vel_sweep_par_journal(tmp_path, fake_solarsim, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / 'SolarSim.in').write_text(SWEEP_CONTROL)
+    launches = tmp_path / 'launches'
+    fail = tmp_path / 'fail'
+    executable = fake_solarsim(
+        f'open({str(launches)!r}, "a").write(sys.argv[3] + "\\n")\n' + TIMED_RUN
+        + f'if "61.5" in target and os.path.exists({str(fail)!r}):\n'
+        '    sys.exit(1)\n'
+        'for output in (sys.argv[2], sys.argv[4]):\n'
+        '    open(output, "w").close()\n',
+        read_in=TIMED_READ_IN,
+    )
+    vel_list = [60.5, 61.5, 62.5]
+    fail.touch()
+    with SS.RunJournal(tmp_path / 'journal.sqlite') as journal:
+        SS.vel_sweep_par(vel_list, executable, n_jobs=3, journal=journal)
+        assert journal.runs()['state'].sort_index().to_list() == ['done', 'failed', 'done']
+    fail.unlink()
+    # truncated by the end of the job
+    with open(tmp_path / 'History_62.5.dat', 'r+') as f:
+        f.truncate(10)
+    launches.unlink()
+    with SS.RunJournal(tmp_path / 'journal.sqlite') as journal:
+        SS.vel_sweep_par(vel_list, executable, n_jobs=3, journal=journal)
+        assert journal.runs()['state'].to_list() == ['done'] * 3
+        assert all(journal.verify(str(tmp_path / f'History_{v}.dat')) for v in vel_list)
+    assert sorted(launches.read_text().split()) == [
+        str(tmp_path / f'History_{v}.dat') for v in (61.5, 62.5)
+    ]
+    for v in vel_list:
+        with open(f'History_{v}.dat') as f:
+            assert str(v) in f.read()
+
+
+@pytest.mark.skipif(os.name == 'nt', reason='fake SolarSim is a POSIX script')
+@pytest.mark.parametrize('max_runs, max_read_ins', [(2, 1), (4, 2), (1, 4)])
+def test_run_sweep(tmp_path, fake_solarsim, monkeypatch, max_runs, max_read_ins):
+    monkeypatch.chdir(tmp_path)
+    executable = fake_solarsim(TIMED_RUN, read_in=TIMED_READ_IN)
+    prepared = []
+    runs = [
+        SS.SolarSimRun('SolarSim.in', f'Summary_{i}.dat', f'History_{i}.dat', f'SolarTotals_{i}.dat',
+                       prepare=functools.partial(prepared.append, i))
+        for i in range(5)
+    ]
+    assert SS.run_sweep(runs, executable, max_runs, max_read_ins) == [0] * 5
+    assert prepared == list(range(5))
+    timings = read_timings(run.history for run in runs)
+    assert max_concurrent([(start, read_in) for start, read_in, _ in timings]) <= max_read_ins
+    assert max_concurrent([(start, end) for start, _, end in timings]) <= max_runs
+
+
+@pytest.mark.skipif(os.name == 'nt', reason='fake SolarSim is a POSIX script')
+def test_run_sweep_timeout(tmp_path, fake_solarsim, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    executable = fake_solarsim('time.sleep(float(sys.argv[1]))\n')
+    runs = [SS.SolarSimRun(t, 'Summary.dat', 'History.dat', 'SolarTotals.dat') for t in ['0', '60']]
+    start = time.monotonic()
+    assert SS.run_sweep(runs, executable, timeout=1) == [0, -signal.SIGKILL]
+    assert time.monotonic() - start < 10
+
+
+@pytest.mark.skipif(os.name == 'nt', reason='fake SolarSim is a POSIX script')
+def test_run_sweep_long_lines(tmp_path, fake_solarsim, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    # progress output overwritten with \r, never ending a line
+    executable = fake_solarsim(
+        'for i in range(20000):\n'
+        '    sys.stdout.write(f"DDHHMM=010830 {i:10d} km\\r")\n'
+        'sys.stdout.flush()\n'
+    )
+
+    def fail():
+        raise OSError('disk full')
+
+    runs = [
+        SS.SolarSimRun('SolarSim.in', f'Summary_{i}.dat', f'History_{i}.dat', f'SolarTotals_{i}.dat')
+        for i in range(3)
+    ]
+    runs[1] = runs[1]._replace(prepare=fail)
+    assert SS.run_sweep(runs, executable, max_runs=3) == [0, None, 0]
+    assert SS.run_ss(executable, *runs[0][:4]) == 0
+
+
+@pytest.mark.skipif(os.name == 'nt', reason='fake SolarSim is a POSIX script')
+def test_run_sweep_running_loop(tmp_path, fake_solarsim, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    executable = fake_solarsim('')
+    runs = [SS.SolarSimRun('SolarSim.in', 'Summary.dat', 'History.dat', 'SolarTotals.dat')]
+
+    async def notebook_cell():
+        return SS.run_sweep(runs, executable)
+
+    # as in Jupyter, where an event loop is always running
+    assert asyncio.run(notebook_cell()) == [0]
+
+
+@pytest.mark.parametrize('blocks, read_in', [
+    ([b'Reading Weather.dat\nRead in OK.\n'], True),
+    ([b'Reading Weather.dat\nDD', b'HHMM=010830'], True),
+    ([b'Loading Weather.dat\r' * 10000, b'\n'], False),
+    ([b'x' * 10000, b'Read in OK.'], False),
+])
+def test_scan_read_in(blocks, read_in):
+    line_start = b''
+    found = False
+    for block in blocks:
+        found, line_start = SS._scan_read_in(line_start, block)
+        assert len(line_start) <= SS._MARKER_BYTES
+    assert found == read_in
+
+
+@pytest.mark.parametrize('n_jobs', [1, 2])
+def test_read_vel_sweep(tmp_path, sweep_histories, n_jobs):
     vel_list = [i for i in range(65, 70)]
+    expected = [sweep_histories(f"History_{v}.dat", v) for v in vel_list]
 
-    output = SS.read_vel_sweep(vel_list, path=tmp_path)
-    assert mock_read_history.call_count == len(vel_list)
-    v = vel_list[-1]
-    mock_read_history.assert_called_with(os.path.join(tmp_path, f"History_{v}.dat"))
+    output = SS.read_vel_sweep(vel_list, path=tmp_path, n_jobs=n_jobs)
     assert isinstance(output, pd.DataFrame)
+    assert output["tVel"].to_list() == vel_list
+    assert output.iloc[:, 1:].dtypes.eq(np.float64).all()
+    assert output.iloc[:, 1:].values.tolist() == [list(e) for e in expected]
 
 
 def test_file_swap(tmp_path):
@@ -161,7 +439,7 @@ def test_file_swap(tmp_path):
     S5io.write_vel(69, r'TargetVel.dat')
     with mock.patch.object(SS, 'run_ss', autospec=True) as mock_run_ss:
         SS.file_swap(lock, filename, runname, solarsim_location, control, summary, history, solartotals)
-    mock_run_ss.assert_called_once_with(solarsim_location, control, summary, history, solartotals, lock)
+    mock_run_ss.assert_called_once_with(solarsim_location, control, summary, history, solartotals, lock, cache=None)
     assert runname in os.listdir()
     assert filename in os.listdir()
     with open(filename) as original:
@@ -176,7 +454,6 @@ def test_file_sweep_output_filename(mock_Popen, tmp_path):
     solarsim_location = r'.\SolarSim4.1.exe'
     original_dir = os.getcwd()
     os.chdir(tmp_path)
-    mock_Popen.return_value.readline = mock.MagicMock(return_value=b'Read in OK.\n')
     with open(file_list[0], 'w') as fopen:
         fopen.write('this is a test dummy file.')
 
@@ -185,7 +462,8 @@ def test_file_sweep_output_filename(mock_Popen, tmp_path):
 
     file = file_list[0]
     mock_Popen.assert_called_once_with([solarsim_location, "SolarSim.in", f"Summary_{file}",
-                                        f"History_{file}", f"SolarTotals_{file}"], stdout=sp.PIPE)
+                                        f"History_{file}", f"SolarTotals_{file}"], stdout=sp.PIPE,
+                                       **POPEN_KWARGS)
 
 
 def test_file_sweep_times_called(tmp_path, mock_Popen, monkeypatch):
@@ -195,24 +473,67 @@ def test_file_sweep_times_called(tmp_path, mock_Popen, monkeypatch):
     original_dir = os.getcwd()
     os.chdir(tmp_path)
     monkeypatch.setattr(SS, 'copyfile', mock.MagicMock())
-    mock_Popen.return_value.readline = mock.MagicMock(return_value=b'Read in OK.\n')
 
     SS.file_sweep(file_list, runname, solarsim_location)
     os.chdir(original_dir)
     assert mock_Popen.call_count == len(file_list)
 
 
-@pytest.mark.skip('Tests for multiprocessing functions to be implemented')
-def test_file_sweep_par():
-    # TODO: fix tests involveing multiprocessing
-    pass
-
-
-# TODO:improve to test the content of the output dataframe
-def test_read_file_sweep(tmp_path, mock_read_history):
+@pytest.mark.skipif(os.name == 'nt', reason='fake SolarSim is a POSIX script')
+@pytest.mark.parametrize('stage_dir', ['runs', None])
+def test_file_sweep_par(tmp_path, fake_solarsim, monkeypatch, stage_dir):
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / 'SolarSim.in').write_text(SWEEP_CONTROL)
+    # the swapped in file is the target velocity file read by the fake
+    fake_solarsim(TIMED_RUN, read_in=TIMED_READ_IN)
+    # relative to the sweep's directory, not the run's
+    executable = os.path.join('.', 'SolarSim.X')
+    file_list = [f'tvel_{v}.dat' for v in (60.5, 61.5, 62.5)]
+    for filename, v in zip(file_list, (60.5, 61.5, 62.5)):
+        S5io.write_vel(v, filename)
+    SS.file_sweep_par(file_list, 'TargetVel.dat', executable, n_jobs=3, stage_dir=stage_dir)
+    for filename, v in zip(file_list, (60.5, 61.5, 62.5)):
+        with open(f'History_{filename}') as f:
+            assert str(v) in f.read()
+    assert (tmp_path / 'TargetVel.dat').exists() == (stage_dir is None)
+
+
+@pytest.mark.skipif(os.name == 'nt', reason='fake SolarSim is a POSIX script')
+def test_file_sweep_par_same_names(tmp_path, fake_solarsim, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / 'SolarSim.in').write_text(SWEEP_CONTROL)
+    executable = fake_solarsim(TIMED_RUN, read_in=TIMED_READ_IN)
+    file_list = ['a/tvel.dat', 'b/tvel.dat']
+    for filename, v in zip(file_list, (60.5, 61.5)):
+        # the outputs are named after the whole path
+        for prefix in ['', 'Summary_', 'History_', 'SolarTotals_']:
+            os.mkdir(prefix + os.path.dirname(filename))
+        S5io.write_vel(v, filename)
+    SS.file_sweep_par(file_list, 'TargetVel.dat', executable, n_jobs=2)
+    for filename, v in zip(file_list, (60.5, 61.5)):
+        with open(f'History_{filename}') as f:
+            assert str(v) in f.read()
+
+
+def test_read_file_sweep(tmp_path, sweep_histories):
     file_list = [f'MPPT13.{i}.dat' for i in range(5)]
-    output = SS.read_file_sweep(file_list, path=tmp_path)
-    assert mock_read_history.call_count == len(file_list)
-    f = file_list[-1]
-    mock_read_history.assert_called_with(os.path.join(tmp_path, f"History_{f}"))
+    expected = [
+        sweep_histories(f"History_{f}", i) for i, f in enumerate(file_list)
+    ]
+    output = SS.read_file_sweep(file_list, path=tmp_path, n_jobs=1)
     assert isinstance(output, pd.DataFrame)
+    assert output["file"].to_list() == file_list
+    # Vstd is not part of the file sweep results
+    assert output.iloc[:, 1:].values.tolist() == [
+        list(e[:4]) + list(e[5:]) for e in expected
+    ]
+
+
+def test_read_sweep_empty(tmp_path):
+    output = SS.read_vel_sweep([], path=tmp_path)
+    assert output.columns.to_list() == ['tVel', 'drivingTime', 'DistCovered', 'SoC', 'AverageVel', 'Vstd',
+                                        'SoCMax', 'SoCMin']
+    assert output.empty
+    output = SS.read_file_sweep([], path=tmp_path)
+    assert output.columns[0] == 'file'
+    assert output.empty
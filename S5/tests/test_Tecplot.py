@@ -1,6 +1,9 @@
+import os
 import random
+import warnings
 from datetime import datetime, timedelta
 
+import numpy as np
 import pandas as pd
 import pytest
 
@@ -32,6 +35,148 @@ def test_read_tecplot_file(history_file):
     assert isinstance(hist.data, pd.DataFrame)
 
 
+@pytest.mark.parametrize("engine", ["numpy", "pyarrow"])
+@pytest.mark.parametrize(
+    "file_fixture",
+    ["history_file", "weather_file", "road_file", "velocity_file"],
+)
+def test_read_engines(file_fixture, engine, request):
+    filename = request.getfixturevalue(file_fixture)
+    expected = TP.TecplotData(filename)
+    tp = TP.TecplotData(filename, engine=engine)
+    assert tp.title == expected.title
+    assert tp.zone.to_string() == expected.zone.to_string()
+    pd.testing.assert_frame_equal(tp.data, expected.data, check_dtype=False)
+
+
+@pytest.mark.parametrize("engine", TP.READ_ENGINES)
+def test_read_engines_padding(tmp_path, engine):
+    filepath = tmp_path / "padded.dat"
+    with open(filepath, "w", newline="") as file:
+        file.write(
+            'Title = "padded"\r\n'
+            'Variables = "Distance(km)", "TargetVel(km/h)"\r\n'
+            'Zone T = " ", I = 3, J = 1, K = 1, F = POINT\r\n'
+            "     0   69.0  \r\n"
+            "\t1.5e+02\t\t70.5\r\n"
+            "  3030   -1.25"
+        )
+    tp = TP.TecplotData(filepath, engine=engine)
+    assert tp.title == "padded"
+    assert tp.zone.ni == 3
+    pd.testing.assert_frame_equal(
+        tp.data,
+        pd.DataFrame(
+            [[0, 69.0], [150, 70.5], [3030, -1.25]],
+            columns=["Distance(km)", "TargetVel(km/h)"],
+        ),
+        check_dtype=False,
+    )
+
+
+@pytest.mark.parametrize("engine", TP.READ_ENGINES)
+def test_read_columns(history_file, engine):
+    columns = ["Distance(km)", "DDHHMMSS", "CarVel(km/h)"]
+    expected = TP.SSHistory(history_file).data.loc[:, columns]
+    hist = TP.SSHistory(history_file, engine=engine, columns=columns)
+    assert hist.data.columns.to_list() == columns
+    pd.testing.assert_frame_equal(hist.data, expected, check_dtype=False)
+
+
+@pytest.mark.parametrize("engine", TP.READ_ENGINES)
+@pytest.mark.parametrize("chunksize", [3, TP.READ_CHUNKSIZE])
+def test_read_filters(history_file, engine, chunksize, monkeypatch):
+    monkeypatch.setattr(TP, "READ_CHUNKSIZE", chunksize)
+    full = TP.SSHistory(history_file).data
+    expected = full[
+        (full["Distance(km)"] >= 500)
+        & (full["Distance(km)"] <= 2300)
+        & (full["DayAndTime(s)"] <= 300000)
+    ].reset_index(drop=True)
+    hist = TP.SSHistory(
+        history_file,
+        engine=engine,
+        filters={
+            "Distance(km)": (500, 2300),
+            "DayAndTime(s)": (None, 300000),
+        },
+    )
+    assert hist.data.shape[0] == 5
+    pd.testing.assert_frame_equal(hist.data, expected, check_dtype=False)
+
+
+@pytest.mark.parametrize("engine", TP.READ_ENGINES)
+def test_read_columns_and_filters(weather_file, engine):
+    weather = TP.SSWeather(
+        weather_file,
+        engine=engine,
+        columns=["Day", "Time(HHMM)", "SunAzimuth(deg)"],
+        filters={"Distance(km)": (1000, None)},
+    )
+    assert weather.data.columns.to_list() == [
+        "Day",
+        "Time(HHMM)",
+        "SunAzimuth(deg)",
+    ]
+    assert weather.data["SunAzimuth(deg)"].to_list() == [18.302102] * 2
+
+
+@pytest.mark.parametrize("engine", TP.READ_ENGINES)
+def test_iter_chunks(history_file, engine):
+    expected = TP.SSHistory(history_file)
+    chunks = list(TP.SSHistory.iter_chunks(history_file, 3, engine=engine))
+    assert [chunk.data.shape[0] for chunk in chunks] == [3, 3, 3, 1]
+    for chunk in chunks:
+        assert isinstance(chunk, TP.SSHistory)
+        assert chunk.title == expected.title
+        assert chunk.zone is chunks[0].zone
+    pd.testing.assert_frame_equal(
+        pd.concat([chunk.data for chunk in chunks]),
+        expected.data,
+        check_dtype=False,
+    )
+
+
+@pytest.mark.parametrize("engine", TP.READ_ENGINES)
+def test_iter_chunks_columns_filters(history_file, engine):
+    columns = ["DDHHMMSS", "BatteryCharge(%)"]
+    filters = {"Distance(km)": (500, 2300)}
+    expected = TP.SSHistory(history_file).data
+    expected = expected.loc[
+        expected["Distance(km)"].between(500, 2300), columns
+    ]
+    chunks = TP.SSHistory.iter_chunks(
+        history_file, 4, engine=engine, columns=columns, filters=filters
+    )
+    pd.testing.assert_frame_equal(
+        pd.concat([chunk.data for chunk in chunks]),
+        expected,
+        check_dtype=False,
+    )
+
+
+def test_iter_chunks_add_timestamp(history_file):
+    expected = TP.SSHistory(history_file)
+    expected.add_timestamp(startday="20231022")
+    timestamps = []
+    for chunk in TP.SSHistory.iter_chunks(history_file, 4):
+        chunk.add_timestamp(startday="20231022")
+        timestamps.append(chunk.data["DateTime"])
+    pd.testing.assert_series_equal(
+        pd.concat(timestamps), expected.data["DateTime"]
+    )
+
+
+def test_read_missing_column(history_file):
+    with pytest.raises(KeyError):
+        TP.SSHistory(history_file, columns=["Distance(km)", "Altitude(m)"])
+
+
+def test_read_bad_engine(velocity_file):
+    with pytest.raises(ValueError):
+        TP.TecplotData(velocity_file, engine="fortran")
+
+
 def test_bad_read_tecplot_file(history_tp):
     with pytest.raises(TypeError):
         hist = TP.TecplotData(history_tp)
@@ -71,6 +216,439 @@ def test_read_write_with_datum(velocity_file, tmp_path):
     assert write1_lines == write2_lines
 
 
+@pytest.mark.parametrize(
+    "file_fixture", ["history_file", "weather_file", "velocity_file"]
+)
+def test_write_chunked(file_fixture, tmp_path, request):
+    filename = request.getfixturevalue(file_fixture)
+    tp1 = TP.TecplotData(filename)
+    tp1.write_tecplot(tmp_path / "test1.dat", engine="chunked", chunksize=3)
+    tp2 = TP.TecplotData(tmp_path / "test1.dat")
+    assert tp2.title == tp1.title
+    assert tp2.zone.to_string() == tp1.zone.to_string()
+    pd.testing.assert_frame_equal(tp1.data, tp2.data)
+    with open(tmp_path / "test1.dat") as write1:
+        assert len(write1.readlines()) == 3 + tp1.data.shape[0]
+
+
+def test_write_chunked_round_trip(history_file, tmp_path):
+    tp1 = TP.TecplotData(history_file, engine="numpy")
+    tp1.data = tp1.data / 3
+    tp1.write_tecplot(tmp_path / "test1.dat", engine="chunked")
+    tp2 = TP.TecplotData(tmp_path / "test1.dat", engine="numpy")
+    # floats are written in full so nothing is lost in the round trip
+    assert (tp1.data.to_numpy() == tp2.data.to_numpy()).all()
+
+
+@pytest.mark.parametrize("engine", TP.WRITE_ENGINES)
+@pytest.mark.parametrize("file_fixture", ["history_file", "weather_file"])
+def test_read_write_block(file_fixture, engine, tmp_path, request):
+    filename = request.getfixturevalue(file_fixture)
+    point = TP.TecplotData(filename)
+    point.zone.F = "BLOCK"
+    point.write_tecplot(tmp_path / "block.dat", engine=engine)
+    block = TP.TecplotData(tmp_path / "block.dat")
+    assert block.zone.is_block()
+    assert block.zone.to_string() == point.zone.to_string()
+    pd.testing.assert_frame_equal(block.data, point.data, check_dtype=False)
+    for col in block.data.columns:
+        assert block.data[col].to_numpy().flags["C_CONTIGUOUS"]
+
+
+def test_read_block(tmp_path):
+    filepath = tmp_path / "block.dat"
+    with open(filepath, "w") as file:
+        file.write(
+            """Title = "block"
+Variables = "Distance(km)", "Altitude(m)", "Heading(deg)"
+Zone T = "road", I = 4, J = 1, K = 1, F = BLOCK
+0 10 20.5
+30
+5.0 6.0 7.0 8.0
+90 90 180 270
+"""
+        )
+    road = TP.TecplotData(
+        filepath,
+        columns=["Heading(deg)", "Distance(km)"],
+        filters={"Altitude(m)": (6, 7)},
+    )
+    pd.testing.assert_frame_equal(
+        road.data,
+        pd.DataFrame(
+            [[90.0, 10.0], [180.0, 20.5]],
+            columns=["Heading(deg)", "Distance(km)"],
+        ),
+    )
+    with pytest.raises(ValueError):
+        next(TP.TecplotData.iter_chunks(filepath))
+
+
+def test_read_bad_block(tmp_path):
+    filepath = tmp_path / "block.dat"
+    header = """Title = "block"
+Variables = "Distance(km)", "Altitude(m)"
+Zone T = "road", I = 2, J = 1, K = 1, F = BLOCK
+"""
+    filepath.write_text(header + "0 10\n5.0\n")
+    with pytest.raises(SyntaxError):
+        TP.TecplotData(filepath)
+    filepath.write_text(header + "0 10\n5.0 NA\n")
+    with pytest.raises(SyntaxError):
+        TP.TecplotData(filepath)
+    # the right number of values, one of them not a number
+    filepath.write_text(header + "0 10\n5.0 x\n")
+    with pytest.raises(SyntaxError, match="Non numeric"):
+        TP.TecplotData(filepath)
+
+
+@pytest.mark.parametrize("write_engine", TP.WRITE_ENGINES)
+@pytest.mark.parametrize("engine", TP.READ_ENGINES)
+def test_read_write_zones(weather_file, engine, write_engine, tmp_path):
+    weather = TP.SSWeather(weather_file)
+    members = []
+    for i in range(3):
+        member = TP.SSWeather(weather_file)
+        member.zone.zonetitle = f"member {i}"
+        member.data["AirTemp(degC)"] += i
+        members.append(member)
+    members[1].zone.F = "BLOCK"
+    filename = tmp_path / "ensemble.dat"
+    TP.write_zones(filename, members, engine=write_engine)
+
+    index = TP.zone_index(filename)
+    titles = [entry.title for entry in index]
+    assert titles == [f"member {i}" for i in range(3)]
+    for i, zone in [(0, 0), (1, "member 1"), (2, -1)]:
+        member = TP.SSWeather(filename, engine=engine, zone=zone)
+        assert member.zone.zonetitle == f"member {i}"
+        assert member.zone.is_block() == (i == 1)
+        pd.testing.assert_series_equal(
+            member.data["AirTemp(degC)"],
+            weather.data["AirTemp(degC)"] + i,
+            check_dtype=False,
+        )
+    zones = TP.SSWeather.read_zones(filename, columns=["AirTemp(degC)"])
+    assert [zone.data.iloc[0, 0] for zone in zones] == [
+        weather.data["AirTemp(degC)"][0] + i for i in range(3)
+    ]
+    chunks = list(
+        TP.SSWeather.iter_chunks(filename, chunksize=3, engine=engine, zone=2)
+    )
+    assert [chunk.data.shape[0] for chunk in chunks] == [3, 1]
+    with pytest.raises(KeyError):
+        TP.SSWeather(filename, zone="member 3")
+    with pytest.raises(IndexError):
+        TP.SSWeather(filename, zone=3)
+
+
+def test_zone_index_persist(weather_file, tmp_path, monkeypatch):
+    weather = TP.SSWeather(weather_file)
+    filename = tmp_path / "ensemble.dat"
+    TP.write_zones(filename, [weather, weather])
+    index = TP.zone_index(filename, persist=True)
+    assert os.path.exists(str(filename) + ".zidx")
+    assert index[1].offset > index[0].data_offset
+    # the saved index is used instead of scanning the file again
+    monkeypatch.setattr(TP, "_scan_zones", None)
+    assert TP.zone_index(filename) == index
+    TP.SSWeather(filename, zone=1)
+
+
+def test_write_zones_mismatch(weather_file, velocity_file, tmp_path):
+    with pytest.raises(ValueError):
+        TP.write_zones(
+            tmp_path / "mixed.dat",
+            [TP.TecplotData(weather_file), TP.TecplotData(velocity_file)],
+        )
+    with pytest.raises(ValueError):
+        TP.write_zones(tmp_path / "empty.dat", [])
+
+
+@pytest.mark.parametrize("engine", TP.WRITE_ENGINES)
+def test_append_tecplot(history_file, engine, tmp_path):
+    history = TP.SSHistory(history_file)
+    filename = tmp_path / "History.dat"
+    head = TP.SSHistory(history_file)
+    head.data = history.data.iloc[:4]
+    head.update_zone_1d()
+    head.write_tecplot(filename, engine=engine, zone_width=6)
+    size = os.path.getsize(filename)
+    zone = TP.append_tecplot(filename, history.data.iloc[4:7], engine=engine)
+    assert zone.ni == 7
+    zone = TP.append_tecplot(filename, history.data.iloc[7:], engine=engine)
+    assert zone.ni == 10
+    # an empty frame leaves the file as it was
+    size_before = os.path.getsize(filename)
+    zone = TP.append_tecplot(filename, history.data.iloc[:0], engine=engine)
+    assert zone.ni == 10
+    assert os.path.getsize(filename) == size_before
+    assert os.path.getsize(filename) > size
+    read_back = TP.SSHistory(filename)
+    assert read_back.zone.ni == 10
+    pd.testing.assert_frame_equal(
+        read_back.data, history.data, check_dtype=False
+    )
+
+
+def test_append_tecplot_grid(weather_file, tmp_path):
+    weather = TP.SSWeather(weather_file)
+    filename = tmp_path / "Weather.dat"
+    weather.write_tecplot(filename, zone_width=4)
+    later = weather.data.copy()
+    later["Time(HHMM)"] += 100
+    TP.append_tecplot(filename, later)
+    read_back = TP.SSWeather(filename)
+    assert (read_back.zone.ni, read_back.zone.nj) == (4, 2)
+    assert read_back.data.shape[0] == 8
+    # a row short of a whole slice of distances
+    with pytest.raises(ValueError):
+        TP.append_tecplot(filename, later.iloc[:1])
+
+
+def test_append_tecplot_errors(history_file, velocity_file, tmp_path):
+    history = TP.SSHistory(history_file)
+    # unpadded zone line has no room for I = 10 -> I = 100
+    filename = tmp_path / "History.dat"
+    history.write_tecplot(filename)
+    with pytest.raises(ValueError, match="zone_width"):
+        TP.append_tecplot(filename, pd.concat([history.data] * 9))
+    with pytest.raises(ValueError):
+        TP.append_tecplot(filename, TP.TecplotData(velocity_file).data)
+    history.write_tecplot(tmp_path / "History.dat.gz", zone_width=6)
+    with pytest.raises(ValueError):
+        TP.append_tecplot(tmp_path / "History.dat.gz", history.data)
+    history.zone.F = "BLOCK"
+    history.write_tecplot(filename, zone_width=6)
+    with pytest.raises(ValueError):
+        TP.append_tecplot(filename, history.data)
+
+
+@pytest.mark.parametrize("block", [False, True])
+@pytest.mark.parametrize("engine", TP.WRITE_ENGINES)
+def test_write_precision(weather_file, engine, block, tmp_path):
+    weather = TP.SSWeather(weather_file)
+    weather.data["SunAzimuth(deg)"] += 1 / 3
+    weather.data["AirPress(Pa)"] += 0.4
+    weather.zone.F = "BLOCK" if block else "POINT"
+    weather.write_tecplot(tmp_path / "full.dat", engine=engine)
+    weather.write_tecplot(
+        tmp_path / "compact.dat", engine=engine, precision="compact"
+    )
+    assert os.path.getsize(tmp_path / "compact.dat") < os.path.getsize(
+        tmp_path / "full.dat"
+    )
+    with open(tmp_path / "compact.dat") as f:
+        body = f.read().split("\n", 3)[3]
+    # pressure is written as an integer
+    assert "97907" in body and "97907." not in body
+    read_back = TP.SSWeather(tmp_path / "compact.dat")
+    pd.testing.assert_series_equal(
+        read_back.data["SunAzimuth(deg)"],
+        weather.data["SunAzimuth(deg)"].round(1),
+    )
+    diff = TP.compare_tecplot(
+        tmp_path / "compact.dat", tmp_path / "full.dat", atol=0.5
+    )
+    assert diff.equal
+    assert 0 < diff.columns.loc["AirPress(Pa)", "max_abs_error"] <= 0.5
+
+
+def test_write_precision_options(velocity_file, tmp_path):
+    velocity = TP.TecplotData(velocity_file)
+    velocity.data["TargetVel(km/h)"] = [1 / 3, np.nan]
+    filename = tmp_path / "vel.dat"
+    velocity.write_tecplot(
+        filename, engine="chunked", precision={"TargetVel(km/h)": 0}
+    )
+    with open(filename) as f:
+        assert f.read().splitlines()[3:] == ["0 0.0", "3030 NaN"]
+    velocity.write_tecplot(filename, engine="chunked", precision=2)
+    with open(filename) as f:
+        assert f.read().splitlines()[3] == "0 0.33"
+    velocity.write_tecplot(
+        filename, engine="chunked", precision="target_velocity"
+    )
+    with open(filename) as f:
+        assert f.read().splitlines()[3] == "0 0.333"
+    with pytest.raises(ValueError):
+        velocity.write_tecplot(filename, precision="compact")
+    with pytest.raises(ValueError):
+        velocity.write_tecplot(filename, precision="fine")
+    with pytest.raises(KeyError):
+        velocity.write_tecplot(filename, precision={"Vel": 1})
+
+
+@pytest.mark.parametrize("engine", TP.READ_ENGINES)
+def test_compare_tecplot(weather_file, engine, tmp_path):
+    weather = TP.SSWeather(weather_file)
+    # same values, different formatting
+    weather.write_tecplot(tmp_path / "a.dat", engine="chunked")
+    diff = TP.compare_tecplot(
+        tmp_path / "a.dat", weather_file, chunksize=3, engine=engine
+    )
+    assert diff.equal
+    assert diff.rows == (4, 4)
+    assert diff.columns.index.to_list() == weather.data.columns.to_list()
+
+    weather.data["AirTemp(degC)"] *= 1 + 1e-6
+    weather.data = weather.data.iloc[:, ::-1]
+    weather.write_tecplot(tmp_path / "b.dat", engine="chunked")
+    diff = TP.compare_tecplot(tmp_path / "b.dat", weather_file, chunksize=3)
+    assert not diff.header
+    assert diff.columns.loc["AirTemp(degC)", "max_rel_error"] == (
+        pytest.approx(1e-6)
+    )
+    assert diff.columns["mismatches"].to_dict()["AirTemp(degC)"] == 4
+    assert diff.columns["mismatches"].sum() == 4
+    assert not diff.equal
+    assert TP.compare_tecplot(
+        tmp_path / "b.dat", weather_file, rtol=1e-5
+    ).equal
+
+
+def test_compare_tecplot_header(history_file, tmp_path):
+    history = TP.SSHistory(history_file)
+    history.title = "new"
+    history.data = history.data.iloc[:7].drop(columns="Lap")
+    history.update_zone_1d()
+    history.zone.F = "BLOCK"
+    history.write_tecplot(tmp_path / "History.dat")
+    diff = TP.compare_tecplot(tmp_path / "History.dat", history_file)
+    assert diff.rows == (7, 10)
+    assert diff.header == [
+        "title: 'new' != 'SolarSim4.1'",
+        "zone ni: 7 != 10",
+        "zone F: 'BLOCK' != 'POINT'",
+        f"variable 'Lap' only in {history_file}",
+    ]
+    assert not diff.columns["mismatches"].any()
+    assert not diff.equal
+
+
+def test_align_chunks():
+    a = np.arange(14.0).reshape(7, 2)
+    chunks_a = iter([a[:3], a[3:3], a[3:]])
+    chunks_b = iter([a[:5], a[5:6]])
+    pairs = list(TP._align_chunks(chunks_a, chunks_b))
+    assert [(len(x), len(y)) for x, y in pairs[:-1]] == [(3, 3), (2, 2), (1, 1)]
+    for x, y in pairs[:-1]:
+        np.testing.assert_array_equal(x, y)
+    # the last row is only in a
+    x, y = pairs[-1]
+    assert y is None
+    np.testing.assert_array_equal(x, a[6:])
+
+
+def test_chunk_errors():
+    x = np.array([[1.0, np.nan, 2.0], [1.0, np.nan, np.nan]])
+    y = np.array([[1.1, np.nan, 2.0], [1.0, np.nan, 0.0]])
+    mismatches, max_abs, max_rel = TP._chunk_errors(x, y, rtol=1e-3, atol=0.0)
+    assert mismatches.tolist() == [1, 0, 1]
+    assert max_abs.tolist() == pytest.approx([0.1, np.nan, 0.0], nan_ok=True)
+    assert max_rel.tolist() == pytest.approx([0.1 / 1.1, np.nan, 0.0], nan_ok=True)
+
+
+def test_variable_differences():
+    assert TP._variable_differences(["x", "y"], ["y", "z"], "a.dat", "b.dat") == [
+        "variable 'x' only in a.dat",
+        "variable 'z' only in b.dat",
+    ]
+
+
+@pytest.mark.parametrize("engine", TP.READ_ENGINES)
+@pytest.mark.parametrize("extension", [".gz", ".bz2", ".xz", ".zst"])
+def test_read_write_compressed(history_file, extension, engine, tmp_path):
+    if extension == ".zst":
+        pytest.importorskip("zstandard")
+    history = TP.SSHistory(history_file)
+    filename = tmp_path / f"History.dat{extension}"
+    history.write_tecplot(filename, engine="chunked")
+    with open(filename, "rb") as f:
+        assert f.read(4) != b"Titl"
+    # compressed files are detected by their magic bytes, not the name
+    renamed = tmp_path / "History.dat"
+    os.rename(filename, renamed)
+    for name in [renamed, str(renamed)]:
+        read_back = TP.SSHistory(name, engine=engine)
+        assert read_back.title == history.title
+        pd.testing.assert_frame_equal(
+            read_back.data, history.data, check_dtype=False
+        )
+    chunks = list(TP.SSHistory.iter_chunks(renamed, chunksize=4))
+    assert sum(chunk.data.shape[0] for chunk in chunks) == 10
+
+
+@pytest.mark.parametrize("extension", [".gz", ".zst"])
+def test_read_zone_compressed(weather_file, extension, tmp_path):
+    if extension == ".zst":
+        pytest.importorskip("zstandard")
+    weather = TP.SSWeather(weather_file)
+    filename = tmp_path / f"ensemble.dat{extension}"
+    TP.write_zones(filename, [weather, weather, weather])
+    index = TP.zone_index(filename)
+    assert len(index) == 3
+    assert index[-1].end > os.path.getsize(filename)
+    member = TP.SSWeather(filename, zone=2)
+    pd.testing.assert_frame_equal(member.data, weather.data)
+
+
+def test_write_bad_compression(velocity_file, tmp_path):
+    tp = TP.TecplotData(velocity_file)
+    with pytest.raises(ValueError):
+        tp.write_tecplot(tmp_path / "Velocity.dat", compression="zip")
+
+
+@pytest.mark.parametrize("engine", TP.READ_ENGINES)
+def test_read_compact(history_file, engine):
+    history = TP.SSHistory(history_file, engine=engine)
+    compact = TP.SSHistory(history_file, engine=engine, dtype="compact")
+    assert compact.data["Driving"].dtype == np.uint8
+    assert compact.data["DDHHMMSS"].dtype == np.int32
+    assert compact.data["Distance(km)"].dtype == np.float64
+    assert compact.data["CarVel(km/h)"].dtype == np.float32
+    assert (
+        compact.data.memory_usage().sum()
+        < 0.6 * history.data.memory_usage().sum()
+    )
+    pd.testing.assert_frame_equal(
+        compact.data, history.data, check_dtype=False, rtol=1e-6
+    )
+    chunks = TP.SSHistory.iter_chunks(
+        history_file, chunksize=4, engine=engine, dtype="compact"
+    )
+    for chunk in chunks:
+        assert (chunk.data.dtypes == compact.data.dtypes).all()
+
+
+def test_read_dtype(weather_file, road_file, tmp_path):
+    weather = TP.SSWeather(weather_file, dtype="compact")
+    assert weather.data["Day"].dtype == np.int16
+    assert weather.data["AirTemp(degC)"].dtype == np.float32
+    road = TP.TecplotData(road_file, dtype="road")
+    assert road.data["Latitude"].dtype == np.float64
+    assert road.data["Altitude(m)"].dtype == np.float32
+    road = TP.TecplotData(road_file, dtype="compact")
+    assert (road.data.dtypes == np.float32).all()
+    road = TP.TecplotData(road_file, dtype={"Altitude(m)": "int32"})
+    assert road.data["Altitude(m)"].dtype == np.int32
+    assert road.data["Latitude"].dtype == np.float64
+    road.zone.F = "BLOCK"
+    road.write_tecplot(tmp_path / "block.dat")
+    block = TP.TecplotData(tmp_path / "block.dat", dtype="road")
+    assert block.data["Altitude(m)"].dtype == np.float32
+    with pytest.raises(KeyError):
+        TP.TecplotData(road_file, dtype={"Slope": "float32"})
+    with pytest.raises(ValueError):
+        TP.TecplotData(road_file, dtype="tiny")
+
+
+def test_write_bad_engine(velocity_file, tmp_path):
+    tp = TP.TecplotData(velocity_file)
+    with pytest.raises(ValueError):
+        tp.write_tecplot(tmp_path / "out.dat", engine="fortran")
+
+
 def test_write_empty(tmp_path):
     tp = TP.TecplotData()
     with pytest.raises(AttributeError):
@@ -207,6 +785,285 @@ def test_history_add_timestamp(history_file, count):
     )
 
 
+@pytest.mark.parametrize("chunksize", [3, TP.READ_CHUNKSIZE])
+def test_history_summary(history_file, chunksize):
+    hist = TP.SSHistory(history_file)
+    summary = TP.SSHistory.summarise_file(history_file, chunksize=chunksize)
+    assert isinstance(summary, TP.HistorySummary)
+    driving = hist.data.loc[hist.data["Driving"] == 1, "CarVel(km/h)"]
+    last = hist.data.iloc[-1]
+    assert summary.driving_time == last["DrivingTime(s)"]
+    assert summary.dist == last["Distance(km)"]
+    assert summary.soc == last["BatteryCharge(%)"]
+    assert summary.avg_vel == last["AverageCarVel(km/h)"]
+    assert summary.Vstd == pytest.approx(np.std(driving), rel=1e-12)
+    # the loaded data summarises the same
+    assert list(hist.summary()) == pytest.approx(list(summary), nan_ok=True)
+    assert summary.SoCMax == hist.data["BatteryCharge(%)"].max()
+    assert summary.SoCMin == hist.data["BatteryCharge(%)"].min()
+    time = hist.data["DayAndTime(s)"]
+    assert summary.solar_energy == pytest.approx(
+        np.trapz(hist.data["Solar/InputPower(W)"], time) / 3600
+    )
+    assert summary.battery_energy == pytest.approx(
+        np.trapz(hist.data["BatteryPowerOut(W)"], time) / 3600
+    )
+    assert summary.controller_energy == pytest.approx(
+        np.trapz(hist.data["ControllerPowerIn(W)"], time) / 3600
+    )
+
+
+def test_history_summary_minimal(history_file, tmp_path):
+    hist = TP.SSHistory(
+        history_file,
+        columns=[
+            "DrivingTime(s)",
+            "Distance(km)",
+            "BatteryCharge(%)",
+            "CarVel(km/h)",
+            "Driving",
+        ],
+    )
+    hist.write_tecplot(tmp_path / "History.dat")
+    summary = TP.SSHistory.summarise_file(tmp_path / "History.dat", chunksize=4)
+    driving = hist.data.loc[hist.data["Driving"] == 1, "CarVel(km/h)"]
+    assert summary.avg_vel == pytest.approx(driving.mean())
+    assert np.isnan(summary.solar_energy)
+    with open(tmp_path / "History.dat", "w") as f:
+        f.write('Title = "empty"\nVariables = "DrivingTime(s)"\n')
+        f.write('Zone T = " ", I = 0, J = 1, K = 1, F = POINT\n')
+    with pytest.raises(KeyError):
+        TP.SSHistory.summarise_file(tmp_path / "History.dat")
+    hist.data = hist.data.iloc[:0]
+    with open(tmp_path / "History.dat", "w") as f:
+        hist._write_header(f, datum=False)
+        f.write('Zone T = " ", I = 0, J = 1, K = 1, F = POINT\n')
+    with pytest.raises(SyntaxError):
+        TP.SSHistory.summarise_file(tmp_path / "History.dat")
+    # as for the loaded History
+    with pytest.raises(SyntaxError):
+        hist.summary()
+
+
+def test_merge_moments():
+    values = np.random.default_rng(0).normal(60, 5, 100)
+    moments = (0, 0.0, 0.0)
+    for chunk in np.split(values, [0, 10, 10, 55]):
+        moments = TP.HistorySummary.merge_moments(*moments, chunk)
+    count, mean, m2 = moments
+    assert count == values.size
+    assert mean == pytest.approx(values.mean(), rel=1e-12)
+    assert m2 / count == pytest.approx(values.var(), rel=1e-12)
+
+
+@pytest.mark.parametrize("engine", TP.READ_ENGINES)
+def test_history_lazy_derived(history_file, engine):
+    full = TP.SSHistory(history_file, engine=engine)
+    hist = TP.SSHistory(history_file, engine=engine, lazy_derived=True)
+    derived = list(TP.DERIVED_COLUMNS["history"])
+    assert hist.data.columns.to_list() == [
+        col for col in full.data.columns if col not in derived
+    ]
+    assert all(col in hist.data for col in derived)
+    with warnings.catch_warnings():
+        warnings.simplefilter("error")
+        driving = hist.data[hist.data["Driving"] == 1]
+        pd.testing.assert_series_equal(
+            driving.loc[:, "CarVel(m/s)"],
+            full.data.loc[full.data["Driving"] == 1, "CarVel(m/s)"],
+            rtol=1e-5,
+        )
+    pd.testing.assert_frame_equal(
+        hist.data[["Distance(miles)", "DrivingTime(h)"]],
+        full.data[["Distance(miles)", "DrivingTime(h)"]],
+        rtol=1e-5,
+        atol=1e-5,
+    )
+    # computed columns are kept
+    assert "CarVel(mph)" not in hist.data.columns
+    hist.data["CarVel(mph)"]
+    assert hist.data.columns[-1] == "CarVel(mph)"
+    with pytest.raises(KeyError):
+        hist.data["CarVel(knots)"]
+    # columns asked for are parsed as usual
+    hist = TP.SSHistory(
+        history_file, columns=["CarVel(m/s)"], lazy_derived=True
+    )
+    assert hist.data.columns.to_list() == ["CarVel(m/s)"]
+
+
+def test_history_lazy_derived_frame(history_file, tmp_path):
+    full = TP.SSHistory(history_file)
+    hist = TP.SSHistory(history_file, lazy_derived=True)
+    assert hist.data.derived is not TP.DerivedFrame().derived
+    assert hist.data.filter(items=["Driving"]).columns.to_list() == ["Driving"]
+    pd.testing.assert_series_equal(
+        hist.data.loc(axis=1)["DrivingTime(h)"],
+        full.data["DrivingTime(h)"],
+        rtol=1e-5,
+        atol=1e-5,
+    )
+    # columns never accessed are written too
+    hist.write_tecplot(tmp_path / "History.dat")
+    written = TP.SSHistory(tmp_path / "History.dat")
+    assert sorted(written.data.columns) == sorted(full.data.columns)
+    pd.testing.assert_frame_equal(
+        written.data[full.data.columns],
+        full.data,
+        check_dtype=False,
+        rtol=1e-5,
+        atol=1e-5,
+    )
+
+
+def test_history_follow(history_file, tmp_path):
+    with open(history_file, "rb") as f:
+        content = f.read()
+    lines = content.splitlines(True)
+    header = b"".join(lines[:3])
+    history = TP.SSHistory(history_file)
+    filename = tmp_path / "History.dat"
+    follower = TP.SSHistory.follow(filename, columns=["CarVel(km/h)"])
+    assert follower.poll().empty
+    with open(filename, "wb") as f:
+        # SolarSim part way through writing the header
+        f.write(header[:-10])
+        f.flush()
+        assert follower.poll().empty
+        assert follower.variables is None
+        f.write(header[-10:] + lines[3] + lines[4][:7])
+        f.flush()
+        rows = follower.poll()
+        assert rows.columns.to_list() == ["CarVel(km/h)"]
+        assert rows.index.to_list() == [0]
+        assert follower.state.rows == 1
+        assert follower.state.distance == history.data["Distance(km)"][0]
+        f.write(b"".join([lines[4][7:], *lines[5:]]))
+    # the fixture does not end the last row
+    assert follower.poll().index.to_list() == list(range(1, 9))
+    rows = follower.poll(final=True)
+    assert rows.index.to_list() == [9]
+    assert rows["CarVel(km/h)"][9] == history.data["CarVel(km/h)"][9]
+    last = history.data.iloc[-1]
+    assert follower.state == (
+        last["DayAndTime(s)"], last["Distance(km)"],
+        last["BatteryCharge(%)"], 10,
+    )
+    assert follower.poll().empty
+
+    # a restarted run truncates the file
+    with open(filename, "wb") as f:
+        f.write(header + lines[3] + lines[4].rstrip())
+    assert follower.poll().shape[0] == 1
+    assert follower.poll(final=True).shape[0] == 1
+    assert follower.state.rows == 2
+
+
+def test_peek(history_file, tmp_path):
+    hist = TP.SSHistory(history_file)
+    header = TP.SSHistory.peek(history_file)
+    assert isinstance(header, TP.SSHistory)
+    assert header.title == hist.title
+    assert header.zone.to_string() == hist.zone.to_string()
+    assert header.data.columns.to_list() == hist.data.columns.to_list()
+    assert header.data.empty
+    # the body is never parsed
+    with open(tmp_path / "bad_body.dat", "w") as f:
+        hist._write_header(f, datum=True)
+        f.write(f"{hist.zone.to_string()}\nnot numbers\n")
+    header = TP.TecplotData.peek(tmp_path / "bad_body.dat")
+    assert header.zone.ni == 10
+    assert header.datum == hist.datum
+
+
+def test_catalog(history_file, weather_file, tmp_path):
+    TP.SSHistory(history_file).write_tecplot(tmp_path / "History_1.dat")
+    os.mkdir(tmp_path / "run2")
+    TP.SSWeather(weather_file).write_tecplot(tmp_path / "run2" / "Weather.dat")
+    TP.SSHistory(history_file).write_tecplot(
+        tmp_path / "run2" / "History_2.dat.gz"
+    )
+    (tmp_path / "run2" / "notes.dat").write_text("not a tecplot file\n")
+    result = TP.catalog(tmp_path)
+    assert [os.path.basename(path) for path in result["path"]] == [
+        "History_1.dat",
+        "Weather.dat",
+    ]
+    assert result["I"].to_list() == [10, 2]
+    assert result["J"].to_list() == [1, 2]
+    assert result["variables"][1][:2] == ["Day", "Time(HHMM)"]
+    assert (result["size"] > 0).all()
+    assert result["mtime"].dtype.kind == "M"
+    result = TP.catalog(tmp_path, "History_*.dat*", n_jobs=2)
+    assert len(result) == 2
+    assert TP.catalog(tmp_path / "run2", "*.csv").empty
+
+
+@pytest.mark.parametrize("suffix", [".gz", ".zst"])
+def test_catalog_corrupt(history_file, tmp_path, suffix, caplog):
+    if suffix == ".zst":
+        pytest.importorskip("zstandard")
+    TP.SSHistory(history_file).write_tecplot(tmp_path / "History_1.dat")
+    corrupt = tmp_path / f"History_2.dat{suffix}"
+    TP.SSHistory(history_file).write_tecplot(corrupt)
+    data = corrupt.read_bytes()
+    # keep the magic number so the compression is still detected
+    corrupt.write_bytes(data[:10] + bytes(b ^ 0xFF for b in data[10:]))
+    result = TP.catalog(tmp_path, "History_*")
+    assert [os.path.basename(path) for path in result["path"]] == [
+        "History_1.dat"
+    ]
+    assert "Skipping" in caplog.text
+
+
+def final_state(history):
+    """Reducer for read_many, defined at module level to be picklable."""
+    last = history.data.iloc[-1]
+    return (
+        os.path.basename(history.filename),
+        last["Distance(km)"],
+        len(history.data),
+    )
+
+
+@pytest.mark.parametrize("n_jobs", [1, 2])
+def test_read_many(history_file, tmp_path, n_jobs):
+    paths = []
+    for i in range(5):
+        hist = TP.SSHistory(history_file)
+        hist.data = hist.data.iloc[: i + 2]
+        hist.update_zone_1d()
+        paths.append(tmp_path / f"History_{i}.dat")
+        hist.write_tecplot(paths[-1])
+    histories = TP.SSHistory.read_many(
+        paths, columns=["Distance(km)"], n_jobs=n_jobs, max_in_flight=1
+    )
+    assert [type(hist) for hist in histories] == [TP.SSHistory] * 5
+    assert [hist.data.shape for hist in histories] == [
+        (i + 2, 1) for i in range(5)
+    ]
+    reduced = TP.SSHistory.read_many(
+        paths, reducer=final_state, n_jobs=n_jobs, engine="numpy"
+    )
+    assert reduced[0].to_list() == [path.name for path in paths]
+    assert reduced[2].dtype == np.float64
+    assert reduced[2].to_list() == [i + 2 for i in range(5)]
+    summaries = TP.SSHistory.read_many(
+        paths, reducer=TP.SSHistory.summary, n_jobs=n_jobs
+    )
+    assert summaries.columns.to_list() == list(TP.HistorySummary._fields)
+    assert summaries.iloc[-1].to_list() == pytest.approx(
+        list(TP.SSHistory.summarise_file(paths[-1])), nan_ok=True
+    )
+    streamed = TP.SSHistory.read_many(
+        paths, reducer=TP.SSHistory.summarise_file, n_jobs=n_jobs, load=False
+    )
+    pd.testing.assert_frame_equal(streamed, summaries, check_exact=False)
+    with pytest.raises(ValueError):
+        TP.SSHistory.read_many(paths, load=False)
+    assert TP.SSHistory.read_many([]) == []
+
+
 def test_weather_read(weather_file):
     weather = TP.SSWeather(weather_file)
     assert isinstance(weather, TP.SSWeather)
@@ -271,6 +1128,37 @@ def test_weather_add_day_time_cols(weather_file, count):
     )
 
 
+def test_weather_add_day_time_cols_startday(weather_file):
+    weather = TP.SSWeather(weather_file)
+    weather.data = weather.data.iloc[[1, -1], :]
+    weather.data.index = pd.to_datetime(["2023-10-24 08:30", "2023-10-25 17:00"])
+    weather.add_day_time_cols(startday="20231022")
+    assert weather.data["Day"].to_list() == [3, 4]
+
+
+def test_weather_add_day_time_cols_tz(weather_file):
+    weather = TP.SSWeather(weather_file)
+    weather.data = weather.data.iloc[[1, -1], :]
+    weather.data.index = pd.to_datetime(
+        ["2023-10-22 23:50", "2023-10-23 00:05"]
+    ).tz_localize("Australia/Darwin")
+    weather.add_day_time_cols()
+    assert weather.data["Day"].to_list() == [1, 2]
+    assert weather.data["Time(HHMM)"].to_list() == [2350, 5]
+
+
+def test_history_add_timestamp_late_day(history_file):
+    hist = TP.SSHistory(history_file, dtype="compact")
+    hist.data = hist.data.iloc[:2, :]
+    hist.data["DDHHMMSS"] = [12075959, 8000001]
+    hist.add_timestamp(startday="20231022")
+    assert hist.data["Day"].to_list() == [12, 8]
+    assert hist.data["DateTime"].to_list() == [
+        pd.Timestamp("2023-11-02 07:59:59"),
+        pd.Timestamp("2023-10-29 00:00:01"),
+    ]
+
+
 def test_weather_add_day_time_cols_invalid_index(weather_file):
     weather = TP.SSWeather(weather_file)
     with pytest.raises(
@@ -279,6 +1167,90 @@ def test_weather_add_day_time_cols_invalid_index(weather_file):
         weather.add_day_time_cols()
 
 
+def test_weather_grid(weather_file):
+    weather = TP.SSWeather(weather_file)
+    # row order should not matter
+    weather.data = weather.data.iloc[[3, 0, 2, 1]]
+    grid = weather.grid(startday="20231022")
+    assert grid.times.tolist() == [3600, 6 * 86400 + 21 * 3600]
+    assert grid.distances.tolist() == [0, 3029.189]
+    assert grid.values.shape == (2, 2, 8)
+    assert grid.variables[0] == "DirectSun(W/m2)"
+    azimuth = grid.values[:, :, grid.variables.index("SunAzimuth(deg)")]
+    assert azimuth.tolist() == [[91.585884, 18.302102]] * 2
+    assert grid.datetimes[0] == np.datetime64("2023-10-22T01:00")
+
+
+def test_weather_grid_interpolate(weather_file):
+    weather = TP.SSWeather(weather_file)
+    weather.data.loc[[1, 3], "AirTemp(degC)"] = 40
+    grid = weather.grid(startday="20231022")
+    distance = pd.Series([0, 3029.189 / 4, 5000, -1], index=[5, 6, 7, 8])
+    time = pd.to_datetime(
+        ["2023-10-22 01:00", "2023-10-25 11:00", "2023-10-30", "2023-10-01"]
+    )
+    result = grid.interpolate(
+        distance, time, ["SunAzimuth(deg)", "AirTemp(degC)"]
+    )
+    assert result.index.to_list() == [5, 6, 7, 8]
+    np.testing.assert_allclose(
+        result.to_numpy(),
+        [
+            [91.585884, 28.716767],
+            [91.585884 * 0.75 + 18.302102 * 0.25, (28.716767 + 40) / 2],
+            [18.302102, 40],
+            [91.585884, 28.716767],
+        ],
+    )
+    location = grid.locate(distance, (time - time[0]).total_seconds() + 3600)
+    pd.testing.assert_frame_equal(
+        grid.interpolate(location=location).loc[:, result.columns],
+        result.reset_index(drop=True),
+    )
+
+
+def test_weather_sample_histories(weather_file, history_file):
+    weather = TP.SSWeather(weather_file)
+    weather.data.loc[[1, 3], "AirTemp(degC)"] = 40
+    first = TP.SSHistory(history_file)
+    second = TP.SSHistory(history_file)
+    second.data = second.data.iloc[2:5]
+    second.data["Distance(km)"] = 3029.189
+    second.data["DDHHMMSS"] = [1010000, 4110000, 7210000]
+    second.add_timestamp(startday="20231022")
+    second.data = second.data.drop(columns="DDHHMMSS")
+    sampled = weather.sample_histories(
+        [first, second.data],
+        ["AirTemp(degC)", "SunAzimuth(deg)"],
+        startday="20231022",
+    )
+    assert len(sampled) == 2
+    pd.testing.assert_index_equal(sampled[0].index, first.data.index)
+    pd.testing.assert_index_equal(sampled[1].index, second.data.index)
+    np.testing.assert_allclose(
+        sampled[1]["AirTemp(degC)"],
+        [28.716767, (28.716767 + 40) / 2, 40],
+    )
+    assert (sampled[1]["SunAzimuth(deg)"] == 18.302102).all()
+    grid = weather.grid(variables=["AirTemp(degC)", "SunAzimuth(deg)"])
+    expected = grid.interpolate(
+        first.data["Distance(km)"],
+        TP._race_seconds(first.data["DDHHMMSS"].to_numpy()),
+    )
+    pd.testing.assert_frame_equal(sampled[0], expected)
+    assert weather.sample_histories([]) == []
+
+
+def test_weather_grid_not_rectangular(weather_file):
+    weather = TP.SSWeather(weather_file)
+    weather.data.loc[0, "Time(HHMM)"] = 200
+    with pytest.raises(ValueError):
+        weather.grid()
+    weather = TP.SSWeather(weather_file)
+    with pytest.raises(ValueError):
+        weather.grid().interpolate([0], pd.to_datetime(["2023-10-22"]))
+
+
 def test_weather_check_rectangular(weather_file):
     weather = TP.SSWeather(weather_file)
     weather.check_rectangular()
@@ -288,6 +1260,82 @@ def test_weather_check_rectangular(weather_file):
         weather.check_rectangular()
 
 
+def test_cache_hit(history_file, tmp_path, monkeypatch):
+    cache = TP.TecplotCache(tmp_path / "cache")
+    expected = TP.SSHistory(history_file)
+    first = TP.SSHistory(history_file, cache=cache)
+    assert len(os.listdir(tmp_path / "cache")) == 1
+    pd.testing.assert_frame_equal(first.data, expected.data)
+
+    def no_parse(*args, **kwargs):
+        raise AssertionError("file parsed instead of loaded from the cache")
+
+    monkeypatch.setattr(TP, "_read_body", no_parse)
+    cached = TP.SSHistory(history_file, cache=cache)
+    assert cached.title == expected.title
+    assert cached.zone.to_string() == expected.zone.to_string()
+    pd.testing.assert_frame_equal(cached.data, expected.data)
+
+    columns = ["Distance(km)", "BatteryCharge(%)"]
+    filters = {"Distance(km)": (500, 2300)}
+    subset = TP.SSHistory(
+        history_file, columns=columns, filters=filters, cache=cache
+    )
+    monkeypatch.undo()
+    pd.testing.assert_frame_equal(
+        subset.data,
+        TP.SSHistory(history_file, columns=columns, filters=filters).data,
+    )
+
+
+def test_cache_miss_subset(weather_file, tmp_path):
+    cache = TP.TecplotCache(tmp_path)
+    weather = TP.SSWeather(
+        weather_file,
+        columns=["SunAzimuth(deg)"],
+        filters={"Distance(km)": (1000, None)},
+        cache=cache,
+    )
+    assert weather.data["SunAzimuth(deg)"].to_list() == [18.302102] * 2
+    # the whole file is cached regardless of the subset asked for
+    assert TP.SSWeather(weather_file, cache=cache).data.shape == (4, 11)
+
+
+def test_cache_invalidated(velocity_file, tmp_path):
+    filepath = tmp_path / "vel.dat"
+    with open(velocity_file) as original:
+        filepath.write_text(original.read())
+    cache = TP.TecplotCache(tmp_path / "cache")
+    TP.TecplotData(filepath, cache=cache)
+    vel = TP.TecplotData(filepath)
+    vel.data.loc[:, "TargetVel(km/h)"] = 80.5
+    vel.write_tecplot(filepath)
+    os.utime(filepath, ns=(0, 0))
+    reread = TP.TecplotData(filepath, cache=cache)
+    assert reread.data["TargetVel(km/h)"].to_list() == [80.5, 80.5]
+    assert cache.key(filepath) != cache.key(filepath, engine="numpy")
+
+
+def test_cache_eviction(history_file, weather_file, road_file, tmp_path):
+    cache = TP.TecplotCache(tmp_path)
+    TP.TecplotData(history_file, cache=cache)
+    cache.max_bytes = sum(f.stat().st_size for f in tmp_path.iterdir())
+    os.utime(next(tmp_path.iterdir()), (0, 0))
+    TP.TecplotData(weather_file, cache=cache)
+    TP.TecplotData(road_file, cache=cache)
+    assert sum(f.stat().st_size for f in tmp_path.iterdir()) <= cache.max_bytes
+    assert len(list(tmp_path.iterdir())) < 3
+    cache.clear()
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_cache_default_dir(monkeypatch, tmp_path, velocity_file):
+    monkeypatch.setenv("S5_CACHE_DIR", str(tmp_path))
+    TP.TecplotData(velocity_file, cache=True)
+    assert TP.TecplotCache().cache_dir == str(tmp_path)
+    assert len(os.listdir(tmp_path)) == 1
+
+
 def test_read_DSWinput(solarsim_in):
     ssin = TP.DSWinput(str(solarsim_in))
     assert isinstance(ssin, TP.DSWinput)
@@ -324,6 +1372,18 @@ def test_DSWinput_set_value(solarsim_in):
     assert ssin.get_value("DriverOutOfCarTime(s)") == "69"
 
 
+def test_DSWinput_file_params(solarsim_in):
+    params = TP.DSWinput(solarsim_in).file_params()
+    assert len(params) == 16
+    assert list(params)[:2] == ["WeatherFile", "RoadFile"]
+    assert params["TargetVelFile"] == (
+        r"z:\technical\DUSC2023\SolarSim\2023ArraySolarSim\old_baselines"
+        r"\Baseline\TargetVel.dat"
+    )
+    assert "Title" not in params
+    assert "DiodeForwardBias(V)" not in params
+
+
 def test_DSWinput_bad_value(solarsim_in):
     ssin = TP.DSWinput(solarsim_in)
     bad_param = "will we win"
@@ -345,6 +1405,13 @@ def test_DSWinput_read_write(tmp_path, solarsim_in):
     assert ssin.lines == test1.lines
 
 
+def test_DSWinput_compressed(tmp_path, solarsim_in):
+    control_file = TP.DSWinput(solarsim_in)
+    control_file.write_input(tmp_path / "SolarSim.in.gz")
+    read_back = TP.DSWinput(tmp_path / "SolarSim.in.gz")
+    assert read_back.lines == control_file.lines
+
+
 @pytest.mark.parametrize(
     "original,converted",
     [("win", "lin"), ("lin", "win"), ("win", "win"), ("lin", "lin")],
@@ -1,6 +1,7 @@
 import os
 
 import pandas as pd
+import pytest
 from pandas.testing import assert_frame_equal
 
 import S5.Tecplot as TP
@@ -85,3 +86,53 @@ def test_win2lin(solarsim_in):
 def test_lin2win(solarsim_in):
     lin2win(solarsim_in)
     # the actual formating function is tested in test_Tecplot
+
+
+def test_stage_run(tmp_path):
+    control = tmp_path / "SolarSim.in"
+    control.write_text(
+        'Title = "stage"\n'
+        'WeatherFile = "Weather.dat"\n'
+        'TargetVelFile = "TargetVel.dat"\n'
+        'MassFile = "z:\\Baseline\\Mass.in"\n'
+        'MPPTFile = "MPPT.dat"\n'
+    )
+    run_dir = tmp_path / "runs" / "run_1"
+    staged = stage_run(
+        control, run_dir,
+        {"TargetVelFile": run_dir / "TargetVel.dat", "MPPT.dat": "MPPT_1.dat"},
+    )
+    assert staged == str(run_dir / "SolarSim.in")
+    params = TP.DSWinput(staged).file_params()
+    assert params == {
+        "WeatherFile": str(tmp_path / "Weather.dat"),
+        "TargetVelFile": str(run_dir / "TargetVel.dat"),
+        "MassFile": "z:\\Baseline\\Mass.in",
+        "MPPTFile": os.path.abspath("MPPT_1.dat"),
+    }
+    # the shared control file is left as it was
+    assert TP.DSWinput(control).file_params()["WeatherFile"] == "Weather.dat"
+    with pytest.raises(ValueError):
+        stage_run(control, run_dir, {"Driver.in": "Driver_1.in"})
+
+
+def test_stage_run_entries(tmp_path):
+    os.mkdir(tmp_path / "sim")
+    control = tmp_path / "sim" / "SolarSim.in"
+    control.write_text(
+        'WeatherFile = "../data/Weather.dat"\n'
+        'RoadFile = "..\\data\\Road.dat"\n'
+    )
+    run_dir = tmp_path / "runs" / "run_1"
+    # inputs keyed by the entry of the control file, in either style
+    staged = stage_run(
+        control, run_dir,
+        {"../data/Weather.dat": "Weather_1.dat", "..\\data\\Road.dat": "Road_1.dat"},
+    )
+    assert TP.DSWinput(staged).file_params() == {
+        "WeatherFile": os.path.abspath("Weather_1.dat"),
+        "RoadFile": os.path.abspath("Road_1.dat"),
+    }
+    staged = stage_run(control, run_dir)
+    assert TP.DSWinput(staged).file_params()["RoadFile"] == str(tmp_path / "data" / "Road.dat")
+    assert resolve_input("z:\\data\\Road.dat", tmp_path) == "z:\\data\\Road.dat"
@@ -0,0 +1,52 @@
+import sqlite3
+
+from S5.HPC.journal import RunJournal
+
+
+def test_journal_completed(tmp_path):
+    params = {'control': 'SolarSim.in', 'outputs': ['History_60.dat']}
+    history = tmp_path / 'History_60.dat'
+    with RunJournal(tmp_path / 'journal.sqlite') as journal:
+        assert not journal.completed('run_60', params)
+        journal.start('run_60', params)
+        assert not journal.completed('run_60', params)
+        history.write_text('history')
+        journal.finish('run_60', 0, [history])
+        assert journal.completed('run_60', params)
+        assert journal.verify('run_60')
+        assert not journal.completed('run_60', {**params, 'control': 'other.in'})
+    # the journal is durable
+    with RunJournal(tmp_path / 'journal.sqlite') as journal:
+        assert journal.completed('run_60', params)
+        # a truncated or rewritten output invalidates the run
+        history.write_text('hist')
+        assert not journal.completed('run_60', params)
+        assert not journal.verify('run_60')
+        history.unlink()
+        assert not journal.completed('run_60', params)
+    con = sqlite3.connect(tmp_path / 'journal.sqlite')
+    assert con.execute('PRAGMA journal_mode').fetchone() == ('wal',)
+    con.close()
+
+
+def test_journal_runs(tmp_path):
+    with RunJournal(tmp_path / 'journal.sqlite') as journal:
+        for name in ['run_60', 'run_65', 'run_70']:
+            journal.start(name, {})
+        journal.finish('run_60', 0)
+        journal.finish('run_65', -9)
+        assert not journal.completed('run_65', {})
+        runs = journal.runs()
+    assert runs.index.to_list() == ['run_60', 'run_65', 'run_70']
+    assert runs['state'].to_list() == ['done', 'failed', 'running']
+    assert runs.loc['run_65', 'returncode'] == -9
+    assert runs.loc['run_60', 'duration(s)'] >= 0
+    assert runs['finished'].isna().to_list() == [False, False, True]
+
+
+def test_journal_missing_output(tmp_path):
+    with RunJournal(tmp_path / 'journal.sqlite') as journal:
+        journal.start('run_60', {})
+        journal.finish('run_60', 0, [tmp_path / 'History_60.dat'])
+        assert not journal.completed('run_60', {})
+        assert journal.runs()['state'].to_list() == ['failed']
@@ -0,0 +1,115 @@
+import os
+
+import pytest
+
+from S5.HPC.run_cache import OUTPUT_NAMES, RunCache
+
+
+@pytest.fixture()
+def run_inputs(tmp_path):
+    """Write an executable, a control file and its inputs to tmp_path."""
+    (tmp_path / 'SolarSim.X').write_text('solarsim v1')
+    (tmp_path / 'Weather.dat').write_text('weather')
+    (tmp_path / 'TargetVel.dat').write_text('60')
+    os.mkdir(tmp_path / 'data')
+    (tmp_path / 'data' / 'Road.dat').write_text('road')
+    (tmp_path / 'SolarSim.in').write_text(
+        'Title = "cache"\n'
+        'WeatherFile = "Weather.dat"\n'
+        'TargetVelFile = "TargetVel.dat"\n'
+        'RoadFile = "data\\Road.dat"\n'
+        'TimeStepCar(s) = 1\n'
+    )
+    return tmp_path
+
+
+def write_outputs(path, text):
+    outputs = [path / f'{name}' for name in ('Summary_60.dat', 'History_60.dat', 'SolarTotals_60.dat')]
+    for output in outputs:
+        output.write_text(f'{output.name} {text}')
+    return outputs
+
+
+def test_run_cache_key(run_inputs):
+    cache = RunCache(run_inputs / 'cache')
+    key = cache.key('SolarSim.X', 'SolarSim.in', run_inputs)
+    assert key == cache.key(run_inputs / 'SolarSim.X', run_inputs / 'SolarSim.in', run_inputs)
+    # the contents of the inputs matter, not their names
+    os.mkdir(run_inputs / 'run')
+    (run_inputs / 'run' / 'TargetVel_60.dat').write_text('60')
+    (run_inputs / 'run' / 'SolarSim.in').write_text(
+        (run_inputs / 'SolarSim.in').read_text()
+        .replace('TargetVel.dat', 'TargetVel_60.dat')
+        .replace('"Weather.dat"', '"../Weather.dat"')
+        .replace('"data\\Road.dat"', '"..\\data\\Road.dat"')
+    )
+    assert cache.key(run_inputs / 'SolarSim.X', 'SolarSim.in', run_inputs / 'run') == key
+    (run_inputs / 'TargetVel.dat').write_text('65')
+    assert cache.key('SolarSim.X', 'SolarSim.in', run_inputs) != key
+    (run_inputs / 'TargetVel.dat').write_text('60')
+    assert cache.key('SolarSim.X', 'SolarSim.in', run_inputs) == key
+    # windows style entries are keyed on their contents too
+    (run_inputs / 'data' / 'Road.dat').write_text('new road')
+    assert cache.key('SolarSim.X', 'SolarSim.in', run_inputs) != key
+    (run_inputs / 'data' / 'Road.dat').write_text('road')
+    (run_inputs / 'SolarSim.X').write_text('solarsim v2')
+    assert cache.key('SolarSim.X', 'SolarSim.in', run_inputs) != key
+    (run_inputs / 'data' / 'Road.dat').unlink()
+    with pytest.raises(FileNotFoundError):
+        cache.key('SolarSim.X', 'SolarSim.in', run_inputs)
+    with pytest.raises(FileNotFoundError):
+        cache.key('SolarSim.Y', 'SolarSim.in', run_inputs)
+
+
+def test_run_cache_key_rewritten(run_inputs):
+    cache = RunCache(run_inputs / 'cache')
+    target = run_inputs / 'TargetVel.dat'
+    os.utime(target, (10 ** 9, 10 ** 9))
+    key = cache.key('SolarSim.X', 'SolarSim.in', run_inputs)
+    # rewritten in place, with the same size and modification time
+    target.write_text('65')
+    os.utime(target, (10 ** 9, 10 ** 9))
+    assert cache.key('SolarSim.X', 'SolarSim.in', run_inputs) != key
+
+
+def test_run_cache_fetch(run_inputs):
+    cache = RunCache(run_inputs / 'cache')
+    key = cache.key('SolarSim.X', 'SolarSim.in', run_inputs)
+    fetched = [run_inputs / name for name in OUTPUT_NAMES]
+    assert key not in cache
+    assert not cache.fetch(key, *fetched)
+    outputs = write_outputs(run_inputs, 'run 1')
+    cache.store(key, *outputs)
+    assert key in cache
+    # a second store of the same run keeps the first
+    cache.store(key, *write_outputs(run_inputs, 'run 2'))
+    fetched[0].write_text('stale')
+    assert cache.fetch(key, *fetched)
+    assert [f.read_text() for f in fetched] == [f'{output.name} run 1' for output in outputs]
+    # editing an output in place leaves the cache as it was
+    with open(fetched[1], 'a') as f:
+        f.write('appended')
+    assert cache.fetch(key, *fetched)
+    assert fetched[1].read_text() == 'History_60.dat run 1'
+    assert os.listdir(run_inputs / 'cache') == [key]
+
+
+def test_run_cache_eviction(run_inputs):
+    cache = RunCache(run_inputs / 'cache')
+    outputs = write_outputs(run_inputs, 'run')
+    cache.store('a', *outputs)
+    cache.store('b', *outputs)
+    os.utime(run_inputs / 'cache' / 'a', (0, 0))
+    os.utime(run_inputs / 'cache' / 'b', (1, 1))
+    # fetching marks an entry as recently used
+    assert cache.fetch('a', *outputs)
+    cache.max_bytes = 2 * sum(output.stat().st_size for output in outputs)
+    cache.store('c', *outputs)
+    assert sorted(os.listdir(run_inputs / 'cache')) == ['a', 'c']
+    cache.clear()
+    assert os.listdir(run_inputs / 'cache') == []
+
+
+def test_run_cache_default_dir(monkeypatch, tmp_path):
+    monkeypatch.setenv('S5_CACHE_DIR', str(tmp_path))
+    assert RunCache().cache_dir == str(tmp_path / 'runs')
@@ -60,12 +60,13 @@ def plot_contor(
         >>>     ax=ax[0],
         >>> )
     """
-    cont = weather.data.loc[:, [contour_parameter]].to_numpy()
-    dist = np.unique(weather.data.loc[:, ["Distance(km)"]].to_numpy())
+    grid = weather.grid(variables=[contour_parameter])
     date_time = np.unique(weather.data.loc[:, ["DateTime"]].to_numpy())
 
-    date_timenum, dist = np.meshgrid(dates.date2num(date_time), dist)
-    plotvel = np.reshape(cont, np.shape(dist))
+    date_timenum, dist = np.meshgrid(
+        dates.date2num(date_time), grid.distances
+    )
+    plotvel = grid.values[:, :, 0].T
     if ax is None:
         fig, ax = plt.subplots()
     else:
@@ -0,0 +1,82 @@
+"""Benchmark SSHistory.summarise_file against the previous read_history.
+
+The previous implementation loaded the whole History file and then
+computed the statistics with separate masks and passes over the data.
+
+Usage:
+    python benchmarks/bench_history_summary.py --rows 1000000 --repeat 3
+"""
+import argparse
+import os
+import tempfile
+import tracemalloc
+
+import numpy as np
+
+import S5.Tecplot as TP
+from bench_readfile import HISTORY_VARIABLES, time_it, write_synthetic
+
+
+def legacy_read_history(history_file_path):
+    """read_history as it was before SSHistory.summarise_file."""
+    hist_tp = TP.SSHistory(history_file_path)
+    [driving_time, dist, soc, avg_vel] = (
+        hist_tp.data.loc[
+            :,
+            [
+                "DrivingTime(s)",
+                "Distance(km)",
+                "BatteryCharge(%)",
+                "AverageCarVel(km/h)",
+            ],
+        ]
+        .iloc[-1, :]
+        .to_list()
+    )
+    Vstd = np.std(
+        hist_tp.data[hist_tp.data["Driving"] == 1].loc[:, "CarVel(km/h)"]
+    )
+    SoCMax = hist_tp.data.loc[:, "BatteryCharge(%)"].max()
+    SoCMin = hist_tp.data.loc[:, "BatteryCharge(%)"].min()
+    return driving_time, dist, soc, avg_vel, Vstd, SoCMax, SoCMin
+
+
+def peak_memory(func):
+    """Return the peak traced memory of a call of func in MiB."""
+    tracemalloc.start()
+    func()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak / 2 ** 20
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--memory", action="store_true")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        filename = os.path.join(tmp_dir, "History.dat")
+        write_synthetic(filename, HISTORY_VARIABLES, args.rows)
+        size = os.path.getsize(filename) / 2 ** 20
+        print(f"History: {args.rows} rows, {size:.0f} MiB")
+        cases = [
+            ("legacy", lambda: legacy_read_history(filename)),
+            ("summary", lambda: TP.SSHistory.summarise_file(filename)),
+        ]
+        baseline = None
+        for name, func in cases:
+            elapsed = time_it(func, args.repeat)
+            baseline = baseline or elapsed
+            report = (
+                f"  {name:>8}: {elapsed:7.2f} s ({baseline / elapsed:.1f}x)"
+            )
+            if args.memory:
+                report += f", peak {peak_memory(func):7.1f} MiB"
+            print(report)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+"""Benchmark the TecplotData.readfile engines on large synthetic files.
+
+Compares the original two pass reader (regex header pass then
+``pd.read_csv`` on the file name) against the single pass engines on a
+History shaped file (35 columns) and a Weather shaped file (11 columns).
+
+Usage:
+    python benchmarks/bench_readfile.py --rows 500000 --repeat 3
+"""
+import argparse
+import os
+import re
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+import S5.Tecplot as TP
+
+HISTORY_VARIABLES = [
+    "DayAndTime(s)", "DDHHMMSS", "DrivingTime(s)", "DrivingTime(h)",
+    "Distance(km)", "Distance(miles)", "Lap", "DistanceWithinLap(km)",
+    "Driving", "ArrayOn", "ArrayOnStand", "CarVel(m/s)", "CarVel(km/h)",
+    "CarVel(mph)", "DynamicPressure(Pa)", "YawAngle(deg)", "CdA(m2)",
+    "HeadWind(m/s)", "ArrayTemperature(C)", "DirectSun(W/m2)",
+    "HorizontalIrradiance(W/m2)", "NCellsShaded", "CellByCellMaximumPower(W)",
+    "ArrayToMPPTPower(W)", "Solar/InputPower(W)", "InclinePower(W)",
+    "RollingPower(W)", "AeroPower(W)", "ControllerPowerIn(W)",
+    "BatteryPowerOut(W)", "DriveThrust(N)", "TotalDriveThrust(N)",
+    "BatteryCharge(%)", "BatteryVoltage(V)", "AverageCarVel(km/h)",
+]
+WEATHER_VARIABLES = [
+    "Day", "Time(HHMM)", "Distance(km)", "DirectSun(W/m2)",
+    "DiffuseSun(W/m2)", "SunAzimuth(deg)", "SunElevation(deg)",
+    "AirTemp(degC)", "AirPress(Pa)", "WindVel(m/s)", "WindDir(deg)",
+]
+
+
+def legacy_readfile(filename):
+    """The reader as it was before the engines were added."""
+    with open(filename) as f:
+        re.match("Title = (.+)", f.readline()).group(1).strip('"')
+        variable = re.match("Variables = (.+)", f.readline()).group(1)
+        variable = variable.strip('"').split('", "')
+        for x, line in enumerate(f):
+            if re.match(r"#PAtm\(Pa\) TAtm\(K\)= (.+)", line):
+                continue
+            if re.match("#Datums= (.+)", line):
+                continue
+            TP.TPHeaderZone(re.match("Zone .+", line).group(0))
+            break
+    return pd.read_csv(
+        filename, skiprows=x + 3, index_col=False, sep=r"\s+", names=variable
+    )
+
+
+def write_synthetic(filename, variables, rows, seed=0):
+    """Write a padded POINT file similar to those written by SolarSim."""
+    rng = np.random.default_rng(seed)
+    values = rng.random((rows, len(variables))) * 1000
+    with open(filename, "w") as f:
+        f.write('Title = "Synthetic benchmark file"\n')
+        f.write("Variables = " + ", ".join(f'"{v}"' for v in variables) + "\n")
+        f.write(f'Zone T = " ", I = {rows}, J = 1, K = 1, F = POINT\n')
+        np.savetxt(f, values, fmt="%12.6f")
+
+
+def time_it(func, repeat):
+    """Return the best wall time of `repeat` calls of func."""
+    best = np.inf
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=500_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for name, variables in [
+            ("History", HISTORY_VARIABLES),
+            ("Weather", WEATHER_VARIABLES),
+        ]:
+            filename = os.path.join(tmp_dir, f"{name}.dat")
+            write_synthetic(filename, variables, args.rows)
+            size = os.path.getsize(filename) / 2 ** 20
+            print(f"{name}: {args.rows} rows, {size:.0f} MiB")
+            baseline = time_it(lambda: legacy_readfile(filename), args.repeat)
+            print(f"  {'legacy':>8}: {baseline:7.2f} s")
+            for engine in TP.READ_ENGINES:
+                elapsed = time_it(
+                    lambda: TP.TecplotData(filename, engine=engine),
+                    args.repeat,
+                )
+                print(
+                    f"  {engine:>8}: {elapsed:7.2f} s "
+                    f"({baseline / elapsed:.2f}x)"
+                )
+
+
+if __name__ == "__main__":
+    main()
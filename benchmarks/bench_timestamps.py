@@ -0,0 +1,144 @@
+"""Benchmark the timestamp helpers of SSHistory and SSWeather.
+
+Compares the integer arithmetic implementations against the string based
+ones they replaced, on History and Weather frames of the given size.
+
+Usage:
+    python benchmarks/bench_timestamps.py --rows 1000000 --repeat 3
+"""
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+import S5.Tecplot as TP
+
+
+def legacy_history_add_timestamp(data, startday, datetime_col="DDHHMMSS"):
+    """SSHistory.add_timestamp as it was, through zero padded strings."""
+    data.loc[:, "Day"] = (
+        data[datetime_col]
+        .astype(int)
+        .astype(str)
+        .str.pad(8, fillchar="0")
+        .str[0:2]
+        .astype(int)
+    )
+    startday = pd.to_datetime(startday)
+    data.loc[:, "DateTime"] = pd.to_datetime(
+        data[datetime_col].astype(int).astype(str).str.pad(8, fillchar="0")
+        .str[2:8],
+        format="%H%M%S",
+    )
+    data.loc[:, "DateTime"] = pd.to_datetime(
+        startday.strftime("%Y%m%d") + data["DateTime"].dt.strftime("%H%M%S")
+    )
+    data.loc[:, "DateTime"] = data["DateTime"] + pd.to_timedelta(
+        data["Day"] - 1, unit="D"
+    )
+
+
+def legacy_weather_add_timestamp(data, startday):
+    """SSWeather.add_timestamp as it was, through zero padded strings."""
+    startday = pd.to_datetime(startday)
+    data["DateTime"] = pd.to_datetime(
+        data["Time(HHMM)"]
+        .astype(int)
+        .astype(str)
+        .str.pad(4, side="left", fillchar="0"),
+        format="%H%M",
+    )
+    data["DateTime"] = pd.to_datetime(
+        startday.strftime("%Y%m%d") + data["DateTime"].dt.strftime("%H%M")
+    )
+    data["DateTime"] = data["DateTime"] + pd.to_timedelta(
+        data["Day"] - 1, unit="D"
+    )
+
+
+def legacy_add_day_time_cols(data):
+    """SSWeather.add_day_time_cols as it was, a loop over the index."""
+    first_day = data.index.date[0]
+    data.loc[:, "Day"] = [i.days + 1 for i in (data.index.date - first_day)]
+    data.loc[:, "Time(HHMM)"] = data.index.strftime("%H%M")
+
+
+def time_it(func, make_data, repeat):
+    """Return the best wall time of `repeat` calls of func on fresh data."""
+    best = np.inf
+    for _ in range(repeat):
+        data = make_data()
+        start = time.perf_counter()
+        func(data)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    seconds = np.sort(
+        np.random.default_rng(0).integers(0, 6 * 86400, args.rows)
+    )
+    times = pd.Timestamp("2023-10-22") + pd.to_timedelta(seconds, unit="s")
+    ddhhmmss = (
+        (seconds // 86400 + 1) * 1000000
+        + times.hour * 10000
+        + times.minute * 100
+        + times.second
+    )
+
+    def history():
+        frame = pd.DataFrame({"DDHHMMSS": ddhhmmss})
+        tp = TP.SSHistory()
+        tp.data = frame
+        return tp
+
+    def weather():
+        frame = pd.DataFrame(
+            {
+                "Day": seconds // 86400 + 1,
+                "Time(HHMM)": times.hour * 100 + times.minute,
+            },
+            index=times,
+        )
+        tp = TP.SSWeather()
+        tp.data = frame
+        return tp
+
+    cases = [
+        (
+            "SSHistory.add_timestamp",
+            history,
+            lambda tp: legacy_history_add_timestamp(tp.data, "20231022"),
+            lambda tp: tp.add_timestamp("20231022"),
+        ),
+        (
+            "SSWeather.add_timestamp",
+            weather,
+            lambda tp: legacy_weather_add_timestamp(tp.data, "20231022"),
+            lambda tp: tp.add_timestamp("20231022"),
+        ),
+        (
+            "SSWeather.add_day_time_cols",
+            weather,
+            lambda tp: legacy_add_day_time_cols(tp.data),
+            lambda tp: tp.add_day_time_cols(),
+        ),
+    ]
+    print(f"{args.rows} rows")
+    for name, make_data, legacy, current in cases:
+        baseline = time_it(legacy, make_data, args.repeat)
+        elapsed = time_it(current, make_data, args.repeat)
+        print(
+            f"  {name:>28}: legacy {baseline:7.3f} s, "
+            f"now {elapsed:7.3f} s ({baseline / elapsed:.0f}x)"
+        )
+
+
+if __name__ == "__main__":
+    main()
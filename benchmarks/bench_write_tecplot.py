@@ -0,0 +1,81 @@
+"""Benchmark the TecplotData.write_tecplot engines on weather sized grids.
+
+Reports wall time of each engine at a range of row counts, to show how
+throughput scales with the size of the file. With ``--memory`` the peak
+traced memory is measured in a second (much slower) traced write.
+``--precision compact`` rounds the columns to the weather schema.
+
+Usage:
+    python benchmarks/bench_write_tecplot.py --rows 100000 1000000 --memory
+"""
+import argparse
+import os
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+import S5.Tecplot as TP
+
+WEATHER_VARIABLES = [
+    "Day", "Time(HHMM)", "Distance(km)", "DirectSun(W/m2)",
+    "DiffuseSun(W/m2)", "SunAzimuth(deg)", "SunElevation(deg)",
+    "AirTemp(degC)", "AirPress(Pa)", "WindVel(m/s)", "WindDir(deg)",
+]
+
+
+def synthetic_weather(rows, seed=0):
+    """Return an SSWeather holding a random weather grid."""
+    rng = np.random.default_rng(seed)
+    weather = TP.SSWeather()
+    weather.data = pd.DataFrame(
+        rng.random((rows, len(WEATHER_VARIABLES))) * 1000,
+        columns=WEATHER_VARIABLES,
+    )
+    weather.data["Day"] = rng.integers(1, 8, rows)
+    weather.data["Time(HHMM)"] = rng.integers(0, 2400, rows)
+    weather.update_zone_1d()
+    return weather
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--rows", type=int, nargs="+", default=[100_000, 300_000, 1_000_000]
+    )
+    parser.add_argument("--memory", action="store_true")
+    parser.add_argument("--precision", default=None)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        filename = os.path.join(tmp_dir, "Weather.dat")
+        for rows in args.rows:
+            weather = synthetic_weather(rows)
+            print(f"{rows} rows")
+            for engine in TP.WRITE_ENGINES:
+                start = time.perf_counter()
+                weather.write_tecplot(
+                    filename, engine=engine, precision=args.precision
+                )
+                elapsed = time.perf_counter() - start
+                size = os.path.getsize(filename) / 2 ** 20
+                report = (
+                    f"  {engine:>8}: {elapsed:7.2f} s, "
+                    f"{rows / elapsed / 1e3:7.0f} krow/s, "
+                    f"file {size:6.1f} MiB"
+                )
+                if args.memory:
+                    tracemalloc.start()
+                    weather.write_tecplot(
+                        filename, engine=engine, precision=args.precision
+                    )
+                    _, peak = tracemalloc.get_traced_memory()
+                    tracemalloc.stop()
+                    report += f", peak {peak / 2 ** 20:7.1f} MiB"
+                print(report)
+
+
+if __name__ == "__main__":
+    main()